@@ -2,6 +2,15 @@ import pandas as pd
 from graphviz import Digraph
 import math
 
+from fanout import FANOUT_THRESHOLD, leaf_stacks, stack_label, stacked_uids
+from labels import LabelCache, label_sizes
+from layout_cache import LayoutCache, measure_nodes, node_pos
+from org_graph import build_graph
+from org_io import read_org
+from org_metrics import compute_metrics, label_suffix
+from org_validate import check_org
+from render_backend import render_file
+
 # -------------------------------------------
 # CONFIG
 # -------------------------------------------
@@ -9,11 +18,16 @@ INPUT_FILE = "ideal_final_output.xlsx"
 SHEET_NAME = 0        # first sheet; change if needed
 OUTPUT_FILE = "org_chart"  # will create org_chart.png (or .pdf)
 RANKDIR = "TB"        # "TB" = top-bottom, "LR" = left-right
+SHOW_TEAM_SIZES = False  # add "4 direct · 23 total" under each manager
+FIXED_SIZE_NODES = False # estimated node sizes so dot skips text layout (may clip non-Latin labels)
+COMPACT_FANOUT = True    # stack leaf reports of wide teams into columns
+FANOUT_LIMIT = FANOUT_THRESHOLD  # ...when a manager has more leaf reports than this
+REUSE_LAYOUT = True      # keep unchanged subtrees where they were last run (TB only)
 
 # -------------------------------------------
 # LOAD DATA
 # -------------------------------------------
-df = pd.read_excel(INPUT_FILE, sheet_name=SHEET_NAME)
+df = read_org(INPUT_FILE, SHEET_NAME)
 
 # Expected columns:
 # - Unique Identifier
@@ -32,32 +46,27 @@ if "Reports To" in df.columns:
 else:
     df["Reports To"] = None
 
+# Catch cycles, self-loops and missing managers before drawing
+df = check_org(df)
+
 # -------------------------------------------
 # BUILD A LOOKUP FOR NODE LABELS
 # -------------------------------------------
-def build_label(row):
-    """
-    Build a nice multi-line label for each node:
-    Line 1: Name
-    Line 2: Title
-    Line 3: Org (if available)
-    """
-    name = row.get("Name", "")
-    title = row.get("Line Detail 1", "")
-    # org = row.get("Organization Name", "")
-
-    lines = [name]
-    if isinstance(title, str) and title.strip():
-        lines.append(title.strip())
-    # if isinstance(org, str) and org.strip():
-    #     lines.append(org.strip())
-
-    return "\n".join(lines)
+# Name + title, formatted and measured once per distinct row (see labels.py)
+label_cache = LabelCache()
+id_to_label = label_cache.id_to_label(df)
+id_to_size = label_cache.id_to_size(df, fontsize=10) if FIXED_SIZE_NODES else {}
+label_cache.save()
 
-id_to_label = {
-    row["Unique Identifier"]: build_label(row)
-    for _, row in df.iterrows()
-}
+if SHOW_TEAM_SIZES:
+    graph = build_graph(df)
+    metrics = compute_metrics(graph, by_department=False)
+    for i, uid in enumerate(graph.ids):
+        suffix = label_suffix(metrics, i)
+        if suffix:
+            id_to_label[uid] += "\n" + suffix
+    if FIXED_SIZE_NODES:
+        id_to_size = label_sizes(id_to_label, fontsize=10)  # labels grew a line
 
 # -------------------------------------------
 # IDENTIFY ROOT NODES (NO MANAGER)
@@ -69,48 +78,116 @@ def is_null(x):
 roots = df[df["Reports To"].apply(is_null)]["Unique Identifier"].tolist()
 
 # -------------------------------------------
-# CREATE GRAPHVIZ DIGRAPH
-# -------------------------------------------
-dot = Digraph(comment="HR Org Chart", format="png")
-dot.attr(rankdir=RANKDIR)  # TB or LR
-dot.attr(
-    "node",
-    shape="box",
-    style="rounded,filled",
-    fillcolor="#f9f9f9",
-    color="#555555",
-    fontname="Helvetica",
-    fontsize="10"
-)
-dot.attr("edge", color="#888888", arrowsize="0.7")
-
-# -------------------------------------------
-# ADD NODES
-# -------------------------------------------
-for uid, label in id_to_label.items():
-    # You could color root(s) differently if you want
-    if uid in roots:
-        dot.node(uid, label=label, fillcolor="#e3f2fd")  # light blue for top-level
-    else:
-        dot.node(uid, label=label)
-
-# -------------------------------------------
-# ADD EDGES (MANAGER → EMPLOYEE)
+# WIDE TEAMS: STACK LEAF REPORTS INTO COLUMNS
 # -------------------------------------------
+manager_to_reports = {}
 for _, row in df.iterrows():
-    uid = row["Unique Identifier"]
     manager_id = row["Reports To"]
+    if is_null(manager_id) or str(manager_id) not in id_to_label:
+        continue
+    manager_to_reports.setdefault(str(manager_id), []).append(row["Unique Identifier"])
 
-    if is_null(manager_id):
-        continue  # root node
-    manager_id = str(manager_id)
+stacks = leaf_stacks(manager_to_reports, FANOUT_LIMIT) if COMPACT_FANOUT else []
+in_stack = stacked_uids(stacks)
 
-    # Only add edge if both nodes exist
-    if manager_id in id_to_label and uid in id_to_label:
-        dot.edge(manager_id, uid)
+# -------------------------------------------
+# CREATE GRAPHVIZ DIGRAPH
+# -------------------------------------------
+def new_digraph(engine="dot"):
+    dot = Digraph(comment="HR Org Chart", format="png", engine=engine)
+    dot.attr(rankdir=RANKDIR)  # TB or LR
+    dot.attr(
+        "node",
+        shape="box",
+        style="rounded,filled",
+        fillcolor="#f9f9f9",
+        color="#555555",
+        fontname="Helvetica",
+        fontsize="10"
+    )
+    dot.attr("edge", color="#888888", arrowsize="0.7")
+    return dot
+
+# Pinned positions and edge routes (filled in by the layout cache below)
+pos, edge_at = {}, {}
+
+def pin(uid):
+    return {"pos": node_pos(pos[uid])} if uid in pos else {}
+
+def pin_edge(uid):
+    return {"pos": edge_at[uid]} if uid in edge_at else {}
+
+def add_chart(dot):
+    # -------------------------------------------
+    # ADD NODES
+    # -------------------------------------------
+    for uid, label in id_to_label.items():
+        if uid in in_stack:
+            continue  # drawn inside its manager's stacked column
+        # You could color root(s) differently if you want
+        if uid in roots:
+            dot.node(uid, label=label, fillcolor="#e3f2fd", **id_to_size.get(uid, {}), **pin(uid))  # light blue for top-level
+        else:
+            dot.node(uid, label=label, **id_to_size.get(uid, {}), **pin(uid))
+
+    # -------------------------------------------
+    # ADD EDGES (MANAGER → EMPLOYEE)
+    # -------------------------------------------
+    for _, row in df.iterrows():
+        uid = row["Unique Identifier"]
+        manager_id = row["Reports To"]
+
+        if is_null(manager_id):
+            continue  # root node
+        manager_id = str(manager_id)
+
+        # Only add edge if both nodes exist
+        if manager_id in id_to_label and uid in id_to_label and uid not in in_stack:
+            dot.edge(manager_id, uid, **pin_edge(uid))
+
+    # One box and one edge per stacked column
+    for manager_id, stack_id, uids in stacks:
+        dot.node(stack_id, label=stack_label(uids, id_to_label), shape="plain", style="", **pin(stack_id))
+        dot.edge(manager_id, stack_id, **pin_edge(stack_id))
+
+dot = new_digraph()
+add_chart(dot)
+
+# -------------------------------------------
+# LAYOUT: REUSE UNCHANGED SUBTREES FROM THE LAST RUN
+# -------------------------------------------
+# Subtrees are laid out by `dot` a block at a time and cached (see
+# layout_cache.py); neato -n2 then draws the stitched positions as given,
+# so only changed branches cost layout time and the rest does not move.
+if REUSE_LAYOUT and RANKDIR == "TB":
+    id_to_manager = {}
+    for uid, manager_id in zip(df["Unique Identifier"], df["Reports To"]):
+        if not is_null(manager_id) and str(manager_id) in id_to_label:
+            id_to_manager.setdefault(uid, str(manager_id))
+    id_to_manager.update({stack_id: manager_id for manager_id, stack_id, _ in stacks})
+
+    # Children keep the order their edges are added above
+    nodes = [uid for uid in id_to_label if uid not in in_stack] + [stack_id for _, stack_id, _ in stacks]
+    row_of = {uid: i for i, uid in enumerate(nodes)}
+    try:
+        box = measure_nodes(dot.source)
+        layout_cache = LayoutCache()
+        pos, edge_at = layout_cache.layout(
+            nodes,
+            [row_of.get(id_to_manager.get(uid), -1) for uid in nodes],
+            [box[uid] for uid in nodes],
+        )
+        layout_cache.save()
+        print(f"[INFO] Layout: {layout_cache.laid_out} blocks laid out, "
+              f"{layout_cache.reused + layout_cache.shared} reused")
+        dot = new_digraph(engine="neato")
+        add_chart(dot)
+    except (RuntimeError, OSError, KeyError, ValueError) as e:
+        print(f"[WARN] Layout reuse failed ({e}); letting dot lay out the whole chart")
+        pos, edge_at = {}, {}
 
 # -------------------------------------------
 # RENDER TO FILE
 # -------------------------------------------
-output_path = dot.render(filename=OUTPUT_FILE, cleanup=True)
+output_path = render_file(dot, OUTPUT_FILE, no_op=2 if pos else None)
 print(f"Org chart generated: {output_path}")
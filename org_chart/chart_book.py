@@ -0,0 +1,272 @@
+import argparse
+import os
+import shutil
+from collections import deque
+from dataclasses import dataclass, field
+
+from graphviz import Digraph
+
+try:
+    import pypdf  # joins the rendered pages into one file
+except ImportError:
+    pypdf = None
+
+from org_graph import build_graph, load_org_frame
+from org_metrics import compute_metrics
+from org_validate import check_org
+from render_scheduler import RenderJob, render_many
+
+# -------------------------------------------
+# CONFIG
+# -------------------------------------------
+INPUT_FILE = "ideal_final_output.xlsx"
+BOOK_REPORTS = 100       # a head with more direct reports than this gets a book...
+BOOK_NODES = 1000        # ...and so does one with more people below them
+PAGE_WIDTH = 12          # most boxes side by side on one rank
+PAGE_DEPTH = 3           # levels below the page head
+PAGE_NODES = 60          # most boxes on one page
+PAGE_SIZE = "10.5,7.5"   # inches; Graphviz shrinks each page to fit (landscape A4/letter)
+
+STUB_COLOR = "#FFF3E0"
+HEAD_COLOR = "#e3f2fd"
+
+
+# -------------------------------------------
+# HELPERS
+# -------------------------------------------
+def dept_label(org_name):
+    """'HR Planning  (Moussoux, Florence)' -> 'HR Planning'"""
+    return str(org_name).split("(", 1)[0].strip()
+
+
+def page_ref(first, last):
+    """Page numbers are 1-based in the finished book."""
+    if first == last:
+        return f"p. {first + 1}"
+    return f"pp. {first + 1}–{last + 1}"
+
+
+def subtree_sizes(graph):
+    """Headcount under each row, themself included (one bottom-up pass)."""
+    return compute_metrics(graph, by_department=False)["subtree_size"]
+
+
+def needs_book(graph, row, sizes, max_reports=BOOK_REPORTS, max_nodes=BOOK_NODES):
+    """
+    True when row's team is too wide or too big for one image (sizes:
+    subtree_sizes). Smaller teams stay single charts even when a book
+    would need several pages for them.
+    """
+    return (
+        len(graph.children(row)) > max_reports
+        or sizes[row] > max_nodes + 1
+    )
+
+
+# -------------------------------------------
+# PAGINATION
+# -------------------------------------------
+@dataclass
+class Page:
+    head: int                 # row drawn at the top of the page
+    reports: list             # the head's direct reports shown on this page
+    part: int = 1             # wide teams are split into several parts
+    parts: int = 1
+    from_page: int = None     # page whose stub points here
+    rows: list = field(default_factory=list)    # every row drawn below the head
+    stubs: dict = field(default_factory=dict)   # row -> (first page, last page)
+
+
+def plan_pages(graph, head, page_width=PAGE_WIDTH, page_depth=PAGE_DEPTH,
+               page_nodes=PAGE_NODES):
+    """
+    Split head's team into pages of bounded size:
+
+    - a head with more than page_width direct reports is spread over
+      several pages ("part 2 of 17"), page_width reports each
+    - below that, teams open breadth-first while the page stays within
+      page_depth levels, page_width boxes per rank and page_nodes boxes;
+      a team that does not fit becomes a stub ("continued on p. 7") and
+      gets its own page(s) later in the book
+
+    Pages are numbered in the order they are queued, so stubs can name
+    their page before anything is rendered.
+    """
+    pages = []
+
+    def queue_team(row, from_page):
+        reports = [int(c) for c in graph.children(row)]
+        chunks = [reports[i:i + page_width] for i in range(0, len(reports), page_width)] or [[]]
+        first = len(pages)
+        for part, chunk in enumerate(chunks, start=1):
+            pages.append(Page(row, chunk, part, len(chunks), from_page))
+        return first, len(pages) - 1
+
+    queue_team(head, None)
+
+    p = 0
+    while p < len(pages):
+        page = pages[p]
+        page.rows = list(page.reports)
+        rank_width = {1: len(page.reports)}
+        count = 1 + len(page.reports)
+
+        frontier = deque((r, 1) for r in page.reports)
+        while frontier:
+            row, level = frontier.popleft()
+            reports = graph.children(row)
+            if not len(reports):
+                continue
+            fits = (
+                level < page_depth
+                and rank_width.get(level + 1, 0) + len(reports) <= page_width
+                and count + len(reports) <= page_nodes
+            )
+            if not fits:
+                page.stubs[row] = queue_team(row, p)
+                continue
+            rank_width[level + 1] = rank_width.get(level + 1, 0) + len(reports)
+            count += len(reports)
+            for c in reports:
+                page.rows.append(int(c))
+                frontier.append((int(c), level + 1))
+        p += 1
+
+    return pages
+
+
+# -------------------------------------------
+# PAGE CHARTS
+# -------------------------------------------
+def build_page_dot(graph, pages, p, sizes, fmt="pdf"):
+    """One page of the book, styled like department.py."""
+    page = pages[p]
+    head = page.head
+
+    title = f"Team of {graph.names[head]}"
+    dept = dept_label(graph.orgs[head])
+    if dept:
+        title = f"{dept} — {title}"
+    if page.parts > 1:
+        title += f" (part {page.part} of {page.parts})"
+    title += f"    p. {p + 1}"
+
+    dot = Digraph(comment="HR Org Chart (Chart Book)", format=fmt)
+    dot.attr(rankdir="TB", size=PAGE_SIZE, ratio="compress")
+    dot.attr(label=title, labelloc="t", fontsize="12", fontname="Helvetica")
+    dot.attr(
+        "node",
+        shape="box",
+        style="rounded,filled",
+        fillcolor="#f9f9f9",
+        color="#555555",
+        fontname="Helvetica",
+        fontsize="10"
+    )
+    dot.attr("edge", color="#888888", arrowsize="0.7")
+
+    def lines_of(row):
+        lines = [graph.names[row]]
+        if graph.titles[row]:
+            lines.append(graph.titles[row])
+        return lines
+
+    head_lines = lines_of(head)
+    if page.from_page is not None:
+        head_lines.append(f"(continued from p. {page.from_page + 1})")
+    dot.node(graph.ids[head], label="\n".join(head_lines), fillcolor=HEAD_COLOR)
+
+    for row in page.rows:
+        lines = lines_of(row)
+        if row in page.stubs:
+            first, last = page.stubs[row]
+            size = int(sizes[row]) - 1
+            lines.append(f"{size} staff — continued on {page_ref(first, last)}")
+            dot.node(graph.ids[row], label="\n".join(lines),
+                     fillcolor=STUB_COLOR, style="rounded,filled,bold")
+        else:
+            dot.node(graph.ids[row], label="\n".join(lines))
+
+    for row in page.rows:
+        dot.edge(graph.ids[graph.parent[row]], graph.ids[row])
+
+    return dot
+
+
+# -------------------------------------------
+# BOOK
+# -------------------------------------------
+def merge_pdfs(paths, output):
+    writer = pypdf.PdfWriter()
+    for path in paths:
+        writer.append(path)
+    with open(output, "wb") as f:
+        writer.write(f)
+
+
+def build_chart_book(graph, head, output, sizes=None, **limits):
+    """
+    Render head's chart book to `output` (a .pdf). Pages render in
+    parallel through render_scheduler; without pypdf the pages are kept
+    as <output>_pages/page_NNN.pdf instead of being joined.
+
+    Returns (path written, number of pages, failed RenderResults).
+    """
+    pages = plan_pages(graph, head, **limits)
+    sizes = subtree_sizes(graph) if sizes is None else sizes
+
+    page_dir = os.path.splitext(output)[0] + "_pages"
+    fresh_dir = not os.path.isdir(page_dir)
+    os.makedirs(page_dir, exist_ok=True)
+    jobs = [
+        RenderJob(build_page_dot(graph, pages, p, sizes).source,
+                  os.path.join(page_dir, f"page_{p + 1:03d}.pdf"), fmt="pdf")
+        for p in range(len(pages))
+    ]
+    results = render_many(jobs)
+    failed = [r for r in results if not r.ok]
+
+    if failed:
+        if fresh_dir:
+            shutil.rmtree(page_dir, ignore_errors=True)   # a partial book is no use
+        return None, len(pages), failed
+    if pypdf is None:
+        print(f"[WARN] pypdf not installed; pages left in {page_dir}/ (pip install pypdf)")
+        return page_dir, len(pages), failed
+
+    merge_pdfs([job.output for job in jobs], output)
+    shutil.rmtree(page_dir)
+    return output, len(pages), failed
+
+
+# -------------------------------------------
+# MAIN
+# -------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Multi-page PDF chart book for one team.")
+    parser.add_argument("id", help="Unique Identifier of the team head")
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--output", default=None, help="default: chart_book_<id>.pdf")
+    parser.add_argument("--page-width", type=int, default=PAGE_WIDTH)
+    parser.add_argument("--page-depth", type=int, default=PAGE_DEPTH)
+    parser.add_argument("--page-nodes", type=int, default=PAGE_NODES)
+    args = parser.parse_args()
+
+    graph = build_graph(check_org(load_org_frame(args.input)))
+    head = graph.index_of(args.id)
+    if head < 0:
+        parser.error(f"unknown id {args.id}")
+
+    output = args.output or f"chart_book_{args.id}.pdf"
+    written, n_pages, failed = build_chart_book(
+        graph, head, output,
+        page_width=args.page_width, page_depth=args.page_depth, page_nodes=args.page_nodes,
+    )
+    for result in failed:
+        print(f"[WARN] {result.job.output}: {result.error}")
+    if not failed:
+        print(f"Chart book generated: {written} ({n_pages} pages)")
+
+
+if __name__ == "__main__":
+    main()
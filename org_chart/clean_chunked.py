@@ -0,0 +1,376 @@
+import argparse
+import csv
+import heapq
+import math
+import os
+import re
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+try:
+    import pyarrow.parquet as pq  # chunked reads of .parquet sources
+except ImportError:
+    pq = None
+
+from org_io import XLSX_MAX_ROWS, _cell, write_xlsx_rows
+
+# -------------------------------------------
+# CONFIG
+# -------------------------------------------
+SOURCE_FILE = "Office of Human Resources  (AlNuaimi, Rashed).xlsx"
+SHEET_NAME = "Org Chart"
+OUTPUT_FILE = "ideal_final_output.xlsx"
+COLLAPSED_FILE = "collapsed_positions.csv"
+
+MEMORY_LIMIT_MB = 1024    # rough ceiling for any one chunk or partition in memory
+ROW_BYTES_GUESS = 1000    # in-memory bytes per source row, until measured
+CSV_EXPANSION = 4         # a partition CSV takes about this much more in pandas
+PARTITIONS = 64           # name partitions on disk (oversized ones are split again)
+MAX_SPLITS = 3            # give up splitting (one enormous name) after this many
+
+COL_ID = "Unique Identifier"
+COL_NAME = "Name"
+COL_REPORTS_TO = "Reports To"
+ROW = "_row"              # source row number: output keeps the source order
+BOSS = "_boss_name"       # manager's name, parsed from Reports To
+
+_unfilled = re.compile("unfilled", re.IGNORECASE).search
+_long_id = re.compile(r"\d{6,}").search
+
+
+# -------------------------------------------
+# READING THE SOURCE IN CHUNKS
+# -------------------------------------------
+def _str_cells(values):
+    return [None if v is None else str(v) for v in values]
+
+
+def _xlsx_chunks(path, sheet_name, chunk_rows):
+    """Rows straight from the sheet XML (openpyxl read-only), chunk_rows at a time."""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook[sheet_name] if isinstance(sheet_name, str) else workbook.worksheets[sheet_name]
+        rows = sheet.iter_rows(values_only=True)
+        header = [str(c) for c in next(rows)]
+        buffer = []
+        for row in rows:
+            buffer.append(_str_cells(row[:len(header)]))
+            if len(buffer) >= chunk_rows:
+                yield pd.DataFrame(buffer, columns=header)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=header)
+    finally:
+        workbook.close()
+
+
+def read_chunks(path, sheet_name=SHEET_NAME, chunk_rows=100_000):
+    """
+    The source as DataFrames of at most chunk_rows rows, every cell a
+    string or None. XLSX, CSV and (with pyarrow) Parquet sources.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        reader = pd.read_csv(
+            path, dtype=str, chunksize=chunk_rows,
+            keep_default_na=False, na_values=[""],
+        )
+        for chunk in reader:
+            yield chunk.astype(object).where(chunk.notna(), None)
+    elif ext == ".parquet":
+        if pq is None:
+            raise RuntimeError("pyarrow is needed to read Parquet sources in chunks")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            chunk = batch.to_pandas().astype(object)
+            yield chunk.map(lambda v: None if pd.isna(v) else str(v))
+    else:
+        yield from _xlsx_chunks(path, sheet_name, chunk_rows)
+
+
+# -------------------------------------------
+# ON-DISK PARTITIONS
+# -------------------------------------------
+def partition_of(values, n_parts, salt=0):
+    """Stable partition number for each string (None hashes like "")."""
+    keys = pd.Series(values, dtype=object).fillna("").astype(str)
+    hash_key = f"{salt:016d}"   # a new split uses a different hash
+    return pd.util.hash_array(keys.to_numpy(dtype=object), hash_key=hash_key) % n_parts
+
+
+class PartitionWriter:
+    """Appends rows to <directory>/<prefix>_<n>.csv, writing each header once."""
+
+    def __init__(self, directory, prefix, n_parts, columns):
+        self.paths = [os.path.join(directory, f"{prefix}_{i:04d}.csv") for i in range(n_parts)]
+        self.columns = list(columns)
+        self.rows = [0] * n_parts
+
+    def write(self, df, parts):
+        for part, group in df.groupby(parts, sort=False):
+            path = self.paths[part]
+            group[self.columns].to_csv(path, mode="a", header=not self.rows[part], index=False)
+            self.rows[part] += len(group)
+
+    def written(self):
+        return [p for p, n in zip(self.paths, self.rows) if n]
+
+
+def read_part(path, chunk_rows=None):
+    """A partition file back as strings / None (only empty cells are blank)."""
+    frames = pd.read_csv(
+        path, dtype=str, keep_default_na=False, na_values=[""], chunksize=chunk_rows,
+    )
+    if chunk_rows is None:
+        return frames.astype({ROW: "int64"}).astype(object).where(frames.notna(), None)
+    return (
+        chunk.astype({ROW: "int64"}).astype(object).where(chunk.notna(), None)
+        for chunk in frames
+    )
+
+
+def _too_big(path, limit):
+    return os.path.getsize(path) * CSV_EXPANSION > limit
+
+
+# -------------------------------------------
+# PASS 1 — FILTER AND PARTITION BY NAME
+# -------------------------------------------
+def keep_filled(chunk):
+    """Same rules as clean_data.py: no unfilled positions, no 6+ digit IDs."""
+    uid = chunk[COL_ID].map(str)
+    return chunk[~uid.map(lambda s: bool(_unfilled(s) or _long_id(s)))]
+
+
+def partition_source(source, sheet_name, workdir, chunk_rows, n_parts):
+    writer = None
+    offset = kept = 0
+    for chunk in read_chunks(source, sheet_name, chunk_rows):
+        chunk[ROW] = range(offset, offset + len(chunk))
+        offset += len(chunk)
+        chunk = keep_filled(chunk)
+        kept += len(chunk)
+        # blank -> "nan", as astype(str) does in clean_data.py
+        chunk[COL_NAME] = chunk[COL_NAME].map(lambda v: "nan" if v is None else v).str.strip()
+        if writer is None:
+            writer = PartitionWriter(workdir, "names", n_parts, chunk.columns)
+        writer.write(chunk, partition_of(chunk[COL_NAME], n_parts))
+    if writer is None:
+        raise RuntimeError(f"{source} has no rows")
+    print(
+        f"[INFO] Pass 1: kept {kept} of {offset} rows in "
+        f"{len(writer.written())} name partitions"
+    )
+    return writer.written(), writer.columns
+
+
+def split_part(path, workdir, columns, limit, chunk_rows, salt):
+    """Re-hash one oversized name partition into smaller ones."""
+    n_parts = max(2, math.ceil(os.path.getsize(path) * CSV_EXPANSION / limit))
+    prefix = os.path.splitext(os.path.basename(path))[0] + "_s"
+    writer = PartitionWriter(workdir, prefix, n_parts, columns)
+    for chunk in read_part(path, chunk_rows):
+        writer.write(chunk, partition_of(chunk[COL_NAME], n_parts, salt))
+    os.remove(path)
+    return writer.written()
+
+
+# -------------------------------------------
+# PASS 2 — ONE ROW PER PERSON, PER PARTITION
+# -------------------------------------------
+def boss_name(reports_to):
+    """'12_Smith,_Jane' -> 'Smith, Jane' (clean_data.py's extract_name_from_id)."""
+    if reports_to is None:
+        return None
+    parts = str(reports_to).split("_", 1)
+    return parts[1].replace("_", " ") if len(parts) == 2 else None
+
+
+def dedup_part(path, people, collapsed):
+    """
+    Every row of a name is in this partition, so the in-memory rules of
+    clean_data.py apply: first row per name (in source order) kept, its
+    first non-blank ID the canonical one. Collapsed positions come out
+    grouped by partition rather than in source order.
+    """
+    df = read_part(path).sort_values(ROW, kind="stable")
+    name_codes, _ = pd.factorize(df[COL_NAME])
+    first_row = ~pd.Series(name_codes).duplicated().to_numpy()
+
+    canonical = df.groupby(name_codes, sort=False)[COL_ID].first()
+    canonical_ids = canonical.reindex(range(first_row.sum())).to_numpy(dtype=object)
+
+    unique = df[first_row].copy()
+    unique[COL_ID] = canonical_ids
+    unique[BOSS] = unique[COL_REPORTS_TO].map(boss_name)
+    unique.to_csv(people, mode="a", header=people.tell() == 0, index=False)
+
+    dropped = df[~first_row]
+    pd.DataFrame({
+        COL_ID: canonical_ids[name_codes[~first_row]],
+        "Position Identifier": dropped[COL_ID].to_numpy(dtype=object),
+    }).to_csv(collapsed, mode="a", header=collapsed.tell() == 0, index=False)
+
+    bytes_per_row = df.memory_usage(index=False, deep=True).sum() / max(len(df), 1)
+    return len(unique), len(dropped), bytes_per_row
+
+
+# -------------------------------------------
+# PASS 3 — REPORTS TO, AS A PARTITIONED JOIN
+# -------------------------------------------
+def partition_people(people_path, workdir, columns, n_parts, chunk_rows):
+    """
+    Two sides hashed on the same key: name -> canonical ID by the
+    person's name, and people by their manager's name.
+    """
+    names = PartitionWriter(workdir, "ids", n_parts, [COL_NAME, COL_ID])
+    rows = PartitionWriter(workdir, "people", n_parts, columns)
+    for chunk in read_part(people_path, chunk_rows):
+        names.write(chunk, partition_of(chunk[COL_NAME], n_parts))
+        rows.write(chunk, partition_of(chunk[BOSS], n_parts))
+    return names.paths, rows.paths, names.rows, rows.rows
+
+
+def resolve_part(ids_path, people_path, ids_rows, people_rows):
+    """People of one partition with Reports To replaced by canonical IDs."""
+    if not people_rows:
+        return None
+    people = read_part(people_path)
+    name_to_id = {}
+    if ids_rows:
+        ids = pd.read_csv(ids_path, dtype=str, keep_default_na=False, na_values=[""])
+        name_to_id = dict(zip(ids[COL_NAME], ids[COL_ID].astype(object).where(ids[COL_ID].notna(), None)))
+
+    people[COL_REPORTS_TO] = [
+        None if name is None else name_to_id.get(name) for name in people[BOSS]
+    ]
+    self_report = people[COL_REPORTS_TO].notna() & (people[COL_REPORTS_TO] == people[COL_ID])
+    people.loc[self_report, COL_REPORTS_TO] = None
+    return people.sort_values(ROW, kind="stable")
+
+
+# -------------------------------------------
+# PASS 4 — MERGE BACK INTO SOURCE ORDER
+# -------------------------------------------
+def _sorted_rows(path, columns, chunk_rows):
+    for chunk in read_part(path, chunk_rows):
+        for row_number, row in zip(chunk[ROW], chunk[columns].itertuples(index=False, name=None)):
+            yield row_number, [_cell(v) for v in row]
+
+
+def merged_rows(paths, columns, chunk_rows):
+    """k-way merge of the sorted partitions: one small chunk of each in memory."""
+    streams = [_sorted_rows(p, columns, chunk_rows) for p in paths]
+    for _, row in heapq.merge(*streams, key=lambda item: item[0]):
+        yield row
+
+
+def write_rows(columns, rows, path):
+    if path.lower().endswith(".csv"):
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            out = csv.writer(f)
+            out.writerow(columns)
+            out.writerows(rows)
+    else:
+        write_xlsx_rows(columns, rows, path)
+
+
+# -------------------------------------------
+# PIPELINE
+# -------------------------------------------
+def clean_chunked(
+    source,
+    output=OUTPUT_FILE,
+    sheet_name=SHEET_NAME,
+    memory_mb=MEMORY_LIMIT_MB,
+    collapsed_path=COLLAPSED_FILE,
+    workdir=None,
+):
+    """
+    clean_data.py for sources larger than memory. Writes `output` (and
+    the collapsed position IDs) and returns the number of people.
+    """
+    start = time.perf_counter()
+    limit = memory_mb * 1024 * 1024
+    chunk_rows = max(1000, limit // (4 * ROW_BYTES_GUESS))
+    tmp = tempfile.mkdtemp(prefix="clean_chunked_", dir=workdir)
+    try:
+        parts, columns = partition_source(source, sheet_name, tmp, chunk_rows, PARTITIONS)
+        source_columns = [c for c in columns if c != ROW]
+
+        # Split partitions too big to dedup in memory (a fresh hash each time)
+        for salt in range(1, MAX_SPLITS + 1):
+            big = [p for p in parts if _too_big(p, limit)]
+            if not big:
+                break
+            print(f"[INFO] Splitting {len(big)} name partition(s) over the memory limit")
+            parts = [p for p in parts if p not in big]
+            for path in big:
+                parts += split_part(path, tmp, columns, limit, chunk_rows, salt)
+        else:
+            if any(_too_big(p, limit) for p in parts):
+                print("[WARN] A name partition is still over the memory limit (one name on very many rows?)")
+
+        people_path = os.path.join(tmp, "people.csv")
+        n_people = n_collapsed = 0
+        bytes_per_row = ROW_BYTES_GUESS
+        with open(people_path, "w", newline="", encoding="utf-8") as people, \
+                open(collapsed_path, "w", newline="", encoding="utf-8") as collapsed:
+            for path in parts:
+                kept, dropped, bytes_per_row = dedup_part(path, people, collapsed)
+                n_people += kept
+                n_collapsed += dropped
+                os.remove(path)
+        print(f"[INFO] Pass 2: {n_people} people, {n_collapsed} collapsed positions")
+
+        n_join = max(1, math.ceil(n_people * bytes_per_row * 2 / limit))
+        ids_paths, people_paths, ids_rows, people_rows = partition_people(
+            people_path, tmp, columns + [BOSS], n_join, chunk_rows,
+        )
+        os.remove(people_path)
+
+        resolved = []
+        for i in range(n_join):
+            part = resolve_part(ids_paths[i], people_paths[i], ids_rows[i], people_rows[i])
+            if part is not None:
+                path = os.path.join(tmp, f"resolved_{i:04d}.csv")
+                part[columns].to_csv(path, index=False)
+                resolved.append(path)
+        print(f"[INFO] Pass 3: reporting lines resolved in {n_join} join partition(s)")
+
+        if not output.lower().endswith(".csv") and n_people >= XLSX_MAX_ROWS:
+            csv_output = os.path.splitext(output)[0] + ".csv"
+            print(f"[WARN] {n_people} people do not fit in one Excel sheet; writing {csv_output}")
+            output = csv_output
+        merge_chunk = max(1000, chunk_rows // max(len(resolved), 1))
+        write_rows(source_columns, merged_rows(resolved, source_columns, merge_chunk), output)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    print(f"[INFO] Out-of-core clean finished in {time.perf_counter() - start:.1f}s")
+    print(f"Saved as: {output}")
+    print(f"Collapsed positions: {collapsed_path} ({n_collapsed} rows)")
+    return n_people
+
+
+# -------------------------------------------
+# MAIN
+# -------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="clean_data.py for position exports larger than RAM.")
+    parser.add_argument("--input", default=SOURCE_FILE, help=".xlsx, .csv or .parquet")
+    parser.add_argument("--sheet", default=SHEET_NAME)
+    parser.add_argument("--output", default=OUTPUT_FILE, help=".xlsx or .csv")
+    parser.add_argument("--memory-mb", type=int, default=MEMORY_LIMIT_MB)
+    parser.add_argument("--tmp-dir", default=None, help="where partitions are written")
+    args = parser.parse_args()
+
+    clean_chunked(args.input, args.output, args.sheet, args.memory_mb, workdir=args.tmp_dir)
+
+
+if __name__ == "__main__":
+    main()
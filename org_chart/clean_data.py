@@ -1,10 +1,27 @@
-import pandas as pd
+import os
 import re
 
+import pandas as pd
+
+from org_io import write_output
+
+# Sources bigger than this are cleaned out of core (see clean_chunked.py)
+OUT_OF_CORE_BYTES = 200 * 1024 * 1024
+# Every other position ID a person held, against their canonical ID
+COLLAPSED_FILE = "collapsed_positions.csv"
+
 # -------------------------------------------
 # STEP 1 — LOAD ORIGINAL FILE
 # -------------------------------------------
 path = "Office of Human Resources  (AlNuaimi, Rashed).xlsx"
+
+if os.path.getsize(path) > OUT_OF_CORE_BYTES:
+    # Chunked read, on-disk name partitions, partitioned reports-to join
+    from clean_chunked import clean_chunked
+
+    clean_chunked(path, "ideal_final_output.xlsx", sheet_name="Org Chart", collapsed_path=COLLAPSED_FILE)
+    raise SystemExit(0)
+
 df = pd.read_excel(path, sheet_name="Org Chart")
 
 # -------------------------------------------
@@ -28,18 +45,39 @@ df["Name"] = df["Name"].astype(str).str.strip()
 
 
 # -------------------------------------------
-# STEP 4 — BUILD CANONICAL PERSON-LEVEL ID
-# Choose the first Unique Identifier for each Name
+# STEP 4 — ONE ROW PER PERSON, WITH CANONICAL ID
+# Names are hashed once (factorize); the first row of each name is kept
+# and its Unique Identifier becomes the person's canonical ID. No
+# groupby / drop_duplicates / .copy() passes over the full export.
 # -------------------------------------------
-name_to_canonical_id = df.groupby("Name")["Unique Identifier"].first().to_dict()
+name_codes, person_names = pd.factorize(df["Name"])
+first_row = ~pd.Series(name_codes).duplicated().to_numpy()
+
+df_unique = df[first_row]
+canonical_ids = df_unique["Unique Identifier"].to_numpy(dtype=object)
+
+# A person whose first row has no ID takes their first non-blank one
+# (what groupby().first() did)
+missing = pd.isna(canonical_ids)
+if missing.any():
+    has_id = df["Unique Identifier"].notna().to_numpy()
+    later = pd.Series(df["Unique Identifier"].to_numpy(dtype=object)[has_id], index=name_codes[has_id])
+    later = later[~later.index.duplicated()]
+    canonical_ids[missing] = later.reindex(name_codes[first_row][missing]).to_numpy()
+    df_unique = df_unique.assign(**{"Unique Identifier": canonical_ids})
+
+name_to_canonical_id = dict(zip(person_names, canonical_ids))
 
 # -------------------------------------------
-# STEP 5 — DROP DUPLICATES (ONE ROW PER PERSON)
+# STEP 5 — KEEP THE COLLAPSED POSITION IDS
+# Every other position a person held, against their canonical ID
 # -------------------------------------------
-df_unique = df.drop_duplicates(subset=["Name"], keep="first").copy()
-
-# Replace their Unique Identifier with canonical version
-df_unique["Unique Identifier"] = df_unique["Name"].map(name_to_canonical_id)
+collapsed_path = COLLAPSED_FILE
+collapsed = pd.DataFrame({
+    "Unique Identifier": pd.Categorical(canonical_ids[name_codes[~first_row]]),
+    "Position Identifier": df["Unique Identifier"].to_numpy(dtype=object)[~first_row],
+})
+collapsed.to_csv(collapsed_path, index=False)
 
 # -------------------------------------------
 # STEP 6 — NORMALIZE REPORTING LINES (NAME-BASED)
@@ -74,7 +112,12 @@ df_unique.loc[df_unique["Reports To"] == df_unique["Unique Identifier"], "Report
 # STEP 8 — SAVE IDEAL FINAL OUTPUT FILE
 # -------------------------------------------
 output_path = "ideal_final_output.xlsx"
-df_unique.to_excel(output_path, index=False)
+# Rows are streamed to the XLSX; a Parquet copy is written alongside for
+# the chart scripts, which read it instead of re-parsing the workbook
+sidecar = write_output(df_unique, output_path)
 
 print("Transformation complete!")
 print(f"Saved as: {output_path}")
+print(f"Collapsed positions: {collapsed_path} ({len(collapsed)} rows)")
+if sidecar:
+    print(f"Sidecar: {sidecar}")
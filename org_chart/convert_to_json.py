@@ -2,6 +2,14 @@ import pandas as pd
 import math
 import json
 
+from org_graph import build_graph
+from org_io import clean_org_frame, read_org
+from org_sqlite import SQLITE_FILE, write_sqlite
+from org_validate import check_org
+
+# Also write org_data.db: people + closure table for subtree / chain queries
+EXPORT_SQLITE = True
+
 def is_null(x):
     return (
         x is None or
@@ -38,10 +46,17 @@ def build_tree(df):
     return [to_node(root) for root in roots]
 
 # Load Excel and convert to JSON
-df = pd.read_excel("ideal_final_output.xlsx", sheet_name=0)
+df = read_org("ideal_final_output.xlsx", 0)
+df = check_org(df)  # a reports-to cycle would make to_node recurse forever
+validated = df.copy()   # build_tree rewrites the ID columns in place
 tree = build_tree(df)
 
 with open("org_data.json", "w") as f:
     json.dump(tree, f, indent=2)
 
 print("Saved org_data.json")
+
+if EXPORT_SQLITE:
+    graph = build_graph(clean_org_frame(validated))
+    n_closure = write_sqlite(graph, SQLITE_FILE)
+    print(f"Saved {SQLITE_FILE} ({graph.n} people, {n_closure} closure rows)")
@@ -1,20 +1,36 @@
 import pandas as pd
 from graphviz import Digraph
 import math
+import os
 import re
+import shutil
+from collections import Counter
+
+from chart_book import build_chart_book, needs_book, subtree_sizes
+from org_graph import build_graph
+from org_io import read_org
+from org_validate import check_org
+from render_scheduler import RenderJob, render_many
 
 # -------------------------------------------
 # CONFIG
 # -------------------------------------------
 INPUT_FILE = "ideal_final_output.xlsx"
 SHEET_NAME = 0        # first sheet; change if needed
-OUTPUT_PREFIX = "org_chart"  # will create org_chart_<dept>.png
+OUTPUT_PREFIX = "org_chart"  # will create org_chart_<manager>.png
+OUTPUT_DIR = "charts"
+OUTPUT_FORMATS = ["png", "svg"]  # all written from one layout per chart
+CHART_BOOKS = True    # teams past chart_book.BOOK_REPORTS / BOOK_NODES get a multi-page PDF instead
 RANKDIR = "TB"        # "TB" = top-bottom, "LR" = left-right
+PRUNE_STALE = False   # after a clean run, delete charts of people who are no longer managers
+
+# Only redraw these managers' charts (set by org_watch.py); unset = everyone
+ONLY_MANAGERS = set(filter(None, os.environ.get("ORG_CHART_MANAGERS", "").split("\n")))
 
 # -------------------------------------------
 # LOAD DATA
 # -------------------------------------------
-df = pd.read_excel(INPUT_FILE, sheet_name=SHEET_NAME)
+df = read_org(INPUT_FILE, SHEET_NAME)
 
 # Expected columns:
 # - Unique Identifier
@@ -33,6 +49,9 @@ if "Reports To" in df.columns:
 else:
     df["Reports To"] = None
 
+# Catch cycles, self-loops and missing managers before drawing
+df = check_org(df)
+
 # -------------------------------------------
 # HELPERS
 # -------------------------------------------
@@ -80,6 +99,19 @@ def safe_filename(s):
     s = s.strip("_")
     return s or "Unknown"
 
+def chart_base(manager_id):
+    """
+    Output path without extension: org_chart_<Name>. Managers who share
+    a name also get their ID, or their charts would overwrite each other;
+    IDs like '12_Doe,_John' already carry the name, so it is not repeated.
+    """
+    name = safe_filename(id_to_name.get(manager_id))
+    stem = name
+    if manager_name_count[name] > 1:
+        uid = safe_filename(manager_id)
+        stem = uid if name in uid else f"{name}_{uid}"
+    return os.path.join(OUTPUT_DIR, f"{OUTPUT_PREFIX}_{stem}")
+
 # -------------------------------------------
 # GLOBAL LOOKUP: LABELS & REPORTING TREE
 # -------------------------------------------
@@ -115,3 +147,127 @@ def get_subtree_nodes(root_id):
                 stack.append(child)
 
     return seen
+
+# -------------------------------------------
+# ONE CHART PER MANAGER
+# -------------------------------------------
+id_to_name = dict(zip(df["Unique Identifier"], df["Name"]))
+id_to_org = dict(zip(df["Unique Identifier"], df["Organization Name"]))
+manager_name_count = Counter(
+    safe_filename(id_to_name[m]) for m in manager_to_reports if m in id_to_label
+)
+
+def build_manager_dot(manager_id):
+    """Manager plus everyone below them, styled like build_org_chart.py."""
+    subtree = get_subtree_nodes(manager_id)
+
+    dot = Digraph(comment="HR Org Chart", format="png")
+    dot.attr(rankdir=RANKDIR)
+    dept = extract_dept_name(id_to_org.get(manager_id))
+    if dept:
+        dot.attr(label=dept, labelloc="t", fontsize="12", fontname="Helvetica")
+    dot.attr(
+        "node",
+        shape="box",
+        style="rounded,filled",
+        fillcolor="#f9f9f9",
+        color="#555555",
+        fontname="Helvetica",
+        fontsize="10"
+    )
+    dot.attr("edge", color="#888888", arrowsize="0.7")
+
+    for uid in subtree:
+        if uid == manager_id:
+            dot.node(uid, label=id_to_label[uid], fillcolor="#e3f2fd")  # head of the chart
+        elif uid in id_to_label:
+            dot.node(uid, label=id_to_label[uid])
+
+    for mgr in subtree:
+        for uid in manager_to_reports.get(mgr, []):
+            if uid in subtree and uid in id_to_label:
+                dot.edge(mgr, uid)
+
+    return dot
+
+
+os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+graph = build_graph(df)
+sizes = subtree_sizes(graph)
+
+def current_outputs():
+    """Names of every chart or chart book this file produces in OUTPUT_DIR."""
+    keep = set()
+    for manager_id in manager_to_reports:
+        if manager_id not in id_to_label:
+            continue
+        base = os.path.basename(chart_base(manager_id))
+        if CHART_BOOKS and needs_book(graph, graph.index_of(manager_id), sizes):
+            keep.update({f"{base}.pdf", f"{base}_pages"})
+        else:
+            keep.update(f"{base}.{fmt}" for fmt in OUTPUT_FORMATS)
+    return keep
+
+jobs = []
+books = []
+for manager_id in manager_to_reports:
+    if manager_id not in id_to_label:
+        continue  # reports to someone outside this file
+    if ONLY_MANAGERS and manager_id not in ONLY_MANAGERS:
+        continue
+    if CHART_BOOKS and needs_book(graph, graph.index_of(manager_id), sizes):
+        books.append(manager_id)
+        continue
+    base = chart_base(manager_id)
+    fmt, *more_fmts = OUTPUT_FORMATS
+    jobs.append(RenderJob(
+        build_manager_dot(manager_id).source,
+        f"{base}.{fmt}",
+        fmt=fmt,
+        more_outputs={extra: f"{base}.{extra}" for extra in more_fmts},
+    ))
+
+# All charts go through one bounded pool of `dot` processes
+n_written, n_failed = 0, 0
+for result in render_many(jobs):
+    if result.ok:
+        outputs = [result.job.output, *result.job.more_outputs.values()]
+        print(f"Org chart generated: {', '.join(outputs)} ({result.seconds:.1f}s)")
+        n_written += 1
+    else:
+        print(f"[WARN] {result.job.output}: {result.error}")
+        n_failed += 1
+
+# Wide or deep teams: paged PDF with "continued on p. N" stubs
+for manager_id in books:
+    output = f"{chart_base(manager_id)}.pdf"
+    written, n_pages, failed = build_chart_book(graph, graph.index_of(manager_id), output, sizes)
+    for result in failed:
+        print(f"[WARN] {result.job.output}: {result.error}")
+    if not failed:
+        print(f"Chart book generated: {written} ({n_pages} pages)")
+        n_written += 1
+    else:
+        n_failed += 1
+
+# Charts of managers who left, lost their team or were renamed. Only
+# after every chart of this run was written, and only files of the kinds
+# this run writes, so a broken Graphviz install never empties the folder.
+if PRUNE_STALE and n_failed:
+    print(f"[WARN] {n_failed} chart(s) failed; not removing stale charts from {OUTPUT_DIR}/")
+elif PRUNE_STALE and n_written:
+    keep = current_outputs()
+    suffixes = tuple(f".{fmt}" for fmt in OUTPUT_FORMATS) + (".pdf", "_pages")
+    stale = [
+        entry for entry in os.listdir(OUTPUT_DIR)
+        if entry.startswith(f"{OUTPUT_PREFIX}_") and entry.endswith(suffixes) and entry not in keep
+    ]
+    for entry in stale:
+        path = os.path.join(OUTPUT_DIR, entry)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
+    if stale:
+        print(f"[INFO] Removed {len(stale)} stale chart(s) from {OUTPUT_DIR}/")
@@ -0,0 +1,149 @@
+import argparse
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from dot_writer import dot_lines, dot_source, edge_lines, node_lines
+from org_graph import build_graph, load_org_frame
+from org_validate import check_org
+from render_scheduler import RenderJob, render_one
+
+# -------------------------------------------
+# CONFIG
+# -------------------------------------------
+INPUT_FILE = "ideal_final_output.xlsx"
+OUTPUT_FILE = "org_chart_highlevel"   # org_chart_highlevel.svg / .png
+OUTPUT_FORMATS = ["svg", "png"]
+RANKDIR = "TB"
+FONT = "Helvetica"
+UNKNOWN_DEPT = "Unknown"
+
+
+# -------------------------------------------
+# DEPARTMENT NAMES
+# -------------------------------------------
+def dept_names(orgs):
+    """
+    Vectorised department.py extract_dept_name over a whole column:
+    'HR Planning  (Moussoux, Florence)' -> 'HR Planning'; blank stays "".
+    """
+    names = pd.Series(orgs, dtype=object).fillna("").astype(str)
+    return names.str.split("(", n=1).str[0].str.strip().to_numpy(dtype=object)
+
+
+# -------------------------------------------
+# CONTRACTION
+# -------------------------------------------
+def department_units(graph, depts):
+    """
+    Union-find over reporting lines: each person is joined with their
+    manager when both are in the same department, or when the person has
+    no department of their own. Returns each row's set
+    representative, which is the top member of its unit (the department
+    leader). On a tree the unions can be applied top-down, one level at
+    a time, so every find is already fully compressed: O(n).
+    """
+    depts = np.asarray(depts, dtype=object)
+    unit = np.arange(graph.n)          # rows inside a reports-to cycle stay on their own
+    for level in graph.levels[1:]:
+        managers = graph.parent[level]
+        same = (depts[level] == depts[managers]) | (depts[level] == "")
+        unit[level[same]] = unit[managers[same]]
+    return unit
+
+
+@dataclass
+class DeptGraph:
+    """One node per connected department unit, in the person graph's BFS order."""
+    leader: np.ndarray      # row of the unit's top person
+    dept: np.ndarray        # department name
+    headcount: np.ndarray   # people in the unit
+    parent: np.ndarray      # index of the unit above, -1 at the top
+
+    @property
+    def n(self):
+        return len(self.leader)
+
+
+def quotient_graph(graph, depts=None):
+    """Contract the person graph into its department graph."""
+    depts = dept_names(graph.orgs) if depts is None else np.asarray(depts, dtype=object)
+    unit = department_units(graph, depts)
+
+    # Top-down so a unit comes after the unit it reports into
+    order = np.concatenate([graph.order, np.flatnonzero(graph.depth < 0)])
+    leaders = order[unit[order] == order]
+    index = np.full(graph.n, -1, dtype=np.int64)
+    index[leaders] = np.arange(len(leaders))
+
+    above = graph.parent[leaders]
+    parent = np.where(above >= 0, index[unit[np.maximum(above, 0)]], -1)
+    return DeptGraph(
+        leader=leaders,
+        dept=np.where(depts[leaders] == "", UNKNOWN_DEPT, depts[leaders]),
+        headcount=np.bincount(index[unit], minlength=len(leaders)),
+        parent=parent,
+    )
+
+
+# -------------------------------------------
+# DRAWING
+# -------------------------------------------
+def dept_source(graph, dg):
+    """DOT for the department graph: department, leader and headcount per box."""
+    ids = [f"dept_{graph.ids[row]}" for row in dg.leader]
+    labels = [
+        f"{dept}\n{graph.names[row]}\n{count} {'person' if count == 1 else 'people'}"
+        for dept, row, count in zip(dg.dept, dg.leader, dg.headcount)
+    ]
+    classes = ["top" if p < 0 else None for p in dg.parent]
+    has_parent = np.flatnonzero(dg.parent >= 0)
+
+    body = node_lines(ids, labels, classes, {"top": dict(fillcolor="#e3f2fd", penwidth="1.5")})
+    body += edge_lines([ids[p] for p in dg.parent[has_parent]], [ids[i] for i in has_parent])
+    return dot_source(dot_lines(
+        body,
+        comment="HR Org Chart - Departments",
+        graph_attr=dict(
+            rankdir=RANKDIR, label="HR Org Chart - High Level", labelloc="t",
+            fontsize="12", fontname=FONT, nodesep="0.3", ranksep="0.5",
+        ),
+        node_attr=dict(
+            shape="box", style="rounded,filled", fillcolor="#f9f9f9",
+            color="#555555", fontname=FONT, fontsize="9",
+        ),
+        edge_attr=dict(color="#888888", arrowsize="0.7"),
+    ))
+
+
+# -------------------------------------------
+# MAIN
+# -------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Department-level chart from the person graph.")
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--output", default=OUTPUT_FILE, help="file name without extension")
+    args = parser.parse_args()
+
+    graph = build_graph(check_org(load_org_frame(args.input)))
+
+    start = time.perf_counter()
+    dg = quotient_graph(graph)
+    source = dept_source(graph, dg)
+    print(
+        f"[INFO] {graph.n} people -> {dg.n} department units "
+        f"in {(time.perf_counter() - start) * 1000:.1f} ms"
+    )
+
+    fmt, *more = OUTPUT_FORMATS
+    render_one(RenderJob(
+        source, f"{args.output}.{fmt}", fmt=fmt,
+        more_outputs={f: f"{args.output}.{f}" for f in more},
+    ))
+    print(f"High-level chart generated: {', '.join(f'{args.output}.{f}' for f in OUTPUT_FORMATS)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import numpy as np
+from graphviz import quoting
+
+# -------------------------------------------
+# BULK DOT WRITER
+# -------------------------------------------
+# Digraph.node()/edge() quote and format one statement per call and
+# .source joins them again; at 100k people that is seconds of Python
+# before `dot` starts. These helpers produce the same text as the
+# graphviz package (its own quoting functions, same sorted attribute
+# lists, same tab indentation) with one pass per column.
+
+
+def quote_array(values):
+    """graphviz.quoting.quote over a column of strings, as an object array."""
+    return np.array([quoting.quote(str(v)) for v in values], dtype=object)
+
+
+def quote_edge_array(values):
+    """Same for edge endpoints ("node:port" ids keep their port)."""
+    return np.array(
+        [quoting.quote_edge(v) if ":" in v else quoting.quote(v) for v in map(str, values)],
+        dtype=object,
+    )
+
+
+def a_list(attrs):
+    """'key=value ...' sorted by key, exactly as Digraph writes it."""
+    return quoting.a_list(None, kwargs=attrs)
+
+
+def attr_stmt(kind, attrs, indent=1):
+    """'\\tnode [...]\\n' style statement for graph/node/edge defaults."""
+    tab = "\t" * indent
+    return f"{tab}{kind} [{a_list(attrs)}]\n" if attrs else ""
+
+
+def node_lines(ids, labels, classes=None, class_attrs=None, indent=1, extra=None):
+    """
+    One node statement per row. classes[i] picks extra attributes from
+    class_attrs (e.g. "root" -> bold border); None means plain. extra[i],
+    if given, is an already formatted a_list appended to row i.
+    """
+    tab = "\t" * indent
+    suffix = {None: ""}
+    suffix.update({key: " " + a_list(attrs) for key, attrs in (class_attrs or {}).items()})
+    if classes is None:
+        classes = [None] * len(ids)
+    if extra is None:
+        extra = [""] * len(ids)
+    return [
+        f"{tab}{uid} [label={label}{suffix[cls]}{' ' + more if more else ''}]\n"
+        for uid, label, cls, more in zip(quote_array(ids), quote_array(labels), classes, extra)
+    ]
+
+
+def edge_lines(tails, heads, indent=1):
+    tab = "\t" * indent
+    return [
+        f"{tab}{tail} -> {head}\n"
+        for tail, head in zip(quote_edge_array(tails), quote_edge_array(heads))
+    ]
+
+
+def cluster_lines(name, attrs, body, node_attr=None, indent=1):
+    """A subgraph block as written by `with dot.subgraph(name=...) as c`."""
+    tab = "\t" * indent
+    yield f"{tab}subgraph {quoting.quote(name)} {{\n"
+    yield attr_stmt("node", node_attr, indent + 1)
+    if attrs:
+        yield f"{tab}\t{a_list(attrs)}\n"
+    yield from body
+    yield f"{tab}}}\n"
+
+
+def dot_lines(body, comment=None, graph_attr=None, node_attr=None, edge_attr=None):
+    """Whole digraph: comment, defaults, then the body statements."""
+    if comment:
+        yield f"// {comment}\n"
+    yield "digraph {\n"
+    yield attr_stmt("graph", graph_attr)
+    yield attr_stmt("node", node_attr)
+    yield attr_stmt("edge", edge_attr)
+    yield from body
+    yield "}\n"
+
+
+def dot_source(lines):
+    return "".join(lines)
+
@@ -0,0 +1,60 @@
+import html
+
+# -------------------------------------------
+# CONFIG
+# -------------------------------------------
+FANOUT_THRESHOLD = 8   # compact managers with more leaf reports than this
+STACK_SIZE = 8         # people per stacked column
+
+
+# -------------------------------------------
+# WIDE-FANOUT COMPACTION
+# -------------------------------------------
+# A manager with 80 individual contributors gives `dot` an 80-wide rank.
+# Instead, their leaf reports are drawn as a few columns, each one node
+# with an HTML table label listing up to STACK_SIZE people, so the rank
+# is ceil(80 / STACK_SIZE) boxes wide and has that many edges to route.
+def leaf_stacks(manager_to_reports, threshold=FANOUT_THRESHOLD,
+                stack_size=STACK_SIZE, group_of=None):
+    """
+    Columns of leaf reports to draw stacked, as a list of
+    (manager, stack node id, [uids]).
+
+    Reports who manage someone keep their own box. group_of(uid), when
+    given, keeps people with different keys (e.g. departments) in
+    separate columns.
+    """
+    stacks = []
+    for mgr, reports in manager_to_reports.items():
+        leaves = [uid for uid in reports if uid not in manager_to_reports]
+        if len(leaves) <= threshold:
+            continue
+
+        groups = {}
+        for uid in leaves:
+            groups.setdefault(group_of(uid) if group_of else None, []).append(uid)
+
+        for members in groups.values():
+            for start in range(0, len(members), stack_size):
+                stack_id = f"{mgr}__stack{len(stacks)}"
+                stacks.append((mgr, stack_id, members[start:start + stack_size]))
+    return stacks
+
+
+def stack_label(uids, id_to_label, fillcolor="#f9f9f9", fontsize=10):
+    """HTML-like label: one rounded cell per person, top to bottom."""
+    rows = []
+    for uid in uids:
+        lines = [html.escape(line) for line in id_to_label[uid].split("\n")]
+        if len(lines) > 1:
+            lines[1:] = [f'<FONT POINT-SIZE="{fontsize - 1}">{line}</FONT>' for line in lines[1:]]
+        rows.append(
+            f'<TR><TD PORT="{html.escape(uid)}" BGCOLOR="{fillcolor}" STYLE="rounded">'
+            f'{"<BR/>".join(lines)}</TD></TR>'
+        )
+    return f'<<TABLE BORDER="0" CELLBORDER="1" CELLSPACING="3" CELLPADDING="4">{"".join(rows)}</TABLE>>'
+
+
+def stacked_uids(stacks):
+    """Everyone drawn inside a stack (so callers skip their own box and edge)."""
+    return {uid for _, _, uids in stacks for uid in uids}
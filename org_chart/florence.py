@@ -1,10 +1,14 @@
 import pandas as pd
 from graphviz import Digraph
 
+from org_io import read_org
+from org_search import NameIndex
+from org_validate import check_org
+
 # ----------------------------
 # LOAD DATA
 # ----------------------------
-df = pd.read_excel("ideal_final_output.xlsx")
+df = read_org("ideal_final_output.xlsx")
 
 df["Unique Identifier"] = df["Unique Identifier"].astype(str).str.strip()
 df["Reports To"] = (
@@ -15,11 +19,18 @@ df["Reports To"] = (
 )
 df["Name"] = df["Name"].astype(str).str.strip()
 
+# Catch cycles, self-loops and missing managers before drawing
+df = check_org(df)
+
 # ----------------------------
 # FIND FLORENCE
 # ----------------------------
 # Adjust the "Florence" string if needed to match your data
-florence_row = df[df["Name"].str.contains("Florence", case=False)].iloc[0]
+name_index = NameIndex(df["Name"], df["Line Detail 1"])
+florence_pos = name_index.find_one("Florence")
+if florence_pos < 0:
+    raise RuntimeError("No one matching 'Florence' found.")
+florence_row = df.iloc[florence_pos]
 
 florence_id = florence_row["Unique Identifier"]
 florence_name = florence_row["Name"]
@@ -3,6 +3,9 @@ import math
 import json
 from collections import defaultdict
 
+from org_io import read_org
+from org_validate import check_org
+
 # -------------------------------------------
 # CONFIG
 # -------------------------------------------
@@ -20,7 +23,7 @@ COL_ORG = "Organization Name"
 # -------------------------------------------
 # LOAD DATA
 # -------------------------------------------
-df = pd.read_excel(INPUT_FILE, sheet_name=SHEET_NAME)
+df = read_org(INPUT_FILE, SHEET_NAME)
 
 # Clean up types
 df[COL_ID] = df[COL_ID].astype(str)
@@ -36,6 +39,9 @@ for col in [COL_TITLE, COL_ORG]:
     if col not in df.columns:
         df[col] = ""
 
+# Catch cycles, self-loops and missing managers before building the tree
+df = check_org(df)
+
 # -------------------------------------------
 # HELPER: null check
 # -------------------------------------------
@@ -0,0 +1,222 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# -------------------------------------------
+# CONFIG
+# -------------------------------------------
+LABEL_CACHE_FILE = ".label_cache.json"  # shared by every chart script (None = memory only)
+SHORT_TITLE_LEN = 40                    # same truncation as jan_22_2.py's shortTitle
+
+COL_ID = "Unique Identifier"
+COL_NAME = "Name"
+COL_TITLE = "Line Detail 1"
+COL_ORG = "Organization Name"
+
+# Graphviz's defaults: box margin (inches) and minimum node size
+DEFAULT_MARGIN = (0.11, 0.055)
+MIN_WIDTH = 0.75
+MIN_HEIGHT = 0.5
+LINE_SPACING = 1.2      # line height as a multiple of the font size
+WIDTH_PADDING = 1.06    # headroom for fonts that are not exactly Helvetica
+
+
+# -------------------------------------------
+# FONT METRICS (Helvetica AFM, 1/1000 em)
+# -------------------------------------------
+# Printable ASCII ' ' .. '~'
+_HELVETICA_ASCII = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+DEFAULT_CHAR_WIDTH = 556
+
+WIDTH_TABLE = np.full(0x2100, DEFAULT_CHAR_WIDTH, dtype=np.int64)
+WIDTH_TABLE[32:127] = _HELVETICA_ASCII
+WIDTH_TABLE[0xC0:0xDF] = 722       # accented capitals
+WIDTH_TABLE[0xDF:0x100] = 556      # accented lowercase
+WIDTH_TABLE[0xB7] = 278            # "·"
+WIDTH_TABLE[0x2013] = 556          # "–"
+WIDTH_TABLE[0x2014] = 1000         # "—"
+WIDTH_TABLE[0x2026] = 1000         # "…"
+
+
+def measure(labels):
+    """
+    Widest line of each label in 1/1000 em, and its line count.
+    Every label is measured in one pass over its code points.
+    """
+    lines, owner = [], []
+    for i, label in enumerate(labels):
+        parts = label.split("\n")
+        lines.extend(parts)
+        owner.extend([i] * len(parts))
+
+    n = len(labels)
+    if not lines:
+        return np.zeros(n, dtype=np.int64), np.zeros(n, dtype=np.int64)
+
+    lengths = np.fromiter(map(len, lines), dtype=np.int64, count=len(lines))
+    codes = np.frombuffer("".join(lines).encode("utf-32-le"), dtype=np.uint32)
+    widths = np.where(
+        codes < len(WIDTH_TABLE),
+        WIDTH_TABLE[np.minimum(codes, len(WIDTH_TABLE) - 1)],
+        DEFAULT_CHAR_WIDTH,
+    )
+    total = np.concatenate([[0], np.cumsum(widths)])
+    ends = np.cumsum(lengths)
+    line_widths = total[ends] - total[ends - lengths]
+
+    owner = np.asarray(owner, dtype=np.int64)
+    widest = np.zeros(n, dtype=np.int64)
+    np.maximum.at(widest, owner, line_widths)
+    return widest, np.bincount(owner, minlength=n)
+
+
+def node_size(width_units, n_lines, fontsize, margin=DEFAULT_MARGIN):
+    """(width, height) in inches of a box that fits the label."""
+    width = width_units * fontsize / 1000 / 72 * WIDTH_PADDING + 2 * margin[0]
+    height = n_lines * fontsize * LINE_SPACING / 72 + 2 * margin[1]
+    return max(round(width, 3), MIN_WIDTH), max(round(height, 3), MIN_HEIGHT)
+
+
+def size_attrs(width_units, n_lines, fontsize, margin=DEFAULT_MARGIN):
+    """Node attributes that let `dot` skip measuring the label text."""
+    width, height = node_size(width_units, n_lines, fontsize, margin)
+    return {"fixedsize": "true", "width": str(width), "height": str(height)}
+
+
+def label_sizes(id_to_label, fontsize, margin=DEFAULT_MARGIN):
+    """size_attrs for labels that did not come from the cache (e.g. with a suffix)."""
+    widths, n_lines = measure(list(id_to_label.values()))
+    return {
+        uid: size_attrs(width, count, fontsize, margin)
+        for uid, width, count in zip(id_to_label, widths, n_lines)
+    }
+
+
+# -------------------------------------------
+# LABEL FORMATTING
+# -------------------------------------------
+def short_title(title):
+    """First clause of the title, truncated like jan_22_2.py's shortTitle."""
+    title = title.split(",")[0].strip()
+    if len(title) > SHORT_TITLE_LEN:
+        title = title[:SHORT_TITLE_LEN - 3].rstrip() + "…"
+    return title
+
+
+def format_label(name, title="", org="", short_titles=False, show_org=False):
+    """
+    Line 1: Name
+    Line 2: Title (Line Detail 1), if any
+    Line 3: Org, if show_org
+    """
+    lines = [name]
+    if title:
+        lines.append(short_title(title) if short_titles else title)
+    if show_org and org:
+        lines.append(org)
+    return "\n".join(lines)
+
+
+def _text(df, col):
+    if col not in df.columns:
+        return pd.Series("", index=df.index, dtype=object)
+    col = df[col].astype(object)
+    return col.where(col.map(lambda v: isinstance(v, str)), "").str.strip()
+
+
+# -------------------------------------------
+# LABEL CACHE
+# -------------------------------------------
+class LabelCache:
+    """
+    Formatted labels and their measured text size, keyed by a hash of
+    the row's name / title / organization. Rows whose text has not
+    changed since the last run (of any chart script) are neither
+    reformatted nor measured again.
+    """
+
+    def __init__(self, path=LABEL_CACHE_FILE, short_titles=False, show_org=False):
+        self.path = path
+        self.options = (short_titles, show_org)
+        self._key = f"short_titles={int(short_titles)},show_org={int(show_org)}"
+        self._entries = {}   # row hash -> (label, width units, line count)
+        self._all = {}       # every option set, as stored on disk
+        if path and os.path.exists(path):
+            # Plain JSON, so a tampered file can at worst hold wrong labels
+            try:
+                with open(path, encoding="utf-8") as f:
+                    stored = json.load(f)
+                self._all = {
+                    options: {int(h): (str(label), int(width), int(count))
+                              for h, (label, width, count) in entries.items()}
+                    for options, entries in stored.items()
+                }
+            except Exception:   # truncated, foreign or from an incompatible version
+                print(f"[WARN] Ignoring unreadable label cache {path}")
+                self._all = {}
+            self._entries = self._all.get(self._key, {})
+        self._used = set()
+
+    def lookup(self, df):
+        """(labels, width units, line counts) for every row of df, in order."""
+        text = pd.DataFrame({
+            "name": _text(df, COL_NAME),
+            "title": _text(df, COL_TITLE),
+            "org": _text(df, COL_ORG),
+        })
+        hashes = pd.util.hash_pandas_object(text, index=False).tolist()
+
+        missing = [i for i, h in enumerate(hashes) if h not in self._entries]
+        if missing:
+            short_titles, show_org = self.options
+            rows = text.iloc[missing]
+            new_labels = [
+                format_label(name, title, org, short_titles, show_org)
+                for name, title, org in zip(rows["name"], rows["title"], rows["org"])
+            ]
+            widths, n_lines = measure(new_labels)
+            for i, label, width, count in zip(missing, new_labels, widths, n_lines):
+                self._entries[hashes[i]] = (label, int(width), int(count))
+
+        self._used.update(hashes)
+        entries = [self._entries[h] for h in hashes]
+        labels = [e[0] for e in entries]
+        widths = np.array([e[1] for e in entries], dtype=np.int64)
+        n_lines = np.array([e[2] for e in entries], dtype=np.int64)
+        return labels, widths, n_lines
+
+    def id_to_label(self, df):
+        labels, _, _ = self.lookup(df)
+        return dict(zip(df[COL_ID], labels))
+
+    def id_to_size(self, df, fontsize, margin=DEFAULT_MARGIN):
+        """Fixed-size node attributes per Unique Identifier."""
+        _, widths, n_lines = self.lookup(df)
+        return {
+            uid: size_attrs(width, count, fontsize, margin)
+            for uid, width, count in zip(df[COL_ID], widths, n_lines)
+        }
+
+    def save(self):
+        """Write the cache, keeping only rows seen in this run."""
+        if not self.path:
+            return
+        self._all[self._key] = {h: self._entries[h] for h in self._used if h in self._entries}
+        # Write beside it and swap in, so a concurrent reader never sees half a file
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._all, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp, self.path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
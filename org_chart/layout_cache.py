@@ -0,0 +1,322 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from render_backend import render_bytes
+from render_scheduler import RenderJob, render_many
+
+# -------------------------------------------
+# CONFIG
+# -------------------------------------------
+LAYOUT_CACHE_FILE = ".layout_cache.json"   # shared by every chart script (None = memory only)
+BLOCK_NODES = 120    # subtrees up to this size are laid out by `dot` as one block
+NODESEP = 0.25       # inches between neighbouring boxes (dot's default), inside blocks and between them
+RANKSEP = 0.5        # inches between a row of boxes and the next
+BLOCK_ATTRS = dict(ordering="out")   # children keep sheet order; edges as the script draws them
+BLOCK_FALLBACKS = [("dot", {})]
+ARROW_LENGTH = 7.0   # points: Graphviz's 10pt arrowhead at arrowsize=0.7
+POINTS = 72.0
+
+
+# -------------------------------------------
+# TREE HELPERS
+# -------------------------------------------
+def local_layout(width, kids, nodesep):
+    """
+    kids: (subtree width, node centre within it) per child, in order.
+    Returns (subtree width, node centre, child subtree left edges).
+    """
+    if not kids:
+        return width, width / 2, ()
+    lefts, x = [], 0.0
+    for kid_width, _ in kids:
+        lefts.append(x)
+        x += kid_width + nodesep
+    first = lefts[0] + kids[0][1]
+    last = lefts[-1] + kids[-1][1]
+    centre = (first + last) / 2
+    shift = max(0.0, width / 2 - centre)   # a node wider than its team
+    block = lefts[-1] + kids[-1][0] + shift
+    return (
+        max(block, centre + shift + width / 2),
+        centre + shift,
+        tuple(left + shift for left in lefts),
+    )
+
+
+def _children(parent):
+    n = len(parent)
+    children = [[] for _ in range(n)]
+    roots = []
+    for i, p in enumerate(parent):
+        (children[p] if p >= 0 else roots).append(i)
+    return children, roots
+
+
+def _bfs(children, roots):
+    order, depth = list(roots), {r: 0 for r in roots}
+    for i in order:                     # the list grows while it is read
+        for c in children[i]:
+            depth[c] = depth[i] + 1
+            order.append(c)
+    return order, depth
+
+
+def _preorder(root, children):
+    order, stack = [], [root]
+    while stack:
+        v = stack.pop()
+        order.append(v)
+        stack.extend(reversed(children[v]))
+    return order
+
+
+# -------------------------------------------
+# GRAPHVIZ OUTPUT
+# -------------------------------------------
+def measure_nodes(source):
+    """
+    {node name: (width, height)} in inches, as Graphviz sizes each box
+    of a DOT source. neato -n with every node at the origin only
+    measures the labels; nothing is laid out.
+    """
+    start = source.index("{") + 1
+    source = f'{source[:start]}\n\tnode [pos="0,0"]{source[start:]}'
+    data = json.loads(render_bytes(source, fmt="json", engine="neato", no_op=1))
+    return {
+        o["name"]: (float(o["width"]), float(o["height"]))
+        for o in data.get("objects", []) if "width" in o
+    }
+
+
+def shift_spline(pos, dx, dy):
+    """An edge's pos attribute ('e,x,y x,y ...') moved by (dx, dy) points."""
+    points = []
+    for point in pos.split():
+        *flag, x, y = point.split(",")
+        points.append(",".join(flag + [f"{float(x) + dx:.2f}", f"{float(y) + dy:.2f}"]))
+    return " ".join(points)
+
+
+def block_source(sizes, parent_pos, nodesep=NODESEP, ranksep=RANKSEP):
+    """
+    DOT for one block in canonical form: boxes n0.. in pre-order at
+    their measured sizes, no labels (fixed-size boxes are laid out the
+    same whatever they say).
+    """
+    graph_attr = dict(rankdir="TB", nodesep=nodesep, ranksep=ranksep, **BLOCK_ATTRS)
+    lines = ["digraph {"]
+    lines.append("\tgraph [" + " ".join(f"{k}={v}" for k, v in graph_attr.items()) + "]")
+    lines.append('\tnode [shape=box fixedsize=true label=""]')
+    lines.extend(f"\tn{k} [width={w:.4f} height={h:.4f}]" for k, (w, h) in enumerate(sizes))
+    lines.extend(f"\tn{p} -> n{k}" for k, p in enumerate(parent_pos) if p >= 0)
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def parse_block(data, n):
+    """Node centres and edge splines of a laid-out block, relative to its bounding box."""
+    llx, lly, urx, ury = map(float, data["bb"].split(","))
+    name_of = {o["_gvid"]: o["name"] for o in data.get("objects", [])}
+    nodes, edges = [None] * n, [None] * n
+    for o in data.get("objects", []):
+        x, y = map(float, o["pos"].split(","))
+        nodes[int(o["name"][1:])] = [x - llx, y - lly]
+    for e in data.get("edges", []):
+        edges[int(name_of[e["head"]][1:])] = shift_spline(e["pos"], -llx, -lly)
+    return {"size": [urx - llx, ury - lly], "nodes": nodes, "edges": edges}
+
+
+# -------------------------------------------
+# LAYOUT CACHE
+# -------------------------------------------
+# Big charts are cut into blocks: subtrees of up to BLOCK_NODES people,
+# each laid out by `dot` on its own. A block's layout is stored under a
+# hash of its shape (tree, child order, exact box sizes) and reused
+# wherever that shape recurs: in later runs, and across repeated team
+# templates within one run. Only new shapes go back to Graphviz. The managers above the blocks are placed by local_layout,
+# each centred over its team, and everything is drawn with neato -n2.
+class LayoutCache:
+    """
+    Graphviz layouts of subtrees that survive between runs (and are
+    shared by every chart script), stitched into one pinned chart.
+    """
+
+    def __init__(self, path=LAYOUT_CACHE_FILE, block_nodes=BLOCK_NODES,
+                 nodesep=NODESEP, ranksep=RANKSEP):
+        self.path = path
+        self.block_nodes = block_nodes
+        self.nodesep = nodesep
+        self.ranksep = ranksep
+        self._entries = {}   # block hash -> parse_block result
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self._entries = json.load(f)
+                if not isinstance(self._entries, dict):
+                    raise TypeError(type(self._entries).__name__)
+            except Exception:   # truncated, foreign or from an incompatible version
+                print(f"[WARN] Ignoring unreadable layout cache {path}")
+                self._entries = {}
+        self._used = set()
+        self.reused = 0      # blocks whose shape was in the cache
+        self.shared = 0      # copies of a shape laid out earlier in this run
+        self.laid_out = 0    # distinct shapes sent to Graphviz
+
+    def _blocks(self, children, order, sizes):
+        """Rows that root a block, and the rows above every block."""
+        n_below = np.ones(len(sizes), dtype=np.int64)
+        for i in reversed(order):
+            for c in children[i]:
+                n_below[i] += n_below[c]
+        blocks, spine = [], []
+        inside = np.zeros(len(sizes), dtype=bool)
+        for i in order:
+            if inside[i]:
+                continue
+            if 1 < n_below[i] <= self.block_nodes:
+                rows = _preorder(i, children)
+                inside[rows] = True
+                blocks.append(rows)
+            else:
+                spine.append(i)
+        return blocks, spine
+
+    def _block_layouts(self, blocks, parent, sizes):
+        """
+        parse_block result per block. The key is the block's shape alone
+        (tree and exact box sizes), so a repeated team template is laid
+        out once and every copy, in this run or a later one, reuses it.
+        """
+        layouts, sources, missing = [None] * len(blocks), {}, {}
+        for b, rows in enumerate(blocks):
+            pos_of = {row: k for k, row in enumerate(rows)}
+            parent_pos = [pos_of.get(parent[row], -1) for row in rows]
+            source = block_source([sizes[row] for row in rows], parent_pos, self.nodesep, self.ranksep)
+            key = hashlib.blake2b(source.encode("utf-8"), digest_size=16).hexdigest()
+            if key in self._entries:
+                layouts[b] = self._entries[key]
+                self.reused += 1
+            elif key in missing:
+                missing[key].append(b)
+                self.shared += 1
+            else:
+                sources[key] = source
+                missing[key] = [b]
+            self._used.add(key)
+
+        jobs = [RenderJob(source, None, fmt="json") for source in sources.values()]
+        for key, result in zip(sources, render_many(jobs, fallbacks=BLOCK_FALLBACKS)):
+            if not result.ok:
+                raise RuntimeError(f"block layout failed: {result.error}")
+            entry = self._entries[key] = parse_block(json.loads(result.data), len(blocks[missing[key][0]]))
+            for b in missing[key]:
+                layouts[b] = entry
+            self.laid_out += 1
+        return layouts
+
+    def layout(self, ids, parent, sizes):
+        """
+        Pinned positions for a forest given as parallel lists (parent[i]
+        is an index, -1 for a root; children keep their index order;
+        sizes are (width, height) in inches, see measure_nodes). Returns
+        {id: (x, y)} box centres in points, y pointing up as Graphviz
+        expects, and {id: pos} of the edge into each box.
+        """
+        children, roots = _children(parent)
+        order, depth = _bfs(children, roots)
+        blocks, spine = self._blocks(children, order, sizes)
+        layouts = self._block_layouts(blocks, parent, sizes)
+        block_of = {rows[0]: b for b, rows in enumerate(blocks)}
+        nodesep, ranksep = self.nodesep * POINTS, self.ranksep * POINTS
+
+        # Bottom-up over the managers above the blocks; a block is one wide
+        # child, centred on its top box
+        sub_width, centre, lefts = {}, {}, {}
+        for b, rows in enumerate(blocks):
+            sub_width[rows[0]] = layouts[b]["size"][0]
+            centre[rows[0]] = layouts[b]["nodes"][0][0]
+        for i in reversed(spine):
+            kids = [(sub_width[c], centre[c]) for c in children[i]]
+            sub_width[i], centre[i], lefts[i] = local_layout(sizes[i][0] * POINTS, kids, nodesep)
+
+        # Rows for the managers and the tops of the blocks
+        tops = spine + list(block_of)
+        n_rows = max(depth[i] for i in tops) + 1
+        row_height = np.zeros(n_rows)
+        for i in tops:
+            row_height[depth[i]] = max(row_height[depth[i]], sizes[i][1] * POINTS)
+        row_top = np.concatenate([[0.0], np.cumsum(row_height + ranksep)])
+
+        # Top-down, y measured downwards from the top row
+        left = {}
+        x = 0.0
+        for r in roots:
+            left[r] = x
+            x += sub_width[r] + nodesep
+        down, shifts = {}, []
+        for i in spine:
+            for c, offset in zip(children[i], lefts[i]):
+                left[c] = left[i] + offset
+            down[i] = (left[i] + centre[i], row_top[depth[i]] + row_height[depth[i]] / 2)
+        for top, b in block_of.items():
+            entry = layouts[b]
+            x0, y0 = entry["nodes"][0]
+            y_top = row_top[depth[top]] + row_height[depth[top]] / 2
+            shifts.append((b, left[top], y_top + y0))   # block y is up: down = shift - y
+            for row, (x, y) in zip(blocks[b], entry["nodes"]):
+                down[row] = (left[top] + x, y_top + y0 - y)
+        height = max(y + sizes[i][1] * POINTS / 2 for i, (_, y) in down.items())
+
+        # Flip to Graphviz's y-up coordinates
+        positions = {ids[i]: (float(x), float(height - y)) for i, (x, y) in down.items()}
+        edges = {}
+        for b, dx, y_shift in shifts:
+            for row, pos in zip(blocks[b], layouts[b]["edges"]):
+                if pos:
+                    edges[ids[row]] = shift_spline(pos, dx, height - y_shift)
+        for i in spine:
+            elbow = height - (row_top[depth[i] + 1] - ranksep / 2)
+            for c in children[i]:
+                edges[ids[c]] = edge_pos(
+                    positions[ids[i]], sizes[i][1], positions[ids[c]], sizes[c][1], elbow
+                )
+        return positions, edges
+
+    def save(self):
+        """Write the cache, keeping only blocks seen in this run."""
+        if not self.path:
+            return
+        used = {key: self._entries[key] for key in self._used if key in self._entries}
+        tmp = f"{self.path}.{os.getpid()}.tmp"   # swapped in whole, for concurrent readers
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(used, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+
+# -------------------------------------------
+# PINNED GRAPHVIZ ATTRIBUTES
+# -------------------------------------------
+def node_pos(xy):
+    """pos attribute that neato -n2 uses as-is."""
+    return f"{xy[0]:.2f},{xy[1]:.2f}!"
+
+
+def edge_pos(tail_xy, tail_height, head_xy, head_height, elbow_y):
+    """
+    Org-chart elbow from the bottom of the manager's box, across at
+    elbow_y, to the top of the report's, as a piecewise-linear B-spline
+    with the arrowhead at the end.
+    """
+    (tx, ty), (hx, hy) = tail_xy, head_xy
+    tip = hy + head_height * POINTS / 2
+    points = [(tx, ty - tail_height * POINTS / 2), (tx, elbow_y), (hx, elbow_y), (hx, tip + ARROW_LENGTH)]
+    # Straight segments: each end doubled, each corner tripled
+    spline = points[:1] * 2 + [p for p in points[1:-1] for _ in range(3)] + points[-1:] * 2
+    return f"e,{hx:.2f},{tip:.2f} " + " ".join(f"{x:.2f},{y:.2f}" for x, y in spline)
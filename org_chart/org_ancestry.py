@@ -0,0 +1,187 @@
+import argparse
+import numpy as np
+import pandas as pd
+
+from org_graph import load_graph
+
+# -------------------------------------------
+# CONFIG
+# -------------------------------------------
+INPUT_FILE = "ideal_final_output.xlsx"
+
+
+# -------------------------------------------
+# ANCESTRY INDEX
+# -------------------------------------------
+class AncestryIndex:
+    """
+    Chain-of-command queries over an OrgGraph.
+
+    Preprocessing is O(n log n):
+    - up[k][i]   the 2^k-th manager above i (roots point to themselves)
+    - tin / size preorder position and subtree size, so "is A above B"
+                 is an O(1) interval check
+    LCA and k-th ancestor queries take O(log n) and are vectorised over
+    arrays of pairs. People stuck in a reports-to cycle are never an
+    ancestor and have no common manager with anyone.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        n = graph.n
+        depth = graph.depth
+
+        # Binary lifting table
+        max_depth = int(depth.max()) if n else 0
+        self.log = max(1, max_depth.bit_length())
+        up0 = np.where(graph.parent >= 0, graph.parent, np.arange(n))
+        self.up = [up0]
+        for _ in range(1, self.log):
+            prev = self.up[-1]
+            self.up.append(prev[prev])
+        self.top = self.up[-1][self.up[-1]] if n else up0  # root of each row's tree
+
+        # Subtree sizes, deepest level first
+        self.size = np.ones(n, dtype=np.int64)
+        for level in reversed(graph.levels[1:]):
+            np.add.at(self.size, graph.parent[level], self.size[level])
+
+        # Preorder positions, top-down: a child starts right after its parent
+        # plus the subtrees of its earlier siblings
+        self.tin = np.full(n, -1, dtype=np.int64)
+        if graph.levels:
+            roots = graph.levels[0]
+            self.tin[roots] = np.cumsum(self.size[roots]) - self.size[roots]
+        for level in graph.levels[1:]:
+            # children_of keeps siblings contiguous, so each parent is one run
+            sizes = self.size[level]
+            before = np.cumsum(sizes) - sizes
+            par = graph.parent[level]
+            run_start = np.flatnonzero(np.concatenate([[True], par[1:] != par[:-1]]))
+            run_len = np.diff(np.concatenate([run_start, [len(level)]]))
+            before -= np.repeat(before[run_start], run_len)
+            self.tin[level] = self.tin[par] + 1 + before
+
+    # ---------------------------------------
+    # Row-based (vectorised) queries
+    # ---------------------------------------
+    def is_ancestor_rows(self, a, b):
+        """True where a is b or sits above b in the chain of command."""
+        a = np.asarray(a, dtype=np.int64)
+        b = np.asarray(b, dtype=np.int64)
+        tin_a, tin_b = self.tin[a], self.tin[b]
+        return (tin_a >= 0) & (tin_b >= 0) & (tin_a <= tin_b) & (tin_b < tin_a + self.size[a])
+
+    def kth_ancestor_rows(self, rows, k):
+        """Manager k levels above each row, -1 if that is above the top."""
+        rows = np.array(rows, dtype=np.int64)
+        k = np.broadcast_to(np.asarray(k, dtype=np.int64), rows.shape).copy()
+        valid = (k <= self.graph.depth[rows]) & (self.graph.depth[rows] >= 0)
+        for bit in range(self.log):
+            step = ((k >> bit) & 1).astype(bool) & valid
+            rows[step] = self.up[bit][rows[step]]
+        return np.where(valid, rows, -1)
+
+    def lca_rows(self, a, b):
+        """Lowest common manager of each pair, -1 if there is none."""
+        a = np.array(a, dtype=np.int64)
+        b = np.array(b, dtype=np.int64)
+        depth = self.graph.depth
+
+        valid = (depth[a] >= 0) & (depth[b] >= 0) & (self.top[a] == self.top[b])
+
+        # Lift the deeper person of each pair to the same level
+        swap = depth[a] < depth[b]
+        a[swap], b[swap] = b[swap], a[swap].copy()
+        diff = np.where(valid, depth[a] - depth[b], 0)
+        for bit in range(self.log):
+            step = ((diff >> bit) & 1).astype(bool)
+            a[step] = self.up[bit][a[step]]
+
+        # Climb together while the ancestors still differ
+        for bit in reversed(range(self.log)):
+            ua, ub = self.up[bit][a], self.up[bit][b]
+            move = ua != ub
+            a[move], b[move] = ua[move], ub[move]
+
+        result = np.where(a == b, a, self.up[0][a])
+        return np.where(valid, result, -1)
+
+    def chain_rows(self, i):
+        """Row i followed by every manager up to the top."""
+        if self.graph.depth[i] < 0:
+            return np.array([i], dtype=np.int64)
+        chain = [i]
+        while self.graph.parent[chain[-1]] >= 0:
+            chain.append(self.graph.parent[chain[-1]])
+        return np.array(chain, dtype=np.int64)
+
+    # ---------------------------------------
+    # ID-based helpers
+    # ---------------------------------------
+    def _rows(self, uids):
+        rows = self.graph.indices_of(uids)
+        if (rows < 0).any():
+            missing = [u for u, r in zip(uids, rows) if r < 0]
+            raise KeyError(f"Unknown Unique Identifier(s): {missing[:5]}")
+        return rows
+
+    def _ids(self, rows):
+        return [self.graph.ids[r] if r >= 0 else None for r in rows]
+
+    def chain(self, uid):
+        """Chain of command for one person, starting with themself."""
+        return self._ids(self.chain_rows(self._rows([uid])[0]))
+
+    def is_ancestor(self, manager_id, uid):
+        return bool(self.is_ancestor_rows(*self._rows([manager_id, uid]).reshape(2, 1))[0])
+
+    def lca(self, uid_a, uid_b):
+        return self.lca_batch([uid_a], [uid_b])[0]
+
+    def lca_batch(self, uids_a, uids_b):
+        """Lowest common manager for arrays of pairs (None where unrelated)."""
+        return self._ids(self.lca_rows(self._rows(uids_a), self._rows(uids_b)))
+
+    def is_ancestor_batch(self, manager_ids, uids):
+        return self.is_ancestor_rows(self._rows(manager_ids), self._rows(uids))
+
+
+# -------------------------------------------
+# MAIN
+# -------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Chain-of-command and common-manager queries.")
+    parser.add_argument("--input", default=INPUT_FILE)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_chain = sub.add_parser("chain", help="chain of command above a person")
+    p_chain.add_argument("id")
+
+    p_lca = sub.add_parser("lca", help="lowest common manager of two people")
+    p_lca.add_argument("a")
+    p_lca.add_argument("b")
+
+    p_pairs = sub.add_parser("pairs", help="batch LCA over a CSV with columns a,b")
+    p_pairs.add_argument("csv")
+    p_pairs.add_argument("--output", default="lca_results.csv")
+
+    args = parser.parse_args()
+
+    graph = load_graph(args.input)
+    index = AncestryIndex(graph)
+
+    if args.command == "chain":
+        for depth, uid in enumerate(index.chain(args.id)):
+            print(f"{'  ' * depth}{graph.names[graph.index_of(uid)]} ({uid})")
+    elif args.command == "lca":
+        print(index.lca(args.a, args.b))
+    else:
+        pairs = pd.read_csv(args.csv, dtype=str)
+        pairs["lca"] = index.lca_batch(pairs["a"].str.strip(), pairs["b"].str.strip())
+        pairs.to_csv(args.output, index=False)
+        print(f"Saved {len(pairs)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+import argparse
+import pandas as pd
+from graphviz import Digraph
+
+from org_io import read_org
+
+# -------------------------------------------
+# CONFIG
+# -------------------------------------------
+SHEET_NAME = 0
+OUTPUT_FILE = "org_chart_changes"   # org_chart_changes.png
+RANKDIR = "TB"
+SUBTREE_DEPTH = None                # levels of unchanged reports drawn under a change (None = all)
+
+COL_ID = "Unique Identifier"
+COL_NAME = "Name"
+COL_REPORTS_TO = "Reports To"
+COL_TITLE = "Line Detail 1"
+COL_ORG = "Organization Name"
+
+# Fields compared between snapshots, and the change kind each one maps to
+TRACKED_FIELDS = {
+    COL_REPORTS_TO: "move",
+    COL_TITLE: "title",
+    COL_ORG: "department",
+}
+
+# Highlight colours per change kind (same soft palette as v3.py)
+CHANGE_COLORS = {
+    "hire": "#E8F5E9",        # light green
+    "leaver": "#FBE9E7",      # light coral
+    "move": "#FFF3E0",        # light orange
+    "title": "#F3E5F5",       # light purple
+    "department": "#E0F7FA",  # light cyan
+}
+
+
+# -------------------------------------------
+# LOAD SNAPSHOT
+# -------------------------------------------
+def load_snapshot(path, sheet_name=SHEET_NAME):
+    """
+    Load one ideal_final_output.xlsx run, cleaned the same way the
+    renderers clean it. Missing values become "" so columns compare cleanly.
+    """
+    df = read_org(path, sheet_name)
+
+    for col in [COL_REPORTS_TO, COL_TITLE, COL_ORG]:
+        if col not in df.columns:
+            df[col] = ""
+
+    df = df[[COL_ID, COL_NAME, COL_REPORTS_TO, COL_TITLE, COL_ORG]].copy()
+    for col in df.columns:
+        df[col] = df[col].fillna("").astype(str).str.strip().replace({"nan": ""})
+
+    # One row per person; a duplicated ID would break the one-to-one join
+    return df.drop_duplicates(subset=[COL_ID], keep="first")
+
+
+# -------------------------------------------
+# DIFF
+# -------------------------------------------
+def diff_snapshots(old_df, new_df):
+    """
+    Compare two snapshots with a single hash join on Unique Identifier.
+
+    Returns a long table with one row per change:
+    id, name, change (hire / leaver / move / title / department),
+    old, new. A person can appear more than once (e.g. move + title).
+    """
+    merged = old_df.merge(
+        new_df,
+        on=COL_ID,
+        how="outer",
+        suffixes=("_old", "_new"),
+        indicator=True,
+        validate="one_to_one",
+    )
+
+    # Name: prefer the current snapshot, fall back to the old one for leavers
+    name = merged[f"{COL_NAME}_new"].fillna(merged[f"{COL_NAME}_old"])
+
+    parts = []
+
+    hires = merged["_merge"] == "right_only"
+    parts.append(pd.DataFrame({
+        "id": merged.loc[hires, COL_ID],
+        "name": name[hires],
+        "change": "hire",
+        "old": "",
+        "new": merged.loc[hires, f"{COL_REPORTS_TO}_new"],
+    }))
+
+    leavers = merged["_merge"] == "left_only"
+    parts.append(pd.DataFrame({
+        "id": merged.loc[leavers, COL_ID],
+        "name": name[leavers],
+        "change": "leaver",
+        "old": merged.loc[leavers, f"{COL_REPORTS_TO}_old"],
+        "new": "",
+    }))
+
+    both = merged["_merge"] == "both"
+    for col, kind in TRACKED_FIELDS.items():
+        old_vals = merged[f"{col}_old"]
+        new_vals = merged[f"{col}_new"]
+        changed = both & (old_vals != new_vals)
+        parts.append(pd.DataFrame({
+            "id": merged.loc[changed, COL_ID],
+            "name": name[changed],
+            "change": kind,
+            "old": old_vals[changed],
+            "new": new_vals[changed],
+        }))
+
+    changes = pd.concat(parts, ignore_index=True)
+    return changes.fillna("")
+
+
+def summarize_changes(changes):
+    """Count of changes per kind, in a stable order."""
+    counts = changes["change"].value_counts()
+    return {kind: int(counts.get(kind, 0)) for kind in ["hire", "leaver", *TRACKED_FIELDS.values()]}
+
+
+# -------------------------------------------
+# RENDER CHANGE-ONLY CHART
+# -------------------------------------------
+def build_label(row, extra_lines=()):
+    """Name + Title, plus any 'was: ...' lines for changed fields."""
+    lines = [row[COL_NAME]]
+    if row[COL_TITLE]:
+        lines.append(row[COL_TITLE])
+    lines.extend(extra_lines)
+    return "\n".join(lines)
+
+
+def affected_subtrees(rows, roots, max_depth=SUBTREE_DEPTH):
+    """Everyone under `roots` in one snapshot, down to max_depth levels."""
+    children = rows.groupby(COL_REPORTS_TO)[COL_ID].agg(list).to_dict()
+    seen, frontier, depth = set(), [uid for uid in roots if uid in rows.index], 0
+    while frontier and (max_depth is None or depth < max_depth):
+        frontier = [c for uid in frontier for c in children.get(uid, ()) if c not in seen]
+        seen.update(frontier)
+        depth += 1
+    return seen
+
+
+def build_change_chart(old_df, new_df, changes, title=None):
+    """
+    Draw the subtrees under everyone who changed (a moved manager brings
+    their team) plus their old/new managers as context.
+
+    Styling follows build_org_chart.py; changed people are filled with the
+    colour of their change kind, leavers and previous reporting lines are dashed.
+    """
+    old_rows = old_df.set_index(COL_ID, drop=False)
+    new_rows = new_df.set_index(COL_ID, drop=False)
+
+    changed_ids = set(changes["id"])
+    kinds_by_id = changes.groupby("id")["change"].agg(list).to_dict()
+
+    # Context: current and previous managers of everyone who changed
+    context_ids = set()
+    for uid in changed_ids:
+        for rows in (new_rows, old_rows):
+            if uid in rows.index:
+                mgr = rows.at[uid, COL_REPORTS_TO]
+                if mgr and (mgr in new_rows.index or mgr in old_rows.index):
+                    context_ids.add(mgr)
+    context_ids -= changed_ids
+
+    # Unchanged reports under a change: current team, and a leaver's old one
+    team_ids = affected_subtrees(new_rows, changed_ids) | affected_subtrees(
+        old_rows, [uid for uid in changed_ids if uid not in new_rows.index]
+    )
+    team_ids -= changed_ids
+    context_ids -= team_ids
+
+    dot = Digraph(comment="Org Chart (Changes)", format="png")
+    dot.attr(rankdir=RANKDIR)
+    if title:
+        dot.attr(label=title, labelloc="t", fontsize="12", fontname="Helvetica")
+    dot.attr(
+        "node",
+        shape="box",
+        style="rounded,filled",
+        fillcolor="#f9f9f9",
+        color="#555555",
+        fontname="Helvetica",
+        fontsize="10"
+    )
+    dot.attr("edge", color="#888888", arrowsize="0.7")
+
+    def row_for(uid):
+        return new_rows.loc[uid] if uid in new_rows.index else old_rows.loc[uid]
+
+    for uid in sorted(context_ids | team_ids):
+        dot.node(uid, label=build_label(row_for(uid)))
+
+    for uid in sorted(changed_ids):
+        kinds = kinds_by_id[uid]
+        row = row_for(uid)
+
+        extra = []
+        if "title" in kinds:
+            extra.append(f"(was: {old_rows.at[uid, COL_TITLE] or '—'})")
+        if "department" in kinds:
+            extra.append(f"(dept was: {old_rows.at[uid, COL_ORG] or '—'})")
+
+        fill = CHANGE_COLORS[kinds[0]]
+        if "leaver" in kinds:
+            dot.node(uid, label=build_label(row, extra), fillcolor=fill,
+                     style="rounded,filled,dashed")
+        else:
+            dot.node(uid, label=build_label(row, extra), fillcolor=fill,
+                     style="rounded,filled,bold", penwidth="1.3")
+
+    shown = changed_ids | context_ids | team_ids
+
+    # Current reporting lines
+    for uid in shown:
+        if uid in new_rows.index:
+            mgr = new_rows.at[uid, COL_REPORTS_TO]
+            if mgr in shown:
+                dot.edge(mgr, uid)
+
+    # Previous reporting lines of movers and leavers
+    for uid in changed_ids:
+        if uid not in old_rows.index:
+            continue
+        old_mgr = old_rows.at[uid, COL_REPORTS_TO]
+        new_mgr = new_rows.at[uid, COL_REPORTS_TO] if uid in new_rows.index else None
+        if old_mgr and old_mgr != new_mgr and old_mgr in shown:
+            dot.edge(old_mgr, uid, style="dashed", color="#bbbbbb")
+
+    return dot
+
+
+# -------------------------------------------
+# MAIN
+# -------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare two org snapshots and chart only what changed."
+    )
+    parser.add_argument("old", help="previous ideal_final_output.xlsx")
+    parser.add_argument("new", help="current ideal_final_output.xlsx")
+    parser.add_argument("--output", default=OUTPUT_FILE,
+                        help="chart filename without extension")
+    parser.add_argument("--format", default="png", help="png, svg or pdf")
+    parser.add_argument("--csv", help="also write the change list to this CSV file")
+    args = parser.parse_args()
+
+    old_df = load_snapshot(args.old)
+    new_df = load_snapshot(args.new)
+    changes = diff_snapshots(old_df, new_df)
+
+    counts = summarize_changes(changes)
+    summary = ", ".join(f"{n} {kind}" for kind, n in counts.items())
+    print(f"[INFO] {summary}")
+
+    if args.csv:
+        changes.to_csv(args.csv, index=False)
+        print(f"[INFO] Change list saved: {args.csv}")
+
+    if changes.empty:
+        print("[INFO] No changes – nothing to render.")
+        return
+
+    dot = build_change_chart(old_df, new_df, changes, title=f"Changes: {summary}")
+    dot.format = args.format
+    output_path = dot.render(filename=args.output, cleanup=True)
+    print(f"Change chart generated: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
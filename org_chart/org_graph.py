@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+
+from org_io import load_org
+
+# -------------------------------------------
+# CONFIG
+# -------------------------------------------
+INPUT_FILE = "ideal_final_output.xlsx"
+SHEET_NAME = 0
+
+# Columns (adjust if your file uses different names)
+COL_ID = "Unique Identifier"
+COL_NAME = "Name"
+COL_REPORTS_TO = "Reports To"
+COL_TITLE = "Line Detail 1"
+COL_ORG = "Organization Name"
+
+
+# -------------------------------------------
+# LOAD DATA
+# -------------------------------------------
+def load_org_frame(path=INPUT_FILE, sheet_name=SHEET_NAME):
+    """
+    Read ideal_final_output.xlsx and clean it the way the renderers do
+    (see org_io.load_org: only the columns used, categorical titles and
+    departments).
+    """
+    return load_org(path, sheet_name)
+
+
+# -------------------------------------------
+# COLUMNAR GRAPH
+# -------------------------------------------
+class OrgGraph:
+    """
+    Reporting tree stored as flat arrays. People are rows 0..n-1:
+
+    - parent[i]     row of i's manager, -1 for roots
+    - children(i)   direct reports, via a CSR layout (child_ptr / child_idx)
+    - levels[d]     rows at depth d, so levels read top-down is a BFS order
+    - depth[i]      distance from the root, -1 if i is unreachable
+                    (only happens inside a reports-to cycle)
+    """
+
+    def __init__(self, ids, parent, names, titles, orgs):
+        self.ids = np.asarray(ids, dtype=object)
+        self.parent = np.asarray(parent, dtype=np.int64)
+        self.names = np.asarray(names, dtype=object)
+        self.titles = np.asarray(titles, dtype=object)
+        self.orgs = np.asarray(orgs, dtype=object)
+        self.n = len(self.ids)
+
+        self._index = pd.Index(self.ids)
+
+        # CSR children: stable sort keeps the spreadsheet order among siblings
+        has_parent = self.parent >= 0
+        child_rows = np.flatnonzero(has_parent)
+        order = np.argsort(self.parent[child_rows], kind="stable")
+        self.child_idx = child_rows[order]
+        counts = np.bincount(self.parent[child_rows], minlength=self.n)
+        self.child_ptr = np.concatenate([[0], np.cumsum(counts)])
+
+        self.roots = np.flatnonzero(~has_parent)
+
+        # Top-down level sweep; rows caught in a cycle are never reached
+        self.depth = np.full(self.n, -1, dtype=np.int64)
+        self.levels = []
+        frontier = self.roots
+        while frontier.size:
+            self.depth[frontier] = len(self.levels)
+            self.levels.append(frontier)
+            frontier = self.children_of(frontier)
+
+        self.order = (
+            np.concatenate(self.levels) if self.levels else np.empty(0, dtype=np.int64)
+        )
+
+    def __len__(self):
+        return self.n
+
+    def index_of(self, uid):
+        """Row of a Unique Identifier, or -1 if unknown."""
+        return int(self._index.get_indexer([uid])[0])
+
+    def indices_of(self, uids):
+        """Vectorised index_of for an array of identifiers."""
+        return self._index.get_indexer(list(uids))
+
+    def children(self, i):
+        return self.child_idx[self.child_ptr[i]:self.child_ptr[i + 1]]
+
+    def children_of(self, rows):
+        """All direct reports of every row in `rows`, concatenated."""
+        rows = np.asarray(rows, dtype=np.int64)
+        starts = self.child_ptr[rows]
+        counts = self.child_ptr[rows + 1] - starts
+        total = int(counts.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.int64)
+        offsets = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        return self.child_idx[offsets + np.arange(total)]
+
+    def subtree(self, i):
+        """Row i plus everyone below it, in BFS order."""
+        parts = []
+        frontier = np.array([i], dtype=np.int64)
+        while frontier.size:
+            parts.append(frontier)
+            frontier = self.children_of(frontier)
+        return np.concatenate(parts)
+
+
+def build_graph(df):
+    """
+    Build an OrgGraph from a cleaned frame (see load_org_frame).
+
+    Managers that are not in the frame, and self-references, are treated
+    as roots, matching convert_to_json.py.
+    """
+    df = df.drop_duplicates(subset=[COL_ID], keep="first")
+    ids = df[COL_ID].to_numpy(dtype=object)
+
+    parent = pd.Index(ids).get_indexer(df[COL_REPORTS_TO].to_numpy(dtype=object))
+    parent = parent.astype(np.int64)
+    parent[parent == np.arange(len(ids))] = -1
+
+    def text_column(col):
+        if col not in df.columns:
+            return np.full(len(df), "", dtype=object)
+        return df[col].fillna("").astype(str).str.strip().to_numpy(dtype=object)
+
+    return OrgGraph(
+        ids,
+        parent,
+        text_column(COL_NAME),
+        text_column(COL_TITLE),
+        text_column(COL_ORG),
+    )
+
+
+def load_graph(path=INPUT_FILE, sheet_name=SHEET_NAME):
+    return build_graph(load_org_frame(path, sheet_name))
+
+
+def synthetic_graph(n, seed=0):
+    """Random n-person tree for benchmarks: each person reports to someone listed before them."""
+    rng = np.random.default_rng(seed)
+    parent = np.full(n, -1, dtype=np.int64)
+    parent[1:] = (rng.random(n - 1) * np.arange(1, n)).astype(np.int64)
+    ids = np.array([f"{i}_Person,_{i}" for i in range(n)], dtype=object)
+    names = np.array([f"Person, {i}" for i in range(n)], dtype=object)
+    blank = np.full(n, "", dtype=object)
+    return OrgGraph(ids, parent, names, blank, blank)
@@ -0,0 +1,243 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+try:
+    import xlsxwriter  # constant-memory XLSX writer
+except ImportError:
+    xlsxwriter = None
+
+try:
+    import pyarrow  # noqa: F401  (Parquet engine for the sidecar)
+    HAVE_PARQUET = True
+except ImportError:
+    try:
+        import fastparquet  # noqa: F401
+        HAVE_PARQUET = True
+    except ImportError:
+        HAVE_PARQUET = False
+
+# -------------------------------------------
+# CONFIG
+# -------------------------------------------
+SHEET_TITLE = "Sheet1"   # what df.to_excel used to write
+XLSX_MAX_ROWS = 1048576  # Excel's sheet limit, header included
+
+COL_ID = "Unique Identifier"
+COL_NAME = "Name"
+COL_REPORTS_TO = "Reports To"
+COL_TITLE = "Line Detail 1"
+COL_ORG = "Organization Name"
+
+# The only columns the chart scripts use
+ORG_COLUMNS = [COL_ID, COL_NAME, COL_REPORTS_TO, COL_TITLE, COL_ORG]
+# Few distinct values repeated thousands of times
+CATEGORY_COLUMNS = [COL_TITLE, COL_ORG]
+
+
+# -------------------------------------------
+# HELPERS
+# -------------------------------------------
+def sidecar_path(xlsx_path):
+    """ideal_final_output.xlsx -> ideal_final_output.parquet"""
+    return os.path.splitext(xlsx_path)[0] + ".parquet"
+
+
+def _cell(value):
+    return None if pd.isna(value) else value
+
+
+def _rows(df):
+    for row in df.itertuples(index=False, name=None):
+        yield [_cell(v) for v in row]
+
+
+# -------------------------------------------
+# WRITE
+# -------------------------------------------
+def write_xlsx_rows(columns, rows, path, sheet_title=SHEET_TITLE):
+    """
+    Stream rows (lists of cell values, None for blank) to an XLSX file
+    instead of building the workbook in memory: xlsxwriter's
+    constant_memory mode when it is installed, openpyxl's write-only
+    mode otherwise.
+    """
+    if xlsxwriter is not None:
+        workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+        sheet = workbook.add_worksheet(sheet_title)
+        sheet.write_row(0, 0, [str(c) for c in columns])
+        for r, row in enumerate(rows, start=1):
+            sheet.write_row(r, 0, row)
+        workbook.close()
+        return
+
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(sheet_title)
+    sheet.append([str(c) for c in columns])
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+
+
+def write_xlsx(df, path):
+    write_xlsx_rows(df.columns, _rows(df), path)
+
+
+def write_sidecar(df, xlsx_path):
+    """Parquet copy next to the workbook; returns its path, or None without a Parquet engine."""
+    if not HAVE_PARQUET:
+        return None
+    out = df.copy()
+    for col in out.columns:
+        if out[col].dtype == object:
+            # Mixed int/str columns (IDs) cannot be stored in one Parquet type
+            out[col] = out[col].map(lambda v: v if v is None or isinstance(v, str) or pd.isna(v) else str(v))
+    path = sidecar_path(xlsx_path)
+    out.to_parquet(path, index=False)
+    return path
+
+
+def write_output(df, path):
+    """
+    Write the human-facing XLSX and, in the same call, the Parquet sidecar
+    that the chart scripts read first. The sidecar is written after the
+    workbook, so its newer mtime marks it as current.
+    """
+    write_xlsx(df, path)
+    sidecar = write_sidecar(df, path)
+    if sidecar is None:
+        print("[WARN] pyarrow / fastparquet not installed; no Parquet sidecar written")
+    return sidecar
+
+
+# -------------------------------------------
+# READ
+# -------------------------------------------
+def _read_sidecar(sidecar, columns=None):
+    """The sidecar's columns, or those of `columns` it has."""
+    if columns is None:
+        return pd.read_parquet(sidecar)
+    try:
+        return pd.read_parquet(sidecar, columns=columns)
+    except (KeyError, ValueError):   # a requested column is not in the file
+        df = pd.read_parquet(sidecar)
+        return df[[c for c in columns if c in df.columns]]
+
+
+def read_org(path, sheet_name=0, columns=None):
+    """
+    Read the org workbook, preferring its Parquet sidecar when the sidecar
+    is at least as new as the workbook (a hand-edited XLSX wins).
+    columns, if given, reads only those (missing ones are skipped). An
+    unreadable sidecar is ignored and the workbook read instead.
+    """
+    sidecar = sidecar_path(path)
+    if (
+        HAVE_PARQUET
+        and sheet_name in (0, SHEET_TITLE)
+        and os.path.exists(sidecar)
+        and os.path.getmtime(sidecar) >= os.path.getmtime(path)
+    ):
+        try:
+            df = _read_sidecar(sidecar, columns)
+        except Exception as e:
+            print(f"[WARN] Ignoring unreadable sidecar {sidecar} ({e}); reading the workbook")
+        else:
+            return df.where(df.notna(), float("nan"))   # blanks read back as NaN, like Excel
+
+    usecols = (lambda c: c in columns) if columns is not None else None
+    return pd.read_excel(path, sheet_name=sheet_name, usecols=usecols)
+
+
+def add_id_codes(df):
+    """
+    Integer codes for people: "ID Code" is the row's position among the
+    IDs, "Reports To Code" the manager's code (-1 for none / unknown).
+    Re-run after anything that changes IDs or managers (e.g. check_org).
+    """
+    codes, uniques = pd.factorize(df[COL_ID])
+    df["ID Code"] = codes.astype(np.int32)
+    df["Reports To Code"] = uniques.get_indexer(df[COL_REPORTS_TO].to_numpy(dtype=object)).astype(np.int32)
+    return df
+
+
+def load_org(path, sheet_name=0, report=False):
+    """
+    Shared loader: only ORG_COLUMNS, cleaned the way the renderers clean
+    them (string IDs, stripped names, missing managers as NA, "" for
+    missing titles / departments), with managers, titles and departments
+    stored as categoricals and integer ID codes added.
+    """
+    df = clean_org_frame(read_org(path, sheet_name, columns=ORG_COLUMNS))
+    if report:
+        memory_report(df, path)
+    return df
+
+
+def clean_org_frame(df):
+    """load_org's cleaning for a frame that is already in memory."""
+    df = df[[c for c in ORG_COLUMNS if c in df.columns]].copy()
+
+    df[COL_ID] = df[COL_ID].astype(str).str.strip()
+    df[COL_NAME] = df[COL_NAME].astype(str).str.strip()
+
+    if COL_REPORTS_TO in df.columns:
+        df[COL_REPORTS_TO] = (
+            df[COL_REPORTS_TO]
+            .astype(str)
+            .str.strip()
+            .replace({"nan": None, "None": None, "": None})
+            .astype("category")   # each manager's ID is stored once
+        )
+    else:
+        df[COL_REPORTS_TO] = None
+
+    for col in CATEGORY_COLUMNS:
+        if col not in df.columns:
+            df[col] = ""
+        df[col] = df[col].fillna("").astype(str).str.strip().astype("category")
+
+    add_id_codes(df)
+    return df
+
+
+def memory_report(df, label="frame"):
+    """Print the frame's deep memory footprint, total and per column."""
+    usage = df.memory_usage(index=False, deep=True)
+    total = int(usage.sum())
+    per_row = total / max(len(df), 1)
+    print(f"[INFO] {label}: {len(df)} rows, {total / 1e6:.1f} MB ({per_row:.0f} bytes/row)")
+    for col, size in usage.sort_values(ascending=False).items():
+        print(f"[INFO]   {col:<20} {size / 1e6:8.2f} MB  {df[col].dtype}")
+    return total
+
+
+# -------------------------------------------
+# MAIN
+# -------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Compare the full read with the shared loader.")
+    parser.add_argument("--input", default="ideal_final_output.xlsx")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    full = read_org(args.input)
+    full_seconds = time.perf_counter() - start
+    full_bytes = memory_report(full, "read_org (all columns)")
+
+    start = time.perf_counter()
+    slim = load_org(args.input)
+    slim_seconds = time.perf_counter() - start
+    slim_bytes = memory_report(slim, "load_org")
+
+    print(f"[INFO] {full_bytes / max(slim_bytes, 1):.1f}x smaller; "
+          f"read {full_seconds:.2f}s vs load {slim_seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+import argparse
+import json
+import numpy as np
+import pandas as pd
+
+from org_graph import load_graph
+
+# -------------------------------------------
+# CONFIG
+# -------------------------------------------
+INPUT_FILE = "ideal_final_output.xlsx"
+OUTPUT_CSV = "org_metrics.csv"
+OUTPUT_JSON = "org_metrics.json"
+
+
+# -------------------------------------------
+# ONE BOTTOM-UP PASS
+# -------------------------------------------
+def compute_metrics(graph, by_department=True):
+    """
+    Per-person metrics for the whole org in one bottom-up sweep.
+
+    Every array is indexed by graph row:
+    - depth           levels below the top (root = 0)
+    - direct_reports  span of control
+    - subtree_size    headcount including the person themself
+    - leaf_count      people without reports in the subtree
+    - height          levels below the person (0 for leaves)
+    - dept_counts     headcount per department in each subtree, as a long
+                      frame (row, dept, count) of the non-zero entries only;
+                      dept indexes `departments`
+
+    Rows unreachable from a root (reports-to cycles) keep their own
+    values only; run org_validate.py to find them.
+    """
+    n = graph.n
+    parent = graph.parent
+
+    direct_reports = np.diff(graph.child_ptr)
+    subtree_size = np.ones(n, dtype=np.int64)
+    leaf_count = (direct_reports == 0).astype(np.int64)
+    height = np.zeros(n, dtype=np.int64)
+
+    departments, dept_codes = None, None
+    dept_counts = None
+    if by_department:
+        dept_codes, departments = pd.factorize(pd.Series(graph.orgs).replace("", "Unknown"))
+        dept_counts = subtree_dept_counts(graph, dept_codes, len(departments))
+
+    # Deepest level first: every child is final before it is added to its parent
+    for level in reversed(graph.levels[1:]):
+        up = parent[level]
+        np.add.at(subtree_size, up, subtree_size[level])
+        np.add.at(leaf_count, up, leaf_count[level])
+        np.maximum.at(height, up, height[level] + 1)
+
+    return {
+        "depth": graph.depth,
+        "direct_reports": direct_reports,
+        "subtree_size": subtree_size,
+        "leaf_count": leaf_count,
+        "height": height,
+        "departments": None if departments is None else list(departments),
+        "dept_codes": dept_codes,
+        "dept_counts": dept_counts,
+    }
+
+
+def subtree_dept_counts(graph, dept_codes, n_departments):
+    """
+    (row, dept, count) for every department present in every subtree.
+    Each person is counted at themself and each manager above them, so
+    the work is the sum of depths and the result only holds non-zero
+    pairs, instead of an (n, n_departments) matrix.
+    """
+    rows = np.flatnonzero(graph.depth >= 0)
+    codes = dept_codes[rows]
+    ancestors = rows.copy()
+    keys = []
+    while rows.size:
+        keys.append(ancestors * n_departments + codes)
+        ancestors = graph.parent[ancestors]
+        keep = ancestors >= 0
+        ancestors, codes, rows = ancestors[keep], codes[keep], rows[keep]
+
+    cycle = np.flatnonzero(graph.depth < 0)   # own department only
+    keys.append(cycle * n_departments + dept_codes[cycle])
+
+    keys, counts = np.unique(np.concatenate(keys), return_counts=True)
+    return pd.DataFrame({
+        "row": keys // n_departments,
+        "dept": keys % n_departments,
+        "count": counts,
+    })
+
+
+# -------------------------------------------
+# QUERIES
+# -------------------------------------------
+def org_summary(graph, metrics):
+    """Headline numbers: headcount, max depth, managers, average span."""
+    reports = metrics["direct_reports"]
+    managers = reports > 0
+    return {
+        "headcount": int(graph.n),
+        "roots": int(len(graph.roots)),
+        "max_depth": int(metrics["depth"].max()) if graph.n else 0,
+        "managers": int(managers.sum()),
+        "avg_span_of_control": float(reports[managers].mean()) if managers.any() else 0.0,
+        "max_span_of_control": int(reports.max()) if graph.n else 0,
+    }
+
+
+def metrics_frame(graph, metrics):
+    """One row per person, ready for CSV export or sorting."""
+    return pd.DataFrame({
+        "id": graph.ids,
+        "name": graph.names,
+        "title": graph.titles,
+        "department": graph.orgs,
+        "depth": metrics["depth"],
+        "direct_reports": metrics["direct_reports"],
+        "headcount": metrics["subtree_size"],
+        "leaf_count": metrics["leaf_count"],
+        "height": metrics["height"],
+    })
+
+
+def department_rollup(graph, metrics):
+    """Per department: headcount, managers, average span and deepest level."""
+    frame = metrics_frame(graph, metrics)
+    frame["department"] = frame["department"].replace("", "Unknown")
+    frame["is_manager"] = frame["direct_reports"] > 0
+    managers = frame[frame["is_manager"]]
+
+    rollup = frame.groupby("department").agg(
+        headcount=("id", "size"),
+        managers=("is_manager", "sum"),
+        max_depth=("depth", "max"),
+    )
+    rollup["avg_span_of_control"] = (
+        managers.groupby("department")["direct_reports"].mean().reindex(rollup.index).fillna(0.0)
+    )
+    return rollup.reset_index()
+
+
+def label_suffix(metrics, i):
+    """Short annotation for chart labels, e.g. '4 direct · 23 total'."""
+    direct = int(metrics["direct_reports"][i])
+    if direct == 0:
+        return ""
+    return f"{direct} direct · {int(metrics['subtree_size'][i]) - 1} total"
+
+
+# -------------------------------------------
+# EXPORT
+# -------------------------------------------
+def export_csv(graph, metrics, path=OUTPUT_CSV):
+    metrics_frame(graph, metrics).to_csv(path, index=False)
+
+
+def export_json(graph, metrics, path=OUTPUT_JSON):
+    """Summary, department rollup and per-person metrics in one JSON file."""
+    people = metrics_frame(graph, metrics).to_dict(orient="records")
+
+    if metrics["dept_counts"] is not None:
+        departments = metrics["departments"]
+        for person in people:
+            person["departments"] = {}
+        counts = metrics["dept_counts"]
+        for row, dept, count in zip(counts["row"].tolist(), counts["dept"].tolist(), counts["count"].tolist()):
+            people[row]["departments"][departments[dept]] = count
+
+    payload = {
+        "summary": org_summary(graph, metrics),
+        "departments": department_rollup(graph, metrics).to_dict(orient="records"),
+        "people": people,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, default=int)
+
+
+# -------------------------------------------
+# MAIN
+# -------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Org metrics: span, depth, headcount per subtree.")
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--csv", default=OUTPUT_CSV)
+    parser.add_argument("--json", default=OUTPUT_JSON)
+    parser.add_argument("--top", type=int, default=10, help="print the N largest teams")
+    args = parser.parse_args()
+
+    graph = load_graph(args.input)
+    metrics = compute_metrics(graph)
+
+    for key, value in org_summary(graph, metrics).items():
+        print(f"[INFO] {key}: {value}")
+
+    frame = metrics_frame(graph, metrics)
+    largest = frame[frame["direct_reports"] > 0].nlargest(args.top, "headcount")
+    print(largest[["name", "direct_reports", "headcount", "height"]].to_string(index=False))
+
+    export_csv(graph, metrics, args.csv)
+    export_json(graph, metrics, args.json)
+    print(f"Saved {args.csv} and {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+import argparse
+import re
+import time
+import numpy as np
+import pandas as pd
+
+from org_graph import load_graph
+
+# -------------------------------------------
+# CONFIG
+# -------------------------------------------
+INPUT_FILE = "ideal_final_output.xlsx"
+DEFAULT_LIMIT = 10
+MAX_VERIFY = 500    # trigram candidates checked per query
+
+# Ranking: higher wins, best match per person counts
+SCORE_EXACT_NAME = 100
+SCORE_NAME_PREFIX = 80      # "koyo, k" -> "Koyo, Karl Delors"
+SCORE_NAME_WORD = 60        # "karl"    -> "Koyo, Karl Delors"
+SCORE_NAME_SUBSTRING = 40   # "arl de"  -> "Koyo, Karl Delors"
+SCORE_TITLE_WORD = 20
+SCORE_TITLE_SUBSTRING = 10
+
+KIND_SCORES = [SCORE_NAME_PREFIX, SCORE_NAME_WORD, SCORE_TITLE_WORD]
+
+WORD_SPLIT = re.compile(r"[^\w]+")
+
+
+# -------------------------------------------
+# HELPERS
+# -------------------------------------------
+def normalize(s):
+    return " ".join(str(s).casefold().split())
+
+
+def _trigram_codes(text_codes):
+    """Pack each run of three UTF-32 code points into one int64."""
+    c = text_codes.astype(np.int64)
+    return (c[:-2] << 42) | (c[1:-1] << 21) | c[2:]
+
+
+# -------------------------------------------
+# NAME INDEX
+# -------------------------------------------
+class NameIndex:
+    """
+    Search index over casefolded "Last, First" names and titles, built once
+    per snapshot:
+
+    - a sorted prefix array of the full name plus every name / title word,
+      answered with two binary searches
+    - trigram posting lists (CSR over packed trigram codes) for substring
+      matches anywhere in the name or title
+
+    lookup() returns rows ranked by how well they match.
+    """
+
+    def __init__(self, names, titles=None):
+        names = pd.Series(list(names), dtype=object).fillna("").map(normalize)
+        if titles is None:
+            titles = pd.Series([""] * len(names), dtype=object)
+        titles = pd.Series(list(titles), dtype=object).fillna("").map(normalize)
+
+        self.n = len(names)
+        self.names = names.to_numpy(dtype=object)
+        self.titles = titles.to_numpy(dtype=object)
+        self._name_len = np.array([len(s) for s in self.names], dtype=np.int64)
+
+        # Prefix array per kind (full name, name word, title word), sorted by
+        # token; rank_key orders equally scored hits by name length, then row
+        rows = np.arange(self.n)
+        name_words = names.str.split(WORD_SPLIT).explode()
+        title_words = titles.str.split(WORD_SPLIT).explode()
+        self._prefix = []
+        for tokens in (names, name_words, title_words):
+            tokens = tokens[tokens.fillna("") != ""].sort_values(kind="stable")
+            token_rows = tokens.index.to_numpy(dtype=np.int64)
+            self._prefix.append((
+                tokens.to_numpy(dtype=str),
+                token_rows,
+                self._name_len[token_rows] * self.n + token_rows,
+            ))
+
+        # Trigram postings over "name\0title" per row
+        docs = [f"{a}\0{b}\0" for a, b in zip(self.names, self.titles)]
+        text = np.frombuffer("".join(docs).encode("utf-32-le"), dtype=np.uint32)
+        if len(text) >= 3:
+            doc_rows = np.repeat(rows, [len(d) for d in docs])[:-2]
+            keep = (text[:-2] != 0) & (text[1:-1] != 0) & (text[2:] != 0)
+            codes, doc_rows = _trigram_codes(text)[keep], doc_rows[keep]
+
+            # Sort by (code, row) and drop repeated trigrams within a row
+            order = np.lexsort((doc_rows, codes))
+            codes, doc_rows = codes[order], doc_rows[order]
+            fresh = np.ones(len(codes), dtype=bool)
+            fresh[1:] = (codes[1:] != codes[:-1]) | (doc_rows[1:] != doc_rows[:-1])
+            codes, doc_rows = codes[fresh], doc_rows[fresh]
+
+            self._tri_codes, starts = np.unique(codes, return_index=True)
+            self._tri_ptr = np.append(starts, len(codes))
+            self._tri_rows = doc_rows
+        else:
+            self._tri_codes = np.empty(0, dtype=np.int64)
+            self._tri_ptr = np.zeros(1, dtype=np.int64)
+            self._tri_rows = np.empty(0, dtype=np.int64)
+
+        self._short_cache = {}   # typeahead results for 1-2 character queries
+
+    @classmethod
+    def from_graph(cls, graph):
+        return cls(graph.names, graph.titles)
+
+    # ---------------------------------------
+    # Lookups
+    # ---------------------------------------
+    def _prefix_hits(self, q, limit):
+        """Top `limit` rows per kind whose token starts with q, best first."""
+        rows, scores = [], []
+        for kind, (keys, key_rows, rank_key) in enumerate(self._prefix):
+            # Probes wider than the array's dtype would force a full copy
+            width = keys.dtype.itemsize // 4
+            if len(q) > width:
+                continue
+            lo = np.searchsorted(keys, q, side="left")
+            if len(q) < width:
+                hi = np.searchsorted(keys, q + "\U0010ffff", side="left")
+            else:
+                hi = np.searchsorted(keys, q, side="right")
+            if lo == hi:
+                continue
+            ranks = rank_key[lo:hi]
+            take = min(limit * 3, hi - lo)
+            best = np.argpartition(ranks, take - 1)[:take] if take < hi - lo else np.arange(hi - lo)
+            best = best[np.argsort(ranks[best])]
+            kind_scores = np.full(len(best), KIND_SCORES[kind])
+            if kind == 0:
+                kind_scores[keys[lo + best] == q] = SCORE_EXACT_NAME
+            rows.append(key_rows[lo + best])
+            scores.append(kind_scores)
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return np.concatenate(rows), np.concatenate(scores)
+
+    def _substring_hits(self, q):
+        codes = np.unique(_trigram_codes(
+            np.frombuffer(q.encode("utf-32-le"), dtype=np.uint32)
+        ))
+        pos = np.searchsorted(self._tri_codes, codes)
+        if (pos >= len(self._tri_codes)).any() or (self._tri_codes[pos] != codes).any():
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        postings = sorted(
+            (self._tri_rows[self._tri_ptr[p]:self._tri_ptr[p + 1]] for p in pos),
+            key=len,
+        )
+        # Postings are sorted by row: probe the rarest list into the others
+        candidates = postings[0]
+        for other in postings[1:]:
+            pos = np.minimum(np.searchsorted(other, candidates), len(other) - 1)
+            candidates = candidates[other[pos] == candidates]
+            if not candidates.size:
+                break
+
+        rows, scores = [], []
+        for r in candidates[:MAX_VERIFY]:
+            if q in self.names[r]:
+                rows.append(r)
+                scores.append(SCORE_NAME_SUBSTRING)
+            elif q in self.titles[r]:
+                rows.append(r)
+                scores.append(SCORE_TITLE_SUBSTRING)
+        return np.array(rows, dtype=np.int64), np.array(scores, dtype=np.int64)
+
+    def lookup(self, query, limit=DEFAULT_LIMIT):
+        """Best matching rows for `query` as a list of (row, score)."""
+        q = normalize(query)
+        if not q:
+            return []
+        if len(q) <= 2 and (q, limit) in self._short_cache:
+            return self._short_cache[(q, limit)]
+
+        rows, scores = self._prefix_hits(q, limit)
+        if len(q) >= 3 and len(np.unique(rows)) < limit:
+            sub_rows, sub_scores = self._substring_hits(q)
+            rows = np.concatenate([rows, sub_rows])
+            scores = np.concatenate([scores, sub_scores])
+
+        hits = []
+        if rows.size:
+            # Best score per person, then rank by score, shorter names first
+            ranked = np.lexsort((rows, self._name_len[rows], -scores))
+            seen = set()
+            for i in ranked:
+                row = int(rows[i])
+                if row not in seen:
+                    seen.add(row)
+                    hits.append((row, int(scores[i])))
+                    if len(hits) == limit:
+                        break
+
+        if len(q) <= 2:
+            self._short_cache[(q, limit)] = hits
+        return hits
+
+    def find_one(self, query):
+        """Row of the best match, or -1 if nothing matches."""
+        hits = self.lookup(query, limit=1)
+        return hits[0][0] if hits else -1
+
+
+# -------------------------------------------
+# MAIN
+# -------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Search people by name or title.")
+    parser.add_argument("--input", default=INPUT_FILE)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_find = sub.add_parser("find", help="ranked name / title lookup")
+    p_find.add_argument("query")
+    p_find.add_argument("--limit", type=int, default=DEFAULT_LIMIT)
+
+    args = parser.parse_args()
+
+    graph = load_graph(args.input)
+    index = NameIndex.from_graph(graph)
+
+    start = time.perf_counter()
+    hits = index.lookup(args.query, limit=args.limit)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    for row, score in hits:
+        print(f"{score:>4}  {graph.names[row]}  —  {graph.titles[row]}  ({graph.ids[row]})")
+    print(f"[INFO] {len(hits)} match(es) in {elapsed_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+import argparse
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+from graphviz import ExecutableNotFound
+
+from org_ancestry import AncestryIndex
+from org_graph import build_graph, load_org_frame
+from org_search import NameIndex
+from org_validate import check_org
+from render_backend import render_bytes
+from team_chart import build_team_dot
+
+# -------------------------------------------
+# CONFIG
+# -------------------------------------------
+INPUT_FILE = "ideal_final_output.xlsx"
+HOST = "127.0.0.1"
+PORT = 8765
+RENDER_WORKERS = 4       # concurrent `dot` renders
+CACHE_SIZE = 256         # rendered charts kept in memory
+SEARCH_LIMIT = 20
+
+CONTENT_TYPES = {
+    "svg": "image/svg+xml",
+    "png": "image/png",
+    "pdf": "application/pdf",
+}
+
+
+# -------------------------------------------
+# WARM STATE (LOADED ONCE)
+# -------------------------------------------
+class OrgService:
+    """
+    Org graph, query indexes and rendered charts kept in memory between
+    requests. Renders run on a thread pool; concurrent requests for the
+    same chart share one render.
+    """
+
+    def __init__(self, path=INPUT_FILE, workers=RENDER_WORKERS, cache_size=CACHE_SIZE):
+        self.path = path
+        self.graph = build_graph(check_org(load_org_frame(path)))
+        self.ancestry = AncestryIndex(self.graph)
+        self.names = NameIndex.from_graph(self.graph)
+
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()   # (id, fmt, depth) -> Future of bytes
+        self._lock = threading.Lock()
+
+    def _row(self, uid):
+        i = self.graph.index_of(uid)
+        if i < 0:
+            raise KeyError(uid)
+        return i
+
+    def team_chart(self, uid, fmt="svg", max_depth=None):
+        """Rendered chart bytes for the team of `uid` (cached)."""
+        i = self._row(uid)
+        key = (uid, fmt, max_depth)
+        with self._lock:
+            future = self._cache.get(key)
+            if future is not None:
+                self._cache.move_to_end(key)
+            else:
+                future = self.pool.submit(self._render, i, fmt, max_depth)
+                self._cache[key] = future
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        try:
+            return future.result()
+        except Exception:
+            with self._lock:
+                self._cache.pop(key, None)
+            raise
+
+    def _render(self, i, fmt, max_depth):
+        dot = build_team_dot(self.graph, i, max_depth=max_depth, fmt=fmt)
+        return render_bytes(dot.source, fmt)
+
+    def chain(self, uid):
+        rows = self.ancestry.chain_rows(self._row(uid))
+        return [self.person(r) for r in rows]
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        return [
+            dict(self.person(i), score=score)
+            for i, score in self.names.lookup(query, limit=limit)
+        ]
+
+    def person(self, i):
+        return {
+            "id": self.graph.ids[i],
+            "name": self.graph.names[i],
+            "title": self.graph.titles[i],
+            "department": self.graph.orgs[i],
+        }
+
+
+# -------------------------------------------
+# HTTP HANDLER
+# -------------------------------------------
+class OrgRequestHandler(BaseHTTPRequestHandler):
+    """
+    GET /team/<id>.svg|png|pdf[?depth=N]   chart of a person's team
+    GET /chain/<id>                        chain of command as JSON
+    GET /search?q=<text>                   name / title search as JSON
+    """
+
+    service = None  # set by serve()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        path = unquote(url.path)
+        params = parse_qs(url.query)
+
+        try:
+            if path.startswith("/team/"):
+                uid, _, fmt = path[len("/team/"):].rpartition(".")
+                if fmt not in CONTENT_TYPES:
+                    return self._send_json({"error": f"unsupported format: {fmt}"}, 400)
+                depth = params.get("depth", [None])[0]
+                body = self.service.team_chart(uid, fmt, int(depth) if depth else None)
+                return self._send(body, CONTENT_TYPES[fmt])
+
+            if path.startswith("/chain/"):
+                return self._send_json(self.service.chain(path[len("/chain/"):]))
+
+            if path == "/search":
+                query = params.get("q", [""])[0]
+                return self._send_json(self.service.search(query))
+
+            self._send_json({"error": "not found"}, 404)
+        except KeyError as e:
+            self._send_json({"error": f"unknown id: {e.args[0]}"}, 404)
+        except ValueError as e:
+            self._send_json({"error": str(e)}, 400)
+        except ExecutableNotFound:
+            self._send_json({"error": "Graphviz `dot` is not installed"}, 500)
+        except Exception as e:
+            # A failed render or any other bug: answer rather than drop the connection
+            self.log_error("%s failed: %s: %s", path, type(e).__name__, e)
+            self._send_json({"error": f"{type(e).__name__}: {e}"}, 500)
+
+    def _send(self, body, content_type, status=200):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, payload, status=200):
+        self._send(json.dumps(payload).encode("utf-8"), "application/json", status)
+
+
+def serve(path=INPUT_FILE, host=HOST, port=PORT, workers=RENDER_WORKERS):
+    OrgRequestHandler.service = OrgService(path, workers=workers)
+    server = ThreadingHTTPServer((host, port), OrgRequestHandler)
+    print(f"[INFO] Loaded {OrgRequestHandler.service.graph.n} people from {path}")
+    print(f"[INFO] Serving on http://{host}:{port}  (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        OrgRequestHandler.service.pool.shutdown(wait=False)
+
+
+# -------------------------------------------
+# MAIN
+# -------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Local org chart query service.")
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=RENDER_WORKERS)
+    args = parser.parse_args()
+
+    serve(args.input, args.host, args.port, args.workers)
+
+
+if __name__ == "__main__":
+    main()
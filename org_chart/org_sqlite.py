@@ -0,0 +1,247 @@
+import argparse
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+from org_graph import load_graph, synthetic_graph
+
+# -------------------------------------------
+# CONFIG
+# -------------------------------------------
+INPUT_FILE = "ideal_final_output.xlsx"
+SQLITE_FILE = "org_data.db"
+BATCH_ROWS = 100_000      # closure rows handed to one executemany call
+
+SCHEMA = """
+CREATE TABLE people (
+    row INTEGER PRIMARY KEY,          -- OrgGraph row
+    id TEXT NOT NULL UNIQUE,          -- Unique Identifier
+    name TEXT,
+    title TEXT,
+    department TEXT,
+    manager INTEGER REFERENCES people(row),
+    depth INTEGER                     -- 0 for the top, -1 inside a reports-to cycle
+);
+CREATE TABLE closure (
+    ancestor INTEGER NOT NULL,
+    descendant INTEGER NOT NULL,
+    depth INTEGER NOT NULL,           -- levels between them; 0 is the person themselves
+    PRIMARY KEY (ancestor, descendant)
+) WITHOUT ROWID;
+"""
+
+# Created after the bulk insert; each one covers its query on its own
+INDEXES = """
+CREATE INDEX closure_chain ON closure (descendant, depth, ancestor);
+CREATE INDEX people_manager ON people (manager);
+"""
+
+# Everyone under :id (not including them), nearest levels first
+SUBTREE_SQL = """
+SELECT p.id, p.name, c.depth
+FROM people AS top
+JOIN closure AS c ON c.ancestor = top.row AND c.depth > 0
+JOIN people AS p ON p.row = c.descendant
+WHERE top.id = :id
+ORDER BY c.depth, p.row
+"""
+
+# Managers above :id, direct manager first
+CHAIN_SQL = """
+SELECT p.id, p.name, c.depth
+FROM people AS me
+JOIN closure AS c ON c.descendant = me.row AND c.depth > 0
+JOIN people AS p ON p.row = c.ancestor
+WHERE me.id = :id
+ORDER BY c.depth
+"""
+
+# The same two questions without the closure table, for the benchmark
+SUBTREE_CTE_SQL = """
+WITH RECURSIVE below(row, depth) AS (
+    SELECT row, 0 FROM people WHERE id = :id
+    UNION ALL
+    SELECT p.row, below.depth + 1 FROM people AS p JOIN below ON p.manager = below.row
+)
+SELECT p.id, p.name, below.depth
+FROM below JOIN people AS p ON p.row = below.row
+WHERE below.depth > 0
+ORDER BY below.depth, p.row
+"""
+
+CHAIN_CTE_SQL = """
+WITH RECURSIVE above(row, depth) AS (
+    SELECT manager, 1 FROM people WHERE id = :id AND manager IS NOT NULL
+    UNION ALL
+    SELECT p.manager, above.depth + 1 FROM people AS p JOIN above ON p.row = above.row
+    WHERE p.manager IS NOT NULL
+)
+SELECT p.id, p.name, above.depth
+FROM above JOIN people AS p ON p.row = above.row
+ORDER BY above.depth
+"""
+
+
+# -------------------------------------------
+# CLOSURE
+# -------------------------------------------
+def closure_pairs(graph):
+    """
+    Yield (ancestor, descendant, depth) arrays one depth at a time:
+    depth 0 pairs everyone with themselves, depth d with their manager d
+    levels up. People inside a reports-to cycle only get their self row.
+    """
+    rows = np.flatnonzero(graph.depth >= 0)
+    ancestors = rows.copy()
+    depth = 0
+    while rows.size:
+        yield ancestors, rows, depth
+        ancestors = graph.parent[ancestors]
+        keep = ancestors >= 0
+        rows, ancestors = rows[keep], ancestors[keep]
+        depth += 1
+
+    cycle = np.flatnonzero(graph.depth < 0)
+    if cycle.size:
+        yield cycle, cycle, 0
+
+
+def _batches(columns, size=BATCH_ROWS):
+    """Rows of parallel arrays as Python tuples, size at a time."""
+    for start in range(0, len(columns[0]), size):
+        yield zip(*(c[start:start + size].tolist() for c in columns))
+
+
+# -------------------------------------------
+# EXPORT
+# -------------------------------------------
+def write_sqlite(graph, path=SQLITE_FILE):
+    """
+    Replace `path` with a database of the org: people, the closure table
+    and their indexes, loaded with executemany in one transaction.
+    Returns the number of closure rows.
+    """
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    try:
+        # A fresh file is rebuilt from scratch on failure, so no journal
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.executescript(SCHEMA)
+
+        managers = np.where(graph.parent >= 0, graph.parent, -1)
+        n_closure = 0
+        with conn:   # one transaction
+            conn.executemany(
+                "INSERT INTO people VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (row, uid, name, title, org, None if mgr < 0 else mgr, depth)
+                    for row, uid, name, title, org, mgr, depth in zip(
+                        range(graph.n), graph.ids, graph.names, graph.titles,
+                        graph.orgs, managers.tolist(), graph.depth.tolist(),
+                    )
+                ),
+            )
+
+            # Primary-key order, so SQLite appends to the b-tree instead of splitting it
+            ancestors, descendants, depths = [], [], []
+            for anc, desc, depth in closure_pairs(graph):
+                ancestors.append(anc)
+                descendants.append(desc)
+                depths.append(np.full(len(anc), depth, dtype=np.int64))
+            if ancestors:
+                ancestors = np.concatenate(ancestors)
+                descendants = np.concatenate(descendants)
+                depths = np.concatenate(depths)
+                order = np.lexsort((descendants, ancestors))
+                columns = (ancestors[order], descendants[order], depths[order])
+                for batch in _batches(columns):
+                    conn.executemany("INSERT INTO closure VALUES (?, ?, ?)", batch)
+                n_closure = len(order)
+
+            for statement in filter(str.strip, INDEXES.split(";")):
+                conn.execute(statement)
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+    return n_closure
+
+
+# -------------------------------------------
+# QUERIES
+# -------------------------------------------
+def everyone_under(conn, uid):
+    """[(id, name, levels below)] for everyone under uid."""
+    return conn.execute(SUBTREE_SQL, {"id": uid}).fetchall()
+
+
+def chain_above(conn, uid):
+    """[(id, name, levels above)] from uid's manager to the top."""
+    return conn.execute(CHAIN_SQL, {"id": uid}).fetchall()
+
+
+# -------------------------------------------
+# BENCHMARK
+# -------------------------------------------
+def _time_queries(conn, sql, uids):
+    start = time.perf_counter()
+    rows = sum(len(conn.execute(sql, {"id": uid}).fetchall()) for uid in uids)
+    return (time.perf_counter() - start) / len(uids) * 1000, rows
+
+
+def benchmark(n=100_000, queries=200, path="org_bench.db", seed=0):
+    graph = synthetic_graph(n, seed)
+    start = time.perf_counter()
+    n_closure = write_sqlite(graph, path)
+    build = time.perf_counter() - start
+    print(
+        f"[INFO] {n} people, depth ≤ {graph.depth.max()}: {n_closure} closure rows, "
+        f"built in {build:.2f}s ({os.path.getsize(path) / 1e6:.1f} MB)"
+    )
+
+    rng = np.random.default_rng(seed + 1)
+    # Managers near the top have the big subtrees; anyone can be asked about
+    managers = graph.ids[rng.integers(0, min(n, 1000), queries)]
+    people = graph.ids[rng.integers(0, n, queries)]
+
+    conn = sqlite3.connect(path)
+    try:
+        print(f"{'query':<16}{'recursive CTE':>16}{'closure table':>16}{'rows':>10}")
+        for label, cte, closure, uids in (
+            ("everyone under", SUBTREE_CTE_SQL, SUBTREE_SQL, managers),
+            ("chain above", CHAIN_CTE_SQL, CHAIN_SQL, people),
+        ):
+            cte_ms, cte_rows = _time_queries(conn, cte, uids)
+            closure_ms, closure_rows = _time_queries(conn, closure, uids)
+            if cte_rows != closure_rows:
+                print(f"[WARN] {label}: CTE returned {cte_rows} rows, closure table {closure_rows}")
+            print(f"{label:<16}{cte_ms:>13.2f} ms{closure_ms:>13.2f} ms{closure_rows / len(uids):>10.0f}")
+    finally:
+        conn.close()
+        os.remove(path)
+
+
+# -------------------------------------------
+# MAIN
+# -------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Export the org to SQLite with a closure table.")
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--output", default=SQLITE_FILE)
+    parser.add_argument("--benchmark", type=int, metavar="N", help="time queries on N synthetic people instead")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark)
+        return
+
+    graph = load_graph(args.input)
+    n_closure = write_sqlite(graph, args.output)
+    print(f"Saved {args.output} ({graph.n} people, {n_closure} closure rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+import argparse
+import json
+import numpy as np
+import pandas as pd
+
+from org_graph import OrgGraph
+from org_io import read_org
+
+# -------------------------------------------
+# CONFIG
+# -------------------------------------------
+INPUT_FILE = "ideal_final_output.xlsx"
+SHEET_NAME = 0
+OUTPUT_REPORT = "org_validation.json"
+
+COL_ID = "Unique Identifier"
+COL_NAME = "Name"
+COL_REPORTS_TO = "Reports To"
+
+NULL_STRINGS = {"", "nan", "none"}
+
+# Always applied by check_org: without them a reports-to walk never ends
+TERMINATION_REPAIRS = ("self_loop", "cycle")
+# Guessed fixes (dangling manager -> name-matched ID, duplicate rows dropped)
+# change the published chart, so the renderers only apply them on request
+GUESS_REPAIRS = False
+
+
+# -------------------------------------------
+# HELPERS
+# -------------------------------------------
+def _clean_ids(series):
+    """Strings with missing values (None, NaN, '', 'nan') turned into None."""
+    s = series.astype(object).fillna("").astype(str).str.strip()
+    values = s.to_numpy(dtype=object)
+    values[s.str.lower().isin(NULL_STRINGS).to_numpy()] = None
+    return pd.Series(values, index=series.index, dtype=object)
+
+
+def name_from_id(uid):
+    """'12_Doe,_John' -> 'Doe, John' (same rule as clean_data.py)."""
+    parts = str(uid).split("_", 1)
+    if len(parts) == 2:
+        return parts[1].replace("_", " ")
+    return None
+
+
+# -------------------------------------------
+# VALIDATION (ONE PASS)
+# -------------------------------------------
+def validate_frame(df):
+    """
+    Check the reporting lines of a frame and return a structured report.
+
+    Finds, in O(n):
+    - duplicate_ids      IDs appearing on more than one row (first row wins)
+    - self_loops         people who report to themselves
+    - dangling_managers  Reports To values that are not an ID in the file,
+                         with the people (orphans) who report to them
+    - cycles             reports-to loops, each as a list of IDs
+    - cycle_dependents   people who only connect to the org through a cycle
+    - roots              people with no manager
+    Each problem comes with a suggested repair.
+    """
+    ids = _clean_ids(df[COL_ID])
+    managers = _clean_ids(df[COL_REPORTS_TO]) if COL_REPORTS_TO in df.columns else ids.map(lambda _: None)
+
+    dup_mask = ids.duplicated(keep="first").to_numpy()
+    duplicate_ids = sorted(set(ids[dup_mask]))
+
+    keep = ~dup_mask
+    ids = ids[keep].to_numpy(dtype=object)
+    managers = managers[keep].to_numpy(dtype=object)
+    n = len(ids)
+
+    parent = pd.Index(ids).get_indexer(managers).astype(np.int64)
+    has_manager = pd.notna(managers)
+
+    self_loop = parent == np.arange(n)
+    dangling = has_manager & (parent < 0)
+    parent[self_loop] = -1
+
+    # Top-down sweep from every root; whatever is not reached hangs off a cycle
+    graph = OrgGraph(ids, parent, ids, ids, ids)
+    unreached = np.flatnonzero(graph.depth < 0)
+
+    # Colour marking over the unreached rows only: 0 = new, 1 = on path, 2 = done
+    cycles = []
+    state = np.zeros(n, dtype=np.int8)
+    for start in unreached:
+        if state[start]:
+            continue
+        path = {}
+        v = start
+        while state[v] == 0:
+            state[v] = 1
+            path[v] = len(path)
+            v = parent[v]
+        if state[v] == 1 and v in path:
+            members = list(path)[path[v]:]
+            cycles.append([ids[m] for m in members])
+        for p in path:
+            state[p] = 2
+
+    in_cycle = {uid for cycle in cycles for uid in cycle}
+    cycle_dependents = [ids[i] for i in unreached if ids[i] not in in_cycle]
+
+    # Dangling managers grouped with their orphans
+    dangling_managers = {}
+    for i in np.flatnonzero(dangling):
+        dangling_managers.setdefault(managers[i], []).append(ids[i])
+
+    # Suggested repairs
+    id_by_name = {}
+    if dangling_managers:
+        for uid in ids:
+            id_by_name.setdefault(name_from_id(uid), uid)
+
+    repairs = []
+    for i in np.flatnonzero(self_loop):
+        repairs.append({"id": ids[i], "issue": "self_loop", "set_reports_to": None})
+    for mgr, orphans in dangling_managers.items():
+        # An outdated position ID often still names a person in the file
+        match = id_by_name.get(name_from_id(mgr))
+        for uid in orphans:
+            repairs.append({"id": uid, "issue": "dangling_manager",
+                            "was": mgr, "set_reports_to": match if match != uid else None})
+    for cycle in cycles:
+        # Break each loop at its first member: that person becomes a root
+        repairs.append({"id": cycle[0], "issue": "cycle",
+                        "was": managers[graph.index_of(cycle[0])], "set_reports_to": None})
+
+    roots = [ids[i] for i in np.flatnonzero(~has_manager)]
+
+    return {
+        "rows": int(len(df)),
+        "people": int(n),
+        "ok": not (duplicate_ids or self_loop.any() or dangling_managers or cycles),
+        "roots": roots,
+        "duplicate_ids": duplicate_ids,
+        "self_loops": [ids[i] for i in np.flatnonzero(self_loop)],
+        "dangling_managers": dangling_managers,
+        "cycles": cycles,
+        "cycle_dependents": cycle_dependents,
+        "repairs": repairs,
+    }
+
+
+def apply_repairs(df, report, issues=None):
+    """
+    Return a copy of df with the report's suggested repairs applied: all
+    of them, or only those whose issue is in `issues` (duplicate rows are
+    then only dropped for "duplicate_id"). Repairs go to the row the
+    validator kept for each ID, never to its duplicates.
+    """
+    if issues is None or "duplicate_id" in issues:
+        df = df.drop_duplicates(subset=[COL_ID], keep="first")
+    df = df.copy()
+    fixes = {
+        r["id"]: r["set_reports_to"] for r in report["repairs"]
+        if issues is None or r["issue"] in issues
+    }
+    if fixes:
+        uid = _clean_ids(df[COL_ID])
+        hit = uid.isin(fixes.keys()) & ~uid.duplicated(keep="first")
+        df[COL_REPORTS_TO] = df[COL_REPORTS_TO].astype(object)
+        df.loc[hit, COL_REPORTS_TO] = uid[hit].map(fixes)
+    return df
+
+
+def print_report(report):
+    print(f"[INFO] Validated {report['people']} people, {len(report['roots'])} root(s)")
+    if report["duplicate_ids"]:
+        print(f"[WARN] {len(report['duplicate_ids'])} duplicate ID(s): {report['duplicate_ids'][:5]}")
+    if report["self_loops"]:
+        print(f"[WARN] {len(report['self_loops'])} self-reporting row(s): {report['self_loops'][:5]}")
+    if report["dangling_managers"]:
+        orphans = sum(len(v) for v in report["dangling_managers"].values())
+        print(f"[WARN] {len(report['dangling_managers'])} missing manager ID(s), {orphans} orphan(s)")
+    for cycle in report["cycles"]:
+        print(f"[WARN] Reports-to cycle: {' -> '.join(cycle)} -> {cycle[0]}")
+    if report["cycle_dependents"]:
+        print(f"[WARN] {len(report['cycle_dependents'])} people only connect through a cycle")
+
+
+def check_org(df, repair=GUESS_REPAIRS):
+    """
+    Validation stage for the renderers: print the report and break
+    self-loops and cycles so they cannot hang a recursive walk. The
+    guessed repairs are only applied with repair=True; everything else
+    is drawn as it is in the file.
+    """
+    report = validate_frame(df)
+    if report["ok"]:
+        return df
+    print_report(report)
+    issues = None if repair else TERMINATION_REPAIRS
+    applied = [r for r in report["repairs"] if issues is None or r["issue"] in issues]
+    if applied:
+        print(f"[INFO] Applying {len(applied)} repair(s) for this run")
+    if not repair and len(applied) < len(report["repairs"]):
+        print(f"[INFO] {len(report['repairs']) - len(applied)} suggested repair(s) not applied "
+              f"(python org_validate.py --fix)")
+    return apply_repairs(df, report, issues)
+
+
+# -------------------------------------------
+# MAIN
+# -------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Find cycles, orphans and self-loops in an org file.")
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--report", default=OUTPUT_REPORT, help="JSON report path")
+    parser.add_argument("--fix", help="write a repaired copy of the workbook here")
+    args = parser.parse_args()
+
+    df = read_org(args.input, SHEET_NAME)
+    report = validate_frame(df)
+    print_report(report)
+
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved {args.report}")
+
+    if args.fix:
+        apply_repairs(df, report).to_excel(args.fix, index=False)
+        print(f"Saved repaired workbook: {args.fix}")
+
+
+if __name__ == "__main__":
+    main()
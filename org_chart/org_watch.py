@@ -0,0 +1,253 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+try:
+    import inotify_simple  # Linux file events; polling is used without it
+except ImportError:
+    inotify_simple = None
+
+from org_diff import COL_ID, COL_NAME, diff_snapshots, load_snapshot
+from org_graph import build_graph
+
+# -------------------------------------------
+# CONFIG
+# -------------------------------------------
+INPUT_FILE = "ideal_final_output.xlsx"
+DEBOUNCE_SECONDS = 2.0   # wait this long after the last write before rebuilding
+POLL_SECONDS = 1.0       # mtime check interval when inotify is unavailable
+WORKERS = 4              # scripts rebuilt at once
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Outputs that contain everybody: rebuilt on any change
+WHOLE_ORG_SCRIPTS = [
+    "build_org_chart.py",   # org_chart.png
+    "v2.py",                # department clusters
+    "v3.py",                # all-staff chart
+    "convert_to_json.py",   # org_data.json
+    "dept_graph.py",        # department-level chart
+]
+
+# These share .label_cache.json and .layout_cache.json, so they run one
+# after another in a single worker instead of racing on the cache files
+SHARED_CACHE_SCRIPTS = ["build_org_chart.py", "v2.py", "v3.py"]
+
+# Per-manager charts: only the managers whose team contains a changed person
+# (with PRUNE_STALE, department.py also deletes the charts of people who are no
+# longer managers)
+MANAGER_SCRIPT = "department.py"
+MANAGERS_ENV = "ORG_CHART_MANAGERS"   # newline-separated ids (ids contain commas)
+
+
+# -------------------------------------------
+# WHAT CHANGED, AND WHERE IT IS DRAWN
+# -------------------------------------------
+def changed_ids(old_df, new_df):
+    """IDs of hires, leavers, moves, title / department and name changes."""
+    ids = set(diff_snapshots(old_df, new_df)["id"])
+
+    names = old_df[[COL_ID, COL_NAME]].merge(new_df[[COL_ID, COL_NAME]], on=COL_ID)
+    ids.update(names.loc[names[f"{COL_NAME}_x"] != names[f"{COL_NAME}_y"], COL_ID])
+    return ids
+
+
+def chain_ids(graph, uids):
+    """uids plus all of their managers up to the top, as a set of ids."""
+    rows = graph.indices_of(uids)
+    frontier = np.unique(rows[rows >= 0])
+    seen = np.zeros(graph.n, dtype=bool)
+    while frontier.size:
+        seen[frontier] = True
+        frontier = graph.parent[frontier]
+        frontier = np.unique(frontier[frontier >= 0])
+        frontier = frontier[~seen[frontier]]
+    return set(graph.ids[seen])
+
+
+def affected_managers(old_df, new_df, ids):
+    """
+    Managers whose chart shows one of `ids`: everyone in their reporting
+    chain, before the change (leavers, old manager of a move) and after it.
+    """
+    old_graph, new_graph = build_graph(old_df), build_graph(new_df)
+    chain = chain_ids(old_graph, ids) | chain_ids(new_graph, ids)
+
+    managers = new_graph.ids[new_graph.child_ptr[1:] > new_graph.child_ptr[:-1]]
+    return chain & set(managers)
+
+
+# -------------------------------------------
+# REBUILD
+# -------------------------------------------
+def run_script(script, workdir, env=None):
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, os.path.join(SCRIPT_DIR, script)],
+        cwd=workdir,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        lines = (proc.stderr or proc.stdout).strip().splitlines()
+        print(f"[WARN] {script} failed after {elapsed:.1f}s: {lines[-1] if lines else proc.returncode}")
+    else:
+        print(f"[INFO] {script} rebuilt in {elapsed:.1f}s")
+    return proc.returncode
+
+
+def run_in_turn(scripts, workdir, env=None):
+    return [run_script(script, workdir, env) for script in scripts]
+
+
+def rebuild(pool, workdir, managers=None):
+    """
+    Whole-org outputs plus the affected manager charts, in parallel
+    except for the scripts that share a cache. managers=None rebuilds
+    every manager chart.
+    """
+    shared = [s for s in WHOLE_ORG_SCRIPTS if s in SHARED_CACHE_SCRIPTS]
+    groups = [shared] if shared else []
+    groups += [[s] for s in WHOLE_ORG_SCRIPTS if s not in SHARED_CACHE_SCRIPTS]
+    futures = [pool.submit(run_in_turn, group, workdir) for group in groups]
+    if managers is None:
+        futures.append(pool.submit(run_in_turn, [MANAGER_SCRIPT], workdir))
+    elif managers:
+        env = dict(os.environ, **{MANAGERS_ENV: "\n".join(sorted(managers))})
+        futures.append(pool.submit(run_in_turn, [MANAGER_SCRIPT], workdir, env))
+    return [code for f in futures for code in f.result()]
+
+
+# -------------------------------------------
+# WATCHING
+# -------------------------------------------
+def _signature(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class FileWatcher:
+    """
+    Watches `path` for the whole session: inotify events (or the last
+    seen mtime) queue up while a rebuild runs, so a save made meanwhile
+    triggers the next rebuild instead of being lost.
+    """
+
+    def __init__(self, path, debounce=DEBOUNCE_SECONDS, poll=POLL_SECONDS):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.debounce = debounce
+        self.poll = poll
+        self.inotify = None
+        if inotify_simple is not None:
+            flags = inotify_simple.flags
+            self.inotify = inotify_simple.INotify()
+            self.inotify.add_watch(
+                os.path.dirname(os.path.abspath(path)),
+                flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE,
+            )
+        self.last = _signature(path)   # what the current snapshot was read from
+
+    def wait(self):
+        """
+        Block until the file has been written since the last wait() and
+        then left alone for `debounce` seconds (Excel saves through temp
+        files and renames).
+        """
+        if self.inotify is not None:
+            while not any(e.name == self.name for e in self.inotify.read()):
+                pass
+            # Quiet period: keep draining events until none arrive
+            while self.inotify.read(timeout=int(self.debounce * 1000)):
+                pass
+            return
+
+        current = _signature(self.path)
+        while current == self.last:
+            time.sleep(self.poll)
+            current = _signature(self.path)
+        while True:
+            time.sleep(self.debounce)
+            settled = _signature(self.path)
+            if settled == current:
+                break
+            current = settled
+        self.last = current
+
+    def close(self):
+        if self.inotify is not None:
+            self.inotify.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def watch(path=INPUT_FILE, workers=WORKERS, initial_build=False):
+    workdir = os.path.dirname(os.path.abspath(path))
+    if os.path.basename(path) != INPUT_FILE:
+        print(f"[WARN] The chart scripts read {INPUT_FILE} from {workdir}, not {path}")
+    watcher = FileWatcher(path)   # before the snapshot, so no save falls in between
+    snapshot = load_snapshot(path)
+    mode = "inotify" if inotify_simple is not None else f"polling every {POLL_SECONDS:.0f}s"
+    print(f"[INFO] Watching {path} ({len(snapshot)} people, {mode}); Ctrl+C to stop")
+
+    with watcher, ThreadPoolExecutor(max_workers=workers) as pool:
+        if initial_build:
+            rebuild(pool, workdir)
+
+        while True:
+            watcher.wait()
+            try:
+                current = load_snapshot(path)
+            except (OSError, ValueError) as e:
+                print(f"[WARN] Could not read {path} yet: {e}")
+                continue
+
+            start = time.perf_counter()
+            ids = changed_ids(snapshot, current)
+            if not ids:
+                print("[INFO] Workbook saved with no people changes; nothing to rebuild")
+                snapshot = current
+                continue
+
+            managers = affected_managers(snapshot, current, ids)
+            print(
+                f"[INFO] {len(ids)} people changed → {len(WHOLE_ORG_SCRIPTS)} org-wide outputs "
+                f"+ {len(managers)} manager chart(s)"
+            )
+            rebuild(pool, workdir, managers)
+            print(f"[INFO] Up to date in {time.perf_counter() - start:.1f}s")
+            snapshot = current
+
+
+# -------------------------------------------
+# MAIN
+# -------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild charts when the workbook changes.")
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--build", action="store_true", help="rebuild everything once at start")
+    args = parser.parse_args()
+
+    try:
+        watch(args.input, args.workers, args.build)
+    except KeyboardInterrupt:
+        print("\n[INFO] Stopped watching")
+
+
+if __name__ == "__main__":
+    main()
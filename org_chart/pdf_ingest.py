@@ -0,0 +1,173 @@
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+try:
+    import pypdf  # text layer of the employee-list PDF
+except ImportError:
+    pypdf = None
+
+from org_io import write_xlsx_rows
+
+# -------------------------------------------
+# CONFIG
+# -------------------------------------------
+INPUT_FILE = "local Employee List 03-10-2025.pdf"
+OUTPUT_FILE = "employee_list.xlsx"
+SHEET_NAME = "Org Chart"         # the sheet clean_data.py reads
+WORKERS = os.cpu_count() or 4
+PAGES_PER_TASK = 8               # fewer pages than this are parsed without a pool
+
+# clean_data.py's columns first, then what the employee list adds
+ORG_COLUMNS = [
+    "Unique Identifier", "Name", "Reports To",
+    "Line Detail 1", "Line Detail 2", "Line Detail 3", "Organization Name",
+]
+EXTRA_COLUMNS = [
+    "Person Code", "Card Number", "Card Issue Date", "Card Expiry Date", "Sex", "Total Salary",
+]
+
+# A table row: Row No, Person Code, name (English then Arabic), Card
+# Number, two dates, job type (English then Arabic), sex, salary. Long
+# names wrap, so a row can span several text lines.
+ROW_START_RE = re.compile(r"^\d+ \d{6,}\b")
+ROW_RE = re.compile(
+    r"^(\d+) (\d{6,}) (.+?) (\d{6,}) (\d{2}/\d{2}/\d{4}) (\d{2}/\d{2}/\d{4}) "
+    r"(.+) (Male|Female) ([\d,]+(?:\.\d+)?)$"
+)
+ARABIC_RE = re.compile(r"[؀-ۿݐ-ݿﭐ-﷿ﹰ-﻿\x00]+")
+WRAPPED_WORDS_RE = re.compile(r"(?<=[a-z])(?=[A-Z])")   # 'ProtectionOfficer': space lost at a wrap
+
+
+# -------------------------------------------
+# PARSING
+# -------------------------------------------
+def english(text):
+    """The English half of a bilingual cell: Arabic script dropped, spaces collapsed."""
+    return " ".join(ARABIC_RE.sub(" ", text).split())
+
+
+def iso_date(text):
+    """'02/03/2024' (day first) -> '2024-03-02'."""
+    return datetime.strptime(text, "%d/%m/%Y").date().isoformat()
+
+
+def table_rows(lines):
+    """Text lines joined into whole table rows; headers and page furniture skipped."""
+    row = None
+    for line in lines:
+        line = line.strip()
+        if ROW_START_RE.match(line):
+            row = line
+        elif row is not None:
+            row = f"{row} {line}"
+        if row is not None and ROW_RE.match(row):
+            yield row
+            row = None
+
+
+def parse_row(row):
+    """Employee record for one joined table row."""
+    match = ROW_RE.match(row)
+    row_no, code, name, card, issued, expires, job, sex, salary = match.groups()
+    name = english(name)
+    salary = float(salary.replace(",", ""))
+    return [
+        f"{row_no}_{name.replace(' ', '_')}",   # same <n>_<name> form as the HR export
+        name,
+        None,                                   # the list has no reporting lines
+        WRAPPED_WORDS_RE.sub(" ", english(job)),   # job titles are Title Case
+        None,
+        None,
+        None,
+        code,
+        card,
+        iso_date(issued),
+        iso_date(expires),
+        sex,
+        int(salary) if salary.is_integer() else salary,
+    ]
+
+
+def parse_pages(path, start, stop):
+    """
+    Employee records from pages [start, stop), plus the pages that had
+    no text. Each worker opens the PDF itself; readers do not
+    pickle.
+    """
+    reader = pypdf.PdfReader(path)
+    records, blank = [], []
+    for page_no in range(start, stop):
+        text = reader.pages[page_no].extract_text() or ""
+        if not text.strip():
+            blank.append(page_no + 1)
+            continue
+        records.extend(parse_row(row) for row in table_rows(text.splitlines()))
+    return records, blank
+
+
+def page_count(path):
+    return len(pypdf.PdfReader(path).pages)
+
+
+# -------------------------------------------
+# PDF -> ROWS
+# -------------------------------------------
+def read_employee_pdf(path, workers=WORKERS, pages_per_task=PAGES_PER_TASK):
+    """
+    Every employee row in a text-based employee-list PDF, in the
+    column order of ORG_COLUMNS + EXTRA_COLUMNS. Pages are split into
+    runs of pages_per_task and parsed in parallel.
+    """
+    if pypdf is None:
+        raise RuntimeError("pypdf is needed to read the employee list (pip install pypdf)")
+
+    n_pages = page_count(path)
+    ranges = [(s, min(s + pages_per_task, n_pages)) for s in range(0, n_pages, pages_per_task)]
+    if len(ranges) <= 1 or workers <= 1:
+        parts = [parse_pages(path, s, e) for s, e in ranges]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as pool:
+            parts = list(pool.map(parse_pages, [path] * len(ranges), *zip(*ranges)))
+
+    records, blank = [], []
+    for part_records, part_blank in parts:   # pool.map keeps page order
+        records.extend(part_records)
+        blank.extend(part_blank)
+
+    if blank:
+        print(f"[WARN] No text on page(s) {', '.join(map(str, blank))}; scanned pages need OCR first")
+    row_numbers = [int(r[0].split("_", 1)[0]) for r in records]
+    missing = sorted(set(range(1, max(row_numbers, default=0) + 1)) - set(row_numbers))
+    if missing:
+        print(f"[WARN] {len(missing)} row number(s) not parsed, e.g. {missing[:10]}")
+    return records, n_pages
+
+
+# -------------------------------------------
+# MAIN
+# -------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(
+        description="Employee-list PDF to the workbook clean_data.py reads, without a conversion service."
+    )
+    parser.add_argument("--input", default=INPUT_FILE)
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    records, n_pages = read_employee_pdf(args.input, args.workers)
+    write_xlsx_rows(ORG_COLUMNS + EXTRA_COLUMNS, records, args.output, sheet_title=SHEET_NAME)
+    print(
+        f"[INFO] {n_pages} pages -> {len(records)} employees "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+    print(f"Saved as: {args.output} (sheet '{SHEET_NAME}')")
+
+
+if __name__ == "__main__":
+    main()
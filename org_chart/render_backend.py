@@ -0,0 +1,121 @@
+import multiprocessing
+import os
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import graphviz
+
+try:
+    import pygraphviz  # in-process bindings to libgvc / cgraph
+except ImportError:
+    pygraphviz = None
+
+# -------------------------------------------
+# CONFIG
+# -------------------------------------------
+# "auto" uses pygraphviz when it is installed, "subprocess" always spawns `dot`
+BACKEND = os.environ.get("ORG_CHART_RENDER_BACKEND", "auto")
+WORKERS = os.cpu_count() or 4
+
+# Graphviz keeps global state, so in-process renders in one process are serialised
+_gvc_lock = threading.Lock()
+_worker_pool = None
+_worker_pids = {}   # pool -> queue its workers put their pid on at start-up
+
+
+# -------------------------------------------
+# BACKEND SELECTION
+# -------------------------------------------
+def use_inprocess(backend=None):
+    backend = backend or BACKEND
+    if backend == "subprocess":
+        return False
+    if backend == "inprocess" and pygraphviz is None:
+        raise ImportError("ORG_CHART_RENDER_BACKEND=inprocess needs pygraphviz (pip install pygraphviz)")
+    return pygraphviz is not None
+
+
+# -------------------------------------------
+# RENDERING
+# -------------------------------------------
+def render_formats_inprocess(source, fmts, engine="dot", no_op=None):
+    """Lay out once in this process, then draw each format from that layout."""
+    with _gvc_lock:
+        graph = pygraphviz.AGraph(string=source)
+        # layout() ignores -n; the library spells neato -n2 as the "nop2" engine
+        graph.layout(prog=f"nop{no_op}" if no_op else engine)
+        return [graph.draw(format=fmt) for fmt in fmts]
+
+
+def render_bytes_inprocess(source, fmt="png", engine="dot", no_op=None):
+    """Lay out and render in this process; nothing touches the disk."""
+    return render_formats_inprocess(source, [fmt], engine, no_op)[0]
+
+
+def render_bytes(source, fmt="png", engine="dot", backend=None, no_op=None):
+    """
+    Rendered chart as bytes, through whichever backend is selected.
+    no_op=2 (with engine="neato") keeps the node and edge positions
+    already in the source instead of laying the graph out.
+    """
+    if use_inprocess(backend):
+        return render_bytes_inprocess(source, fmt, engine, no_op)
+    return graphviz.Source(source, engine=engine).pipe(format=fmt, neato_no_op=no_op)
+
+
+def render_file(dot, filename, fmt=None, backend=None, no_op=None):
+    """
+    Drop-in for dot.render(filename=..., cleanup=True): writes
+    <filename>.<fmt> without an intermediate .gv file and returns the path.
+    """
+    fmt = fmt or dot.format or "png"
+    path = f"{filename}.{fmt}"
+    data = render_bytes(dot.source, fmt, getattr(dot, "engine", "dot"), backend, no_op)
+    with open(path, "wb") as f:
+        f.write(data)
+    return path
+
+
+# -------------------------------------------
+# LONG-LIVED WORKERS
+# -------------------------------------------
+def _warm_worker(pids):
+    pids.put(os.getpid())
+    # Load the Graphviz plugins once per worker instead of once per chart
+    render_bytes_inprocess("digraph { a }", fmt="svg")
+
+
+def worker_pool(workers=WORKERS):
+    """
+    Process pool whose workers keep pygraphviz and its plugins loaded, so
+    many small charts render in parallel without a fork/exec per chart.
+    """
+    global _worker_pool
+    if _worker_pool is None:
+        pids = multiprocessing.SimpleQueue()
+        _worker_pool = ProcessPoolExecutor(
+            max_workers=workers, initializer=_warm_worker, initargs=(pids,)
+        )
+        _worker_pids[_worker_pool] = pids
+    return _worker_pool
+
+
+def discard_worker_pool(pool):
+    """
+    Kill a pool's workers, e.g. one stuck in a layout that timed out: a
+    render running in a worker cannot be cancelled, only terminated.
+    The next worker_pool() call starts a fresh pool.
+    """
+    global _worker_pool
+    if _worker_pool is pool:
+        _worker_pool = None
+    # ProcessPoolExecutor cannot stop a running task, so its workers are
+    # killed by the pids they reported when they started
+    pids = _worker_pids.pop(pool, None)
+    while pids is not None and not pids.empty():
+        try:
+            os.kill(pids.get(), signal.SIGTERM)
+        except OSError:
+            pass   # already gone
+    pool.shutdown(wait=False, cancel_futures=True)
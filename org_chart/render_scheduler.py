@@ -0,0 +1,176 @@
+import asyncio
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+
+from render_backend import discard_worker_pool, render_formats_inprocess, use_inprocess, worker_pool
+
+# -------------------------------------------
+# CONFIG
+# -------------------------------------------
+MAX_CONCURRENCY = os.cpu_count() or 4   # `dot` processes running at once
+JOB_TIMEOUT = 60.0                      # seconds per attempt
+
+# Tried in order when an attempt times out (ortho routing is the usual culprit)
+FALLBACKS = [
+    ("dot", {}),
+    ("dot", {"splines": "line"}),
+    ("sfdp", {"splines": "line", "overlap": "false"}),
+]
+
+
+# -------------------------------------------
+# JOBS
+# -------------------------------------------
+@dataclass
+class RenderJob:
+    """
+    One DOT source to render. output=None returns the bytes instead.
+    more_outputs ({"svg": "chart.svg", ...}) are written from the same
+    layout, so asking for PNG + SVG costs one layout, not two. fallbacks
+    replaces the batch's list for this job only (e.g. Profile.fallbacks).
+    """
+    source: str
+    output: str = None
+    fmt: str = "png"
+    timeout: float = JOB_TIMEOUT
+    more_outputs: dict = field(default_factory=dict)
+    fallbacks: list = None
+
+
+@dataclass
+class RenderResult:
+    job: RenderJob
+    data: bytes = None          # rendered bytes when job.output is None
+    engine: str = None
+    overrides: dict = field(default_factory=dict)
+    attempts: int = 0
+    seconds: float = 0.0
+    error: str = None
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def with_graph_attrs(source, attrs):
+    """
+    Append graph attributes just before the closing brace; a later graph
+    attribute statement overrides an earlier one (e.g. splines=ortho).
+    """
+    if not attrs:
+        return source
+    end = source.rstrip().rfind("}")
+    extra = "".join(f"\t{key}={value}\n" for key, value in attrs.items())
+    return source[:end] + extra + source[end:]
+
+
+# -------------------------------------------
+# SCHEDULER
+# -------------------------------------------
+async def _run_engine(engine, source, fmt, output, timeout, more_outputs=None):
+    """
+    Run one Graphviz engine, DOT on stdin; returns stdout bytes. Each
+    extra -T<fmt> -o <path> pair reuses the layout of the first.
+    """
+    args = [engine, f"-T{fmt}"]
+    if output:
+        args += ["-o", output]
+    for extra_fmt, extra_output in (more_outputs or {}).items():
+        args += [f"-T{extra_fmt}", "-o", extra_output]
+    proc = await asyncio.create_subprocess_exec(
+        *args,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(
+            proc.communicate(source.encode("utf-8")), timeout
+        )
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise
+    if proc.returncode != 0:
+        raise RuntimeError(stderr.decode("utf-8", "replace").strip() or f"{engine} failed")
+    return stdout
+
+
+async def _run_inprocess(engine, source, fmt, output, timeout, more_outputs=None):
+    """
+    Render on a warm pygraphviz worker. A timed-out render is stopped by
+    killing the pool; renders that shared it are run again on a new one.
+    """
+    more_outputs = more_outputs or {}
+    fmts = [fmt] + list(more_outputs)
+    loop = asyncio.get_running_loop()
+    for retry in (False, True):
+        pool = worker_pool()
+        try:
+            rendered = await asyncio.wait_for(
+                loop.run_in_executor(pool, render_formats_inprocess, source, fmts, engine),
+                timeout,
+            )
+            break
+        except asyncio.TimeoutError:
+            discard_worker_pool(pool)
+            raise
+        except BrokenProcessPool:
+            # Another job's timeout killed the pool under this one
+            discard_worker_pool(pool)
+            if retry:
+                raise
+    for data, path in zip(rendered, [output] + list(more_outputs.values())):
+        if path:
+            with open(path, "wb") as f:
+                f.write(data)
+    return rendered[0]
+
+
+async def render_job(job, semaphore, fallbacks=FALLBACKS):
+    """Render one job, stepping down the fallback list on timeouts."""
+    result = RenderResult(job)
+    async with semaphore:
+        start = time.perf_counter()
+        run = _run_inprocess if use_inprocess() else _run_engine
+        for engine, overrides in job.fallbacks or fallbacks:
+            result.attempts += 1
+            result.engine, result.overrides = engine, overrides
+            try:
+                data = await run(
+                    engine, with_graph_attrs(job.source, overrides),
+                    job.fmt, job.output, job.timeout, job.more_outputs,
+                )
+                result.data = None if job.output else data
+                result.error = None
+                break
+            except asyncio.TimeoutError:
+                result.error = f"timed out after {job.timeout:.0f}s ({engine} {overrides or ''})"
+            except Exception as e:
+                # Recorded on this job only; the other jobs in the batch carry on
+                result.error = str(e) or type(e).__name__
+                break
+        result.seconds = time.perf_counter() - start
+    return result
+
+
+async def render_all(jobs, concurrency=MAX_CONCURRENCY, fallbacks=FALLBACKS):
+    """Render every job with at most `concurrency` engines running at once."""
+    semaphore = asyncio.Semaphore(concurrency)
+    return await asyncio.gather(*(render_job(job, semaphore, fallbacks) for job in jobs))
+
+
+def render_many(jobs, concurrency=MAX_CONCURRENCY, fallbacks=FALLBACKS):
+    """Blocking entry point for scripts: results come back in job order."""
+    return asyncio.run(render_all(list(jobs), concurrency, fallbacks))
+
+
+def render_one(job, fallbacks=FALLBACKS):
+    result = render_many([job], concurrency=1, fallbacks=fallbacks)[0]
+    if not result.ok:
+        raise RuntimeError(f"Render failed for {job.output or 'chart'}: {result.error}")
+    if result.attempts > 1:
+        print(f"[WARN] Fell back to {result.engine} {result.overrides} for {job.output}")
+    return result
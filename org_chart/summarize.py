@@ -0,0 +1,193 @@
+import heapq
+import re
+from collections import deque
+from dataclasses import dataclass
+
+from graphviz import Digraph
+
+from org_metrics import compute_metrics
+from tuning import choose_profile, order_edges
+
+# -------------------------------------------
+# CONFIG
+# -------------------------------------------
+NODE_BUDGET = 300        # most boxes handed to Graphviz per chart
+MAX_DEPTH = None         # levels shown below the chart's top (None = no limit)
+MIN_TEAM = 1             # teams smaller than this are always folded
+RANKDIR = "TB"
+
+
+# -------------------------------------------
+# HELPERS
+# -------------------------------------------
+def dept_label(org_name):
+    """'HR Planning  (Moussoux, Florence)' -> 'HR Planning'"""
+    return str(org_name).split("(", 1)[0].strip()
+
+
+def safe_name(s):
+    return re.sub(r"[^A-Za-z0-9]+", "_", str(s)).strip("_") or "node"
+
+
+# -------------------------------------------
+# PLAN: WHICH TEAMS TO OPEN
+# -------------------------------------------
+@dataclass
+class SummaryPlan:
+    visible: list      # rows drawn as boxes, top of the chart first
+    collapsed: list    # visible rows whose team is folded into them
+
+
+def plan_summary(graph, metrics, tops, node_budget=NODE_BUDGET,
+                 max_depth=MAX_DEPTH, min_team=MIN_TEAM, open_tops=False):
+    """
+    Open the largest teams first until the next one would exceed the node
+    budget. Uses precomputed subtree sizes, so the cost depends on the
+    budget, not on headcount. open_tops always opens the chart's own
+    head(s), so a drill-down never folds back into a single box.
+    """
+    size = metrics["subtree_size"]
+    reports = metrics["direct_reports"]
+
+    visible = list(tops)
+    rel_depth = {r: 0 for r in tops}
+    count = len(visible)
+    expanded = set()
+
+    def expandable(r):
+        if open_tops and rel_depth[r] == 0:
+            return reports[r] > 0
+        return (
+            reports[r] > 0
+            and size[r] - 1 >= min_team
+            and (max_depth is None or rel_depth[r] < max_depth)
+        )
+
+    heap = [(-size[r], r) for r in tops if expandable(r)]
+    heapq.heapify(heap)
+    while heap:
+        _, r = heapq.heappop(heap)
+        forced = open_tops and rel_depth[r] == 0
+        if count + reports[r] > node_budget and not forced:
+            continue  # a smaller team may still fit
+        expanded.add(r)
+        count += reports[r]
+        for c in graph.children(r):
+            c = int(c)
+            visible.append(c)
+            rel_depth[c] = rel_depth[r] + 1
+            if expandable(c):
+                heapq.heappush(heap, (-size[c], c))
+
+    collapsed = [r for r in visible if reports[r] > 0 and r not in expanded]
+    return SummaryPlan(visible, collapsed)
+
+
+# -------------------------------------------
+# CHARTS
+# -------------------------------------------
+def build_summary_dot(graph, metrics, plan, title="Org Chart", drilldown_files=None,
+                      profile=None):
+    """
+    Chart of a plan, styled like v3.py. Folded teams become one aggregate
+    box ("Relocation Services — 142 staff") that links to its drill-down.
+    A tuning profile, if given, is laid over the graph attributes.
+    """
+    drilldown_files = drilldown_files or {}
+    size = metrics["subtree_size"]
+
+    dot = Digraph(comment="Org Chart (Summary)", format="png")
+    graph_attr = dict(
+        rankdir=RANKDIR,
+        splines="ortho",
+        fontsize="10",
+        labelloc="t",
+        label=title,
+        pad="0.1",
+        margin="0.05",
+        nodesep="0.25",
+        ranksep="0.4",
+        ratio="compress",
+    )
+    dot.graph_attr.update(profile.apply(graph_attr) if profile else graph_attr)
+    dot.node_attr.update(
+        shape="box",
+        style="rounded,filled",
+        fillcolor="#f9f9f9",
+        color="#555555",
+        fontname="Helvetica",
+        fontsize="9",
+        margin="0.12,0.06",
+    )
+    dot.edge_attr.update(color="#888888", arrowsize="0.7")
+
+    collapsed = set(plan.collapsed)
+    shown = set(plan.visible)
+    tops = {r for r in plan.visible if graph.parent[r] not in shown}
+
+    for r in plan.visible:
+        uid = graph.ids[r]
+        lines = [graph.names[r]]
+        if graph.titles[r]:
+            lines.append(graph.titles[r])
+
+        if r in collapsed:
+            team = dept_label(graph.orgs[r]) or "Team"
+            lines.append(f"{team} — {size[r] - 1} staff")
+            attrs = dict(fillcolor="#FFF3E0", style="rounded,filled,bold", penwidth="1.3")
+            if r in drilldown_files:
+                attrs.update(URL=drilldown_files[r], tooltip="Open team chart")
+            dot.node(uid, label="\n".join(lines), **attrs)
+        elif r in tops:
+            dot.node(uid, label="\n".join(lines), fillcolor="#e3f2fd",
+                     style="rounded,filled,bold", penwidth="1.3")
+        else:
+            dot.node(uid, label="\n".join(lines))
+
+    below = [r for r in plan.visible if r not in tops]
+    tails = [graph.ids[graph.parent[r]] for r in below]
+    heads = [graph.ids[r] for r in below]
+    if profile and profile.order_children:
+        tails, heads = order_edges(tails, heads)
+    for tail, head in zip(tails, heads):
+        dot.edge(tail, head)
+
+    return dot
+
+
+def summary_charts(graph, output_prefix, node_budget=NODE_BUDGET,
+                   max_depth=MAX_DEPTH, min_team=MIN_TEAM, fmt="png", adaptive=False):
+    """
+    The overview chart plus one drill-down per folded team, each within
+    the node budget. Drill-downs fold again where needed, so everyone is
+    drawn in at least one chart. adaptive picks a tuning profile per
+    chart from its own box count and widest team.
+
+    Returns a list of (output filename without extension, Digraph,
+    Profile or None).
+    """
+    metrics = compute_metrics(graph, by_department=False)
+    reports = metrics["direct_reports"]
+
+    charts = []
+    queue = deque([(list(graph.roots), output_prefix, "Org Chart", False)])
+    while queue:
+        tops, filename, title, open_tops = queue.popleft()
+        plan = plan_summary(graph, metrics, tops, node_budget, max_depth, min_team, open_tops)
+
+        links = {}
+        for r in plan.collapsed:
+            child_file = f"{output_prefix}_{safe_name(graph.ids[r])}"
+            links[r] = f"{child_file.rsplit('/', 1)[-1]}.{fmt}"
+            queue.append(([r], child_file, f"Team of {graph.names[r]}", True))
+
+        profile = None
+        if adaptive:
+            folded = set(plan.collapsed)
+            widest = max((int(reports[r]) for r in plan.visible if r not in folded), default=0)
+            profile = choose_profile(len(plan.visible), widest)
+
+        dot = build_summary_dot(graph, metrics, plan, title, links, profile)
+        dot.format = fmt
+        charts.append((filename, dot, profile))
+    return charts
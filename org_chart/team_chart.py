@@ -0,0 +1,60 @@
+import numpy as np
+from graphviz import Digraph
+
+
+# -------------------------------------------
+# TEAM CHART ("TEAM OF X")
+# -------------------------------------------
+def team_rows(graph, root, max_depth=None):
+    """Row `root` and everyone below it, optionally only `max_depth` levels down."""
+    parts = []
+    frontier = np.array([root], dtype=np.int64)
+    while frontier.size and (max_depth is None or len(parts) <= max_depth):
+        parts.append(frontier)
+        frontier = graph.children_of(frontier)
+    return np.concatenate(parts)
+
+
+def build_team_dot(graph, root, max_depth=None, fmt="png"):
+    """
+    Chart of one person's team, styled like florence.py:
+    header "Team of <name>", the head highlighted with their department.
+    """
+    rows = team_rows(graph, root, max_depth)
+    head_name = graph.names[root]
+
+    dot = Digraph(format=fmt)
+    dot.attr(rankdir="TB")
+
+    # Header/description at top of the chart
+    dot.attr(
+        label=f"Team of {head_name}",
+        labelloc="t",
+        fontsize="12",
+        fontname="Helvetica"
+    )
+
+    dot.attr(
+        "node",
+        shape="box",
+        style="rounded,filled",
+        fontname="Helvetica",
+        fontsize="10"
+    )
+
+    for i in rows:
+        uid = graph.ids[i]
+        lines = [graph.names[i]]
+        if graph.titles[i]:
+            lines.append(graph.titles[i])
+        if i == root:
+            if graph.orgs[i]:
+                lines.append(graph.orgs[i])
+            dot.node(uid, label="\n".join(lines), fillcolor="#e3f2fd")  # head highlighted
+        else:
+            dot.node(uid, label="\n".join(lines), fillcolor="#f9f9f9")
+
+    for i in rows[1:]:
+        dot.edge(graph.ids[graph.parent[i]], graph.ids[i])
+
+    return dot
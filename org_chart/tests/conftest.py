@@ -0,0 +1,33 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# The chart scripts import each other as top-level modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from org_graph import OrgGraph, synthetic_graph  # noqa: E402
+
+
+def parent_walk(graph, i):
+    """Row i and every manager above it, by following parent[] (the oracle)."""
+    chain = [i]
+    while graph.parent[chain[-1]] >= 0:
+        chain.append(int(graph.parent[chain[-1]]))
+    return chain
+
+
+@pytest.fixture(params=[1, 2, 57, 1000])
+def graph(request):
+    return synthetic_graph(request.param, seed=request.param)
+
+
+@pytest.fixture
+def forest_with_cycle():
+    """Two trees plus three people reporting to each other in a loop."""
+    parent = np.array([-1, 0, 0, 1, 1, -1, 5, 8, 9, 7])
+    n = len(parent)
+    ids = [f"{i}_Person,_{i}" for i in range(n)]
+    names = [f"Person, {i}" for i in range(n)]
+    return OrgGraph(ids, parent, names, [""] * n, ["HR", "IT"] * (n // 2))
@@ -0,0 +1,44 @@
+import os
+import shutil
+import subprocess
+import sys
+
+import pandas as pd
+import pytest
+
+from clean_chunked import clean_chunked
+
+SCRIPTS = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE = "Office of Human Resources  (AlNuaimi, Rashed).xlsx"
+
+
+@pytest.fixture(scope="module")
+def in_memory(tmp_path_factory):
+    """clean_data.py run as-is on the sample: (output frame, collapsed frame)."""
+    if not os.path.exists(os.path.join(SCRIPTS, SAMPLE)):
+        pytest.skip("sample export not present")
+    work = tmp_path_factory.mktemp("clean_data")
+    shutil.copy(os.path.join(SCRIPTS, SAMPLE), work)
+    subprocess.run([sys.executable, os.path.join(SCRIPTS, "clean_data.py")], cwd=work,
+                   check=True, capture_output=True)
+    return (pd.read_excel(work / "ideal_final_output.xlsx"),
+            pd.read_csv(work / "collapsed_positions.csv"))
+
+
+def sorted_rows(df):
+    return df.sort_values(list(df.columns)).reset_index(drop=True)
+
+
+# 0.02 MB forces dozens of name partitions and several join partitions
+@pytest.mark.parametrize("memory_mb", [1024, 0.02])
+def test_clean_chunked_matches_clean_data(in_memory, tmp_path, memory_mb):
+    expected, expected_collapsed = in_memory
+    output = tmp_path / "chunked.xlsx"
+    collapsed = tmp_path / "collapsed.csv"
+    n_people = clean_chunked(os.path.join(SCRIPTS, SAMPLE), str(output), memory_mb=memory_mb,
+                             collapsed_path=str(collapsed), workdir=str(tmp_path))
+
+    assert n_people == len(expected)
+    pd.testing.assert_frame_equal(pd.read_excel(output), expected)
+    pd.testing.assert_frame_equal(sorted_rows(pd.read_csv(collapsed)), sorted_rows(expected_collapsed))
+    assert [p for p in os.listdir(tmp_path) if p.startswith("clean_chunked_")] == []
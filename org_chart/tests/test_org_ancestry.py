@@ -0,0 +1,58 @@
+import numpy as np
+
+from conftest import parent_walk
+from org_ancestry import AncestryIndex
+
+
+def walks(graph):
+    """Chain of command per row (None inside a cycle)."""
+    return [parent_walk(graph, i) if graph.depth[i] >= 0 else None for i in range(graph.n)]
+
+
+def brute_lca(chains, a, b):
+    if chains[a] is None or chains[b] is None:
+        return -1
+    above_b = set(chains[b])
+    return next((m for m in chains[a] if m in above_b), -1)
+
+
+def all_pairs(n, rng, limit=3000):
+    if n * n <= limit:
+        a, b = np.divmod(np.arange(n * n), n)
+        return a, b
+    return rng.integers(0, n, limit), rng.integers(0, n, limit)
+
+
+def check_index(graph):
+    index = AncestryIndex(graph)
+    chains = walks(graph)
+    a, b = all_pairs(graph.n, np.random.default_rng(graph.n))
+
+    expected = [chains[y] is not None and chains[x] is not None and x in chains[y] for x, y in zip(a, b)]
+    assert index.is_ancestor_rows(a, b).tolist() == expected
+    assert index.lca_rows(a, b).tolist() == [brute_lca(chains, x, y) for x, y in zip(a, b)]
+
+    for k in range(int(graph.depth.max()) + 2):
+        expected = [c[k] if c is not None and k < len(c) else -1 for c in chains]
+        assert index.kth_ancestor_rows(np.arange(graph.n), k).tolist() == expected
+
+    for i in range(graph.n):
+        assert index.chain_rows(i).tolist() == (chains[i] or [i])
+
+
+def test_binary_lifting_matches_parent_walks(graph):
+    check_index(graph)
+
+
+def test_reports_to_cycle_has_no_ancestors(forest_with_cycle):
+    check_index(forest_with_cycle)
+
+
+def test_id_helpers(forest_with_cycle):
+    index = AncestryIndex(forest_with_cycle)
+    ids = forest_with_cycle.ids
+    assert index.chain(ids[4]) == [ids[4], ids[1], ids[0]]
+    assert index.lca(ids[3], ids[2]) == ids[0]
+    assert index.lca(ids[3], ids[6]) is None
+    assert index.is_ancestor(ids[1], ids[4])
+    assert not index.is_ancestor(ids[7], ids[8])
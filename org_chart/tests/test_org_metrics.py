@@ -0,0 +1,51 @@
+from collections import Counter
+
+import numpy as np
+
+from conftest import parent_walk
+from org_metrics import compute_metrics
+
+
+def brute_force_metrics(graph):
+    """Every metric recomputed from each person's walk up to the top."""
+    n = graph.n
+    size, leaves, height = np.ones(n, int), np.zeros(n, int), np.zeros(n, int)
+    reports = np.bincount(graph.parent[graph.parent >= 0], minlength=n)
+    depth = np.full(n, -1)
+    dept = Counter()
+    for j in range(n):
+        if graph.depth[j] < 0:
+            leaves[j] = reports[j] == 0
+            dept[j, graph.orgs[j] or "Unknown"] += 1
+            continue
+        chain = parent_walk(graph, j)
+        depth[j] = len(chain) - 1
+        for levels_up, i in enumerate(chain):
+            size[i] += levels_up > 0
+            leaves[i] += reports[j] == 0
+            height[i] = max(height[i], levels_up)
+            dept[i, graph.orgs[j] or "Unknown"] += 1
+    return depth, reports, size, leaves, height, dept
+
+
+def check_metrics(graph):
+    metrics = compute_metrics(graph)
+    depth, reports, size, leaves, height, dept = brute_force_metrics(graph)
+    assert np.array_equal(metrics["depth"], depth)
+    assert np.array_equal(metrics["direct_reports"], reports)
+    assert np.array_equal(metrics["subtree_size"], size)
+    assert np.array_equal(metrics["leaf_count"], leaves)
+    assert np.array_equal(metrics["height"], height)
+
+    counts = metrics["dept_counts"]
+    names = metrics["departments"]
+    got = {(r, names[d]): c for r, d, c in counts.itertuples(index=False)}
+    assert got == dict(dept)
+
+
+def test_metrics_match_parent_walks(graph):
+    check_metrics(graph)
+
+
+def test_metrics_with_reports_to_cycle(forest_with_cycle):
+    check_metrics(forest_with_cycle)
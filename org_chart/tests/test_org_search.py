@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+import org_search
+from org_search import NameIndex, normalize
+
+SYLLABLES = ["al", "ba", "ri", "mo", "ha", "ké", "na", "sh", "ou", "za", "de", "lo"]
+TITLES = ["Talent Acquisition Specialist", "HR Services Manager", "Academic Operations Trainee",
+          "Director, Compensation", "Lab Assistant", ""]
+
+
+def random_people(n, seed):
+    rng = np.random.default_rng(seed)
+
+    def word():
+        return "".join(rng.choice(SYLLABLES, rng.integers(1, 4))).capitalize()
+
+    names = [f"{word()}, {word()} {word()}" for _ in range(n)]
+    titles = [TITLES[i] for i in rng.integers(0, len(TITLES), n)]
+    return names, titles
+
+
+def brute_score(q, name, title):
+    """Best score for one person by scanning their name and title."""
+    name, title = normalize(name), normalize(title)
+    scores = [0]
+    if name == q:
+        scores.append(org_search.SCORE_EXACT_NAME)
+    if name.startswith(q):
+        scores.append(org_search.SCORE_NAME_PREFIX)
+    if any(w.startswith(q) for w in org_search.WORD_SPLIT.split(name) if w):
+        scores.append(org_search.SCORE_NAME_WORD)
+    if any(w.startswith(q) for w in org_search.WORD_SPLIT.split(title) if w):
+        scores.append(org_search.SCORE_TITLE_WORD)
+    if len(q) >= 3 and q in name:
+        scores.append(org_search.SCORE_NAME_SUBSTRING)
+    if len(q) >= 3 and q in title:
+        scores.append(org_search.SCORE_TITLE_SUBSTRING)
+    return max(scores)
+
+
+def queries(names, titles, seed):
+    rng = np.random.default_rng(seed)
+    texts = [normalize(t) for t in names + titles if t]
+    out = ["zzq", "al, ", "x"]
+    for text in rng.choice(texts, 200):
+        start = rng.integers(0, len(text))
+        out.append(text[start:start + rng.integers(1, 9)])
+    return [q for q in out if normalize(q)]
+
+
+@pytest.mark.parametrize("n, seed", [(40, 0), (300, 1)])
+def test_lookup_matches_brute_force(n, seed):
+    names, titles = random_people(n, seed)
+    index = NameIndex(names, titles)
+    for q in queries(names, titles, seed):
+        q = normalize(q)
+        expected = {r: brute_score(q, names[r], titles[r]) for r in range(n)}
+        expected = {r: s for r, s in expected.items() if s}
+        hits = index.lookup(q, limit=n)
+        assert dict(hits) == expected, q
+        scores = [s for _, s in hits]
+        assert scores == sorted(scores, reverse=True), q
+
+
+def test_trigram_candidates_hold_every_substring_match():
+    names, titles = random_people(300, 2)
+    index = NameIndex(names, titles)
+    for q in queries(names, titles, 2):
+        q = normalize(q)
+        if len(q) < 3:
+            continue
+        rows, _ = index._substring_hits(q)
+        expected = [r for r in range(len(names))
+                    if q in normalize(names[r]) or q in normalize(titles[r])]
+        assert sorted(rows.tolist()) == expected, q
+
+
+def test_find_one_on_synthetic_graph(graph):
+    index = NameIndex.from_graph(graph)
+    for row in range(0, graph.n, max(1, graph.n // 50)):
+        assert index.find_one(graph.names[row]) == row
+    assert index.find_one("nobody at all") == -1
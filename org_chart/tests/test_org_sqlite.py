@@ -0,0 +1,45 @@
+import sqlite3
+
+from conftest import parent_walk
+from org_sqlite import chain_above, everyone_under, write_sqlite
+
+
+def brute_closure(graph):
+    """{(ancestor, descendant): depth} from every person's parent walk."""
+    pairs = {}
+    for j in range(graph.n):
+        if graph.depth[j] < 0:
+            pairs[j, j] = 0   # inside a cycle: self row only
+            continue
+        for levels_up, i in enumerate(parent_walk(graph, j)):
+            pairs[i, j] = levels_up
+    return pairs
+
+
+def check_closure(graph, path):
+    n_rows = write_sqlite(graph, str(path))
+    in_cycle = int((graph.depth < 0).sum())
+    assert n_rows == int((graph.depth[graph.depth >= 0] + 1).sum()) + in_cycle
+
+    conn = sqlite3.connect(str(path))
+    try:
+        rows = conn.execute("SELECT ancestor, descendant, depth FROM closure").fetchall()
+        assert len(rows) == n_rows
+        assert {(a, d): k for a, d, k in rows} == brute_closure(graph)
+
+        for i in range(0, graph.n, max(1, graph.n // 20)):
+            uid = graph.ids[i]
+            chain = parent_walk(graph, i) if graph.depth[i] >= 0 else [i]
+            assert [r[0] for r in chain_above(conn, uid)] == [graph.ids[m] for m in chain[1:]]
+            below = {j for j in range(graph.n) if graph.depth[j] >= 0 and i in parent_walk(graph, j)[1:]}
+            assert {r[0] for r in everyone_under(conn, uid)} == {graph.ids[j] for j in below}
+    finally:
+        conn.close()
+
+
+def test_closure_table_matches_parent_walks(graph, tmp_path):
+    check_closure(graph, tmp_path / "org.db")
+
+
+def test_closure_table_with_reports_to_cycle(forest_with_cycle, tmp_path):
+    check_closure(forest_with_cycle, tmp_path / "org.db")
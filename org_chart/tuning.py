@@ -0,0 +1,254 @@
+import argparse
+import subprocess
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from dot_writer import dot_lines, dot_source, edge_lines, node_lines
+from org_graph import synthetic_graph
+from render_scheduler import FALLBACKS, JOB_TIMEOUT
+
+# -------------------------------------------
+# CONFIG
+# -------------------------------------------
+# Thresholds on what is actually drawn (boxes, widest team, clusters)
+SMALL_NODES = 300        # ortho routing stays affordable up to here
+LARGE_NODES = 10000      # below this "large" was no faster than "medium" (tuning.py --sizes)
+HUGE_NODES = 50000       # past this a hierarchical layout is not worth waiting for
+WIDE_FANOUT = 40         # one rank this wide makes ortho and mincross slow
+VERY_WIDE_FANOUT = 200
+MANY_CLUSTERS = 15       # ortho routes around every cluster frame...
+CLUSTER_NODES = 100      # ...which only costs much once the frames hold this many boxes
+
+BENCHMARK_SIZES = [100, 500, 2000, 8000]
+
+
+# -------------------------------------------
+# PROFILES
+# -------------------------------------------
+@dataclass
+class Profile:
+    name: str
+    engine: str
+    graph_attrs: dict = field(default_factory=dict)   # laid over the script's own attributes
+    order_children: bool = False   # edges by subtree size, ordering=out: less mincross work
+
+    @property
+    def fallbacks(self):
+        """render_scheduler fallbacks starting from this profile's engine."""
+        if self.engine == "dot":
+            return [(self.engine, {})] + FALLBACKS[1:]
+        # Force-directed: drop overlap removal, then cut the iterations
+        return [
+            (self.engine, {}),
+            (self.engine, {"overlap": "true"}),
+            (self.engine, {"overlap": "true", "maxiter": "100"}),
+        ]
+
+    def apply(self, graph_attr):
+        """The script's graph attributes with this profile's on top."""
+        attrs = dict(graph_attr, **self.graph_attrs)
+        if self.order_children:
+            attrs["ordering"] = "out"
+        return attrs
+
+
+PROFILES = {
+    # What v2.py / v3.py always used: orthogonal elbows, full crossing search
+    "small": Profile("small", "dot"),
+    "medium": Profile("medium", "dot", {
+        "splines": "polyline",
+        "mclimit": "0.5",
+        "searchsize": "30",
+    }, order_children=True),
+    "large": Profile("large", "dot", {
+        "splines": "line",
+        "mclimit": "0.1",
+        "nslimit": "2",
+        "nslimit1": "2",
+        "searchsize": "10",
+        "remincross": "false",
+    }, order_children=True),
+    # Overview only: force-directed, no hierarchy, no edge routing
+    "huge": Profile("huge", "sfdp", {
+        "splines": "false",
+        "overlap": "prism",
+        "ratio": "auto",
+    }),
+}
+
+
+def choose_profile(n_nodes, max_fanout=0, n_clusters=0):
+    """Pick a profile from the size and shape of the graph to be drawn."""
+    if n_nodes > HUGE_NODES:
+        return PROFILES["huge"]
+    if n_nodes > LARGE_NODES or max_fanout > VERY_WIDE_FANOUT:
+        return PROFILES["large"]
+    if n_nodes > SMALL_NODES or max_fanout > WIDE_FANOUT:
+        return PROFILES["medium"]
+    if n_clusters > MANY_CLUSTERS and n_nodes > CLUSTER_NODES:
+        return PROFILES["medium"]
+    return PROFILES["small"]
+
+
+def max_fanout(tails):
+    """Widest team among the edges to be drawn."""
+    counts = defaultdict(int)
+    for tail in tails:
+        counts[tail] += 1
+    return max(counts.values(), default=0)
+
+
+# -------------------------------------------
+# CHILD ORDERING
+# -------------------------------------------
+def _middle_out(items):
+    """Largest first in the middle, then alternately either side."""
+    return items[1::2][::-1] + items[0::2]
+
+
+def order_edges(tails, heads):
+    """
+    Edges regrouped per manager (managers in first-appearance order),
+    each team's largest subtrees in the middle. With ordering=out dot
+    keeps this order instead of searching for one.
+    """
+    children = defaultdict(list)
+    for tail, head in zip(tails, heads):
+        children[tail].append(head)
+
+    size = {}   # people drawn under each node, themself included
+    for top in children:
+        stack = [(top, False)]
+        while stack:
+            node, done = stack.pop()
+            if node in size:
+                continue
+            if done:
+                size[node] = 1 + sum(size[c] for c in children.get(node, ()))
+            else:
+                stack.append((node, True))
+                stack.extend((c, False) for c in children.get(node, ()) if c not in size)
+
+    ordered_tails, ordered_heads = [], []
+    for tail, team in children.items():
+        team = sorted(team, key=lambda c: -size[c])   # stable: sheet order among equals
+        for head in _middle_out(team):
+            ordered_tails.append(tail)
+            ordered_heads.append(head)
+    return ordered_tails, ordered_heads
+
+
+# -------------------------------------------
+# BENCHMARK
+# -------------------------------------------
+def _plain_layout(source, engine, timeout):
+    """Run engine -Tplain; returns (seconds, plain text) or (seconds, None) on timeout."""
+    start = time.perf_counter()
+    try:
+        proc = subprocess.run(
+            [engine, "-Tplain"], input=source.encode("utf-8"),
+            capture_output=True, timeout=timeout, check=True,
+        )
+    except subprocess.TimeoutExpired:
+        return time.perf_counter() - start, None
+    return time.perf_counter() - start, proc.stdout.decode("utf-8", "replace")
+
+
+def _inversions(values):
+    """Pairs out of order, by merge sort."""
+    values = list(values)
+    if len(values) < 2:
+        return 0
+    mid = len(values) // 2
+    left, right = sorted(values[:mid]), sorted(values[mid:])
+    count = _inversions(values[:mid]) + _inversions(values[mid:])
+    j = 0
+    for x in left:
+        while j < len(right) and right[j] < x:
+            j += 1
+        count += j
+    return count
+
+
+def layout_quality(plain):
+    """
+    (drawing area in square inches, edge crossings) from -Tplain output.
+    Crossings are counted between straight manager -> report segments
+    that span the same pair of rows.
+    """
+    pos, edges, area = {}, [], 0.0
+    for line in plain.splitlines():
+        parts = line.split()
+        if not parts:
+            continue
+        if parts[0] == "graph":
+            area = float(parts[2]) * float(parts[3])
+        elif parts[0] == "node":
+            pos[parts[1]] = (float(parts[2]), float(parts[3]))
+        elif parts[0] == "edge":
+            edges.append((parts[1], parts[2]))
+
+    spans = defaultdict(list)
+    for tail, head in edges:
+        (tx, ty), (hx, hy) = pos[tail], pos[head]
+        spans[(round(ty, 2), round(hy, 2))].append((tx, hx))
+    crossings = 0
+    for segments in spans.values():
+        segments.sort()
+        crossings += _inversions(hx for _, hx in segments)
+    return area, crossings
+
+
+def benchmark_source(graph, profile, graph_attr):
+    """Fixed-size boxes and reporting lines for one synthetic org."""
+    ids, parent = graph.ids, graph.parent
+    rows = np.flatnonzero(parent >= 0)
+    tails, heads = list(ids[parent[rows]]), list(ids[rows])
+    if profile.order_children:
+        tails, heads = order_edges(tails, heads)
+    sizes = ["fixedsize=true height=0.5 width=1.4"] * graph.n
+    body = node_lines(ids, graph.names, extra=sizes)
+    body += edge_lines(tails, heads)
+    return dot_source(dot_lines(
+        body,
+        graph_attr=profile.apply(graph_attr),
+        node_attr=dict(shape="box", fontname="Helvetica", fontsize="9"),
+    ))
+
+
+def benchmark(sizes=BENCHMARK_SIZES, timeout=JOB_TIMEOUT):
+    """Layout time, area and crossings for every profile at every size."""
+    base = dict(rankdir="TB", splines="ortho", nodesep="0.25", ranksep="0.4", ratio="compress")
+    print(f"{'people':>8}  {'profile':<8}{'engine':<7}{'seconds':>9}{'area in²':>12}{'crossings':>11}  chosen")
+    for n in sizes:
+        graph = synthetic_graph(n)
+        widest = int(np.diff(graph.child_ptr).max()) if n else 0
+        chosen = choose_profile(n, widest).name
+        for profile in PROFILES.values():
+            source = benchmark_source(graph, profile, base)
+            seconds, plain = _plain_layout(source, profile.engine, timeout)
+            if plain is None:
+                print(f"{n:>8}  {profile.name:<8}{profile.engine:<7}{'> ' + str(int(timeout)):>9}{'':>12}{'':>11}  "
+                      f"{'*' if profile.name == chosen else ''}")
+                continue
+            area, crossings = layout_quality(plain)
+            print(f"{n:>8}  {profile.name:<8}{profile.engine:<7}{seconds:>9.2f}{area:>12.0f}{crossings:>11}  "
+                  f"{'*' if profile.name == chosen else ''}")
+
+
+# -------------------------------------------
+# MAIN
+# -------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Time every tuning profile on synthetic orgs.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=BENCHMARK_SIZES)
+    parser.add_argument("--timeout", type=float, default=JOB_TIMEOUT, help="seconds per layout")
+    args = parser.parse_args()
+    benchmark(args.sizes, args.timeout)
+
+
+if __name__ == "__main__":
+    main()
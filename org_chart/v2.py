@@ -1,8 +1,16 @@
 import math
 import re
-import pandas as pd
-from graphviz import Digraph
-from collections import defaultdict
+from collections import Counter, defaultdict
+
+from dot_writer import a_list, cluster_lines, dot_lines, dot_source, edge_lines, node_lines
+from fanout import FANOUT_THRESHOLD, leaf_stacks, stack_label, stacked_uids
+from labels import LabelCache
+from org_graph import build_graph
+from org_io import load_org
+from org_validate import check_org
+from render_scheduler import RenderJob, render_many, render_one
+from summarize import summary_charts
+from tuning import choose_profile, max_fanout, order_edges
 
 # -------------------------------------------
 # CONFIG
@@ -12,31 +20,27 @@ SHEET_NAME = 0
 OUTPUT_FILE = "org_chart_dept_clusters"   # org_chart_dept_clusters.png
 RANKDIR = "TB"                            # vertical
 FONT = "Helvetica"
+NODE_BUDGET = 300                         # summarize above this many people (None = draw everyone)
+MEMORY_REPORT = False                     # print the loaded frame's memory footprint
+FIXED_SIZE_NODES = False                  # estimated node sizes so dot skips text layout (may clip non-Latin labels)
+COMPACT_FANOUT = True                     # stack leaf reports of wide teams into columns
+FANOUT_LIMIT = FANOUT_THRESHOLD           # ...when a manager has more leaf reports than this
+ADAPTIVE_TUNING = True                    # Graphviz settings picked from the chart's size (see tuning.py)
 
 # -------------------------------------------
 # LOAD DATA
 # -------------------------------------------
-df = pd.read_excel(INPUT_FILE, sheet_name=SHEET_NAME)
-
-df["Unique Identifier"] = df["Unique Identifier"].astype(str)
-df["Name"] = df["Name"].astype(str).str.strip()
-
-if "Reports To" in df.columns:
-    df["Reports To"] = df["Reports To"].astype(str).replace({"nan": None})
-else:
-    df["Reports To"] = None
-
-if "Organization Name" not in df.columns:
-    df["Organization Name"] = "Unknown"
+# Only the columns used; titles and departments as categoricals (see org_io.py)
+df = load_org(INPUT_FILE, SHEET_NAME, report=MEMORY_REPORT)
 
+# Blank departments are drawn as "Unknown"
 df["Organization Name"] = (
-    df["Organization Name"]
-    .fillna("Unknown")
-    .astype(str)
-    .str.strip()
-    .replace({"": "Unknown"})
+    df["Organization Name"].astype(str).replace({"": "Unknown"}).astype("category")
 )
 
+# Catch cycles, self-loops and missing managers before drawing
+df = check_org(df)
+
 # -------------------------------------------
 # HELPERS
 # -------------------------------------------
@@ -47,15 +51,6 @@ def is_null(x):
         or (isinstance(x, str) and x.strip() == "")
     )
 
-def build_label(row):
-    """Compact, readable node label: Name + Title."""
-    name = row.get("Name", "")
-    title = row.get("Line Detail 1", "")
-    title = title.strip() if isinstance(title, str) else ""
-    if title:
-        return f"{name}\n{title}"
-    return name
-
 def safe_name(s: str) -> str:
     """Make a string safe for use as a Graphviz ID."""
     return re.sub(r"[^A-Za-z0-9]+", "_", s).strip("_") or "cluster"
@@ -64,79 +59,147 @@ def safe_name(s: str) -> str:
 roots = df[df["Reports To"].apply(is_null)]["Unique Identifier"].tolist()
 
 # lookups
-id_to_row = {row["Unique Identifier"]: row for _, row in df.iterrows()}
-id_to_label = {uid: build_label(row) for uid, row in id_to_row.items()}
+id_to_org = dict(zip(df["Unique Identifier"], df["Organization Name"]))
 
-# group people by department
-org_to_ids = defaultdict(list)
-for uid, row in id_to_row.items():
-    org = row.get("Organization Name", "Unknown")
-    org_to_ids[org].append(uid)
+# Name + title, formatted and measured once per distinct row (see labels.py)
+label_cache = LabelCache()
+id_to_label = label_cache.id_to_label(df)
+id_to_size = (
+    label_cache.id_to_size(df, fontsize=9, margin=(0.12, 0.06)) if FIXED_SIZE_NODES else {}
+)
+label_cache.save()
 
 # -------------------------------------------
-# COLOR PALETTE (soft, not shouting)
+# LARGE ORGS: SUMMARY CHART + DRILL-DOWNS
 # -------------------------------------------
-# pastel-ish department colors
-palette = [
-    "#E3F2FD",  # light blue
-    "#FFF3E0",  # light orange
-    "#E8F5E9",  # light green
-    "#F3E5F5",  # light purple
-    "#E0F7FA",  # light cyan
-    "#FBE9E7",  # light coral
-    "#FFFDE7",  # light yellow
-]
-
-org_names = sorted(org_to_ids.keys())
-org_to_color = {
-    org: palette[i % len(palette)] for i, org in enumerate(org_names)
-}
+# Above the budget, big teams fold into "Dept — N staff" boxes (see
+# summarize.py) instead of every employee being drawn in a cluster
+if NODE_BUDGET and len(id_to_label) > NODE_BUDGET:
+    charts = summary_charts(
+        build_graph(df), OUTPUT_FILE, node_budget=NODE_BUDGET, adaptive=ADAPTIVE_TUNING
+    )
+    # Each chart gets the Graphviz settings for its own size (see tuning.py)
+    jobs = [
+        RenderJob(chart.source, f"{filename}.png", fallbacks=profile and profile.fallbacks)
+        for filename, chart, profile in charts
+    ]
+    if ADAPTIVE_TUNING:
+        used = Counter(profile.name for _, _, profile in charts)
+        print(f"[INFO] {len(charts)} charts: " + ", ".join(f"{n} {name}" for name, n in used.items()))
+    for result in render_many(jobs):
+        if not result.ok:
+            print(f"[WARN] {result.job.output}: {result.error}")
+    print(f"PNG org chart generated: {OUTPUT_FILE}.png (+{len(jobs) - 1} drill-down charts)")
+else:
+    # group people by department (a groupby over category codes)
+    org_to_ids = (
+        df.groupby("Organization Name", observed=True, sort=False)["Unique Identifier"]
+        .agg(list)
+        .to_dict()
+    )
 
-# -------------------------------------------
-# CREATE GRAPH
-# -------------------------------------------
-dot = Digraph(comment="Org Chart (Dept Clusters)", format="png")
-
-dot.graph_attr.update(
-    rankdir=RANKDIR,
-    splines="ortho",
-    fontsize="11",
-    labelloc="t",
-    label="Org Chart",
-    pad="0.2",
-    margin="0.1",
-    nodesep="0.3",
-    ranksep="0.5",
-    ratio="compress",
-    bgcolor="white",
-)
+    # wide teams: leaf reports stacked into columns, one stack per department
+    manager_to_reports = defaultdict(list)
+    for uid, manager_id in zip(df["Unique Identifier"], df["Reports To"]):
+        if not is_null(manager_id) and str(manager_id) in id_to_label:
+            manager_to_reports[str(manager_id)].append(uid)
 
-dot.node_attr.update(
-    shape="box",
-    style="rounded,filled",
-    fillcolor="white",
-    color="#555555",
-    fontname=FONT,
-    fontsize="9",
-    margin="0.12,0.06",
-)
+    stacks = []
+    if COMPACT_FANOUT:
+        stacks = leaf_stacks(
+            manager_to_reports, FANOUT_LIMIT,
+            group_of=id_to_org.get,
+        )
+    in_stack = stacked_uids(stacks)
+    org_to_stacks = defaultdict(list)
+    for manager_id, stack_id, uids in stacks:
+        org_to_stacks[id_to_org[uids[0]]].append((stack_id, uids))
 
-dot.edge_attr.update(
-    color="#888888",
-    arrowsize="0.7",
-)
+    # -------------------------------------------
+    # COLOR PALETTE (soft, not shouting)
+    # -------------------------------------------
+    # pastel-ish department colors
+    palette = [
+        "#E3F2FD",  # light blue
+        "#FFF3E0",  # light orange
+        "#E8F5E9",  # light green
+        "#F3E5F5",  # light purple
+        "#E0F7FA",  # light cyan
+        "#FBE9E7",  # light coral
+        "#FFFDE7",  # light yellow
+    ]
 
-# -------------------------------------------
-# NODES: ADD DEPARTMENTS AS CLUSTERS
-# -------------------------------------------
-for org in org_names:
-    dept_nodes = org_to_ids[org]
-    cluster_name = f"cluster_{safe_name(org)}"
-    dept_color = org_to_color[org]
-
-    with dot.subgraph(name=cluster_name) as c:
-        # Department frame
-        c.attr(
+    org_names = sorted(org_to_ids.keys())
+    org_to_color = {
+        org: palette[i % len(palette)] for i, org in enumerate(org_names)
+    }
+
+    # -------------------------------------------
+    # GRAPH STYLE
+    # -------------------------------------------
+    graph_attr = dict(
+        rankdir=RANKDIR,
+        splines="ortho",
+        fontsize="11",
+        labelloc="t",
+        label="Org Chart",
+        pad="0.2",
+        margin="0.1",
+        nodesep="0.3",
+        ranksep="0.5",
+        ratio="compress",
+        bgcolor="white",
+    )
+
+    node_attr = dict(
+        shape="box",
+        style="rounded,filled",
+        fillcolor="white",
+        color="#555555",
+        fontname=FONT,
+        fontsize="9",
+        margin="0.12,0.06",
+    )
+
+    edge_attr = dict(
+        color="#888888",
+        arrowsize="0.7",
+    )
+
+    # Nodes inside a department
+    cluster_node_attr = dict(
+        style="rounded,filled",
+        fillcolor="white",    # keep nodes neutral
+        color="#555555",
+        fontname=FONT,
+        fontsize="9",
+    )
+
+    # Top person(s) in org – slightly emphasized
+    node_classes = {
+        "root": dict(style="rounded,filled,bold", penwidth="1.5"),
+        "stack": dict(shape="plain", style=""),
+    }
+
+    root_set = set(roots)
+
+    # -------------------------------------------
+    # NODES: ADD DEPARTMENTS AS CLUSTERS
+    # -------------------------------------------
+    # DOT text is written a whole column at a time (see dot_writer.py)
+    def department_cluster(org):
+        dept_nodes = [uid for uid in org_to_ids[org] if uid not in in_stack]
+        stack_ids = [stack_id for stack_id, _ in org_to_stacks[org]]
+
+        ids = dept_nodes + stack_ids
+        labels = [id_to_label[uid] for uid in dept_nodes] + [
+            stack_label(uids, id_to_label, "white", 9) for _, uids in org_to_stacks[org]
+        ]
+        classes = ["root" if uid in root_set else None for uid in dept_nodes]
+        classes += ["stack"] * len(stack_ids)
+
+        dept_color = org_to_color[org]
+        frame = dict(
             label=org,
             style="rounded,filled",
             color=dept_color,     # frame color
@@ -145,46 +208,59 @@ for org in org_names:
             fontsize="10",
             fontname=FONT,
         )
+        sizes = [a_list(id_to_size[uid]) if uid in id_to_size else "" for uid in dept_nodes]
+        sizes += [""] * len(stack_ids)
+        body = node_lines(ids, labels, classes, node_classes, indent=2, extra=sizes)
+        return cluster_lines(f"cluster_{safe_name(org)}", frame, body, cluster_node_attr)
 
-        # Nodes inside the department
-        c.node_attr.update(
-            style="rounded,filled",
-            fillcolor="white",    # keep nodes neutral
-            color="#555555",
-            fontname=FONT,
-            fontsize="9",
-        )
-
-        for uid in dept_nodes:
-            label = id_to_label[uid]
-            if uid in roots:
-                # Top person(s) in org – slightly emphasized
-                c.node(
-                    uid,
-                    label=label,
-                    style="rounded,filled,bold",
-                    penwidth="1.5",
-                )
-            else:
-                c.node(uid, label=label)
+    # -------------------------------------------
+    # EDGES: TRUE REPORTING LINES
+    # -------------------------------------------
+    managers = df["Reports To"]
+    keep = (
+        managers.isin(id_to_label.keys())
+        & df["Unique Identifier"].isin(id_to_label.keys())
+        & ~df["Unique Identifier"].isin(in_stack)
+    )
+    tails = managers[keep].tolist() + [manager_id for manager_id, _, _ in stacks]
+    heads = df.loc[keep, "Unique Identifier"].tolist() + [stack_id for _, stack_id, _ in stacks]
 
-# -------------------------------------------
-# EDGES: TRUE REPORTING LINES
-# -------------------------------------------
-for _, row in df.iterrows():
-    uid = row["Unique Identifier"]
-    manager_id = row["Reports To"]
+    # Small charts keep ortho routing; big or many-department ones get cheaper settings
+    n_boxes = len(id_to_label) - len(in_stack) + len(stacks)
+    profile = (
+        choose_profile(n_boxes, max_fanout(tails), len(org_names)) if ADAPTIVE_TUNING else None
+    )
+    if profile:
+        graph_attr = profile.apply(graph_attr)
+        if profile.order_children:
+            tails, heads = order_edges(tails, heads)
 
-    if is_null(manager_id):
-        continue
+    def reporting_edges():
+        return edge_lines(tails, heads)
 
-    manager_id = str(manager_id)
+    def chart_body():
+        for org in org_names:
+            yield from department_cluster(org)
+        yield from reporting_edges()
 
-    if manager_id in id_to_label and uid in id_to_label:
-        dot.edge(manager_id, uid)
+    source = dot_source(dot_lines(
+        chart_body(),
+        comment="Org Chart (Dept Clusters)",
+        graph_attr=graph_attr,
+        node_attr=node_attr,
+        edge_attr=edge_attr,
+    ))
 
-# -------------------------------------------
-# RENDER
-# -------------------------------------------
-output_path = dot.render(filename=OUTPUT_FILE, cleanup=True)
-print(f"PNG org chart generated: {output_path}")
+    # -------------------------------------------
+    # RENDER
+    # -------------------------------------------
+    # Bounded `dot` run with a timeout; falls back from ortho routing if it stalls
+    if profile:
+        print(
+            f"[INFO] {n_boxes} boxes, widest team {max_fanout(tails)}, "
+            f"{len(org_names)} departments: {profile.name} profile"
+        )
+        result = render_one(RenderJob(source, f"{OUTPUT_FILE}.png"), fallbacks=profile.fallbacks)
+    else:
+        result = render_one(RenderJob(source, f"{OUTPUT_FILE}.png"))
+    print(f"PNG org chart generated: {result.job.output}")
@@ -1,7 +1,17 @@
 import math
+from collections import Counter
 import pandas as pd
 from graphviz import Digraph
 
+from fanout import FANOUT_THRESHOLD, leaf_stacks, stack_label, stacked_uids
+from labels import LabelCache
+from org_graph import build_graph
+from org_io import read_org
+from org_validate import check_org
+from render_scheduler import RenderJob, render_many, render_one
+from summarize import summary_charts
+from tuning import choose_profile, max_fanout, order_edges
+
 # -------------------------------------------
 # CONFIG
 # -------------------------------------------
@@ -9,11 +19,16 @@ INPUT_FILE = "ideal_final_output.xlsx"
 SHEET_NAME = 0
 OUTPUT_FILE = "org_chart_all"   # org_chart_all.png
 RANKDIR = "TB"                  # vertical org chart
+NODE_BUDGET = 300               # summarize above this many people (None = draw everyone)
+FIXED_SIZE_NODES = False        # estimated node sizes so dot skips text layout (may clip non-Latin labels)
+COMPACT_FANOUT = True           # stack leaf reports of wide teams into columns
+FANOUT_LIMIT = FANOUT_THRESHOLD # ...when a manager has more leaf reports than this
+ADAPTIVE_TUNING = True          # Graphviz settings picked from the chart's size (see tuning.py)
 
 # -------------------------------------------
 # LOAD DATA
 # -------------------------------------------
-df = pd.read_excel(INPUT_FILE, sheet_name=SHEET_NAME)
+df = read_org(INPUT_FILE, SHEET_NAME)
 
 df["Unique Identifier"] = df["Unique Identifier"].astype(str)
 df["Name"] = df["Name"].astype(str).str.strip()
@@ -23,6 +38,9 @@ if "Reports To" in df.columns:
 else:
     df["Reports To"] = None
 
+# Catch cycles, self-loops and missing managers before drawing
+df = check_org(df)
+
 # -------------------------------------------
 # HELPERS
 # -------------------------------------------
@@ -33,81 +51,143 @@ def is_null(x):
         or (isinstance(x, str) and x.strip() == "")
     )
 
-def build_label(row):
-    """Compact label: Name + Title."""
-    name = row.get("Name", "")
-    title = row.get("Line Detail 1", "")
-    title = title.strip() if isinstance(title, str) else ""
-    if title:
-        return f"{name}\n{title}"
-    return name
-
 # roots = no manager
 roots = df[df["Reports To"].apply(is_null)]["Unique Identifier"].tolist()
 
 id_to_row = {row["Unique Identifier"]: row for _, row in df.iterrows()}
-id_to_label = {uid: build_label(row) for uid, row in id_to_row.items()}
 
-# -------------------------------------------
-# GRAPHVIZ (PNG, compact spacing)
-# -------------------------------------------
-dot = Digraph(comment="Org Chart (All Staff)", format="png")
-
-dot.graph_attr.update(
-    rankdir=RANKDIR,
-    splines="ortho",
-    fontsize="10",
-    labelloc="t",
-    label="Org Chart",
-    pad="0.1",
-    margin="0.05",
-    nodesep="0.25",   # tighter horizontally
-    ranksep="0.4",    # tighter vertically
-    ratio="compress",
+# Name + title, formatted and measured once per distinct row (see labels.py)
+label_cache = LabelCache()
+id_to_label = label_cache.id_to_label(df)
+id_to_size = (
+    label_cache.id_to_size(df, fontsize=9, margin=(0.12, 0.06)) if FIXED_SIZE_NODES else {}
 )
-
-dot.node_attr.update(
-    shape="box",
-    style="rounded,filled",
-    fillcolor="#f9f9f9",
-    color="#555555",
-    fontname="Helvetica",
-    fontsize="9",
-    margin="0.12,0.06",
-)
-
-dot.edge_attr.update(
-    color="#888888",
-    arrowsize="0.7",
-)
-
-# -------------------------------------------
-# NODES (EVERYONE)
-# -------------------------------------------
-for uid, label in id_to_label.items():
-    if uid in roots:
-        dot.node(uid, label=label, fillcolor="#e3f2fd",
-                 style="rounded,filled,bold", penwidth="1.3")
-    else:
-        dot.node(uid, label=label)
+label_cache.save()
 
 # -------------------------------------------
-# EDGES (TRUE REPORTING LINES)
+# LARGE ORGS: SUMMARY CHART + DRILL-DOWNS
 # -------------------------------------------
-for _, row in df.iterrows():
-    uid = row["Unique Identifier"]
-    manager_id = row["Reports To"]
-
-    if is_null(manager_id):
-        continue
+# Above the budget, big teams fold into "Dept — N staff" boxes, each with
+# its own drill-down chart, so layout time no longer grows with headcount
+if NODE_BUDGET and len(id_to_label) > NODE_BUDGET:
+    charts = summary_charts(
+        build_graph(df), OUTPUT_FILE, node_budget=NODE_BUDGET, adaptive=ADAPTIVE_TUNING
+    )
+    # Each chart gets the Graphviz settings for its own size (see tuning.py)
+    jobs = [
+        RenderJob(chart.source, f"{filename}.png", fallbacks=profile and profile.fallbacks)
+        for filename, chart, profile in charts
+    ]
+    if ADAPTIVE_TUNING:
+        used = Counter(profile.name for _, _, profile in charts)
+        print(f"[INFO] {len(charts)} charts: " + ", ".join(f"{n} {name}" for name, n in used.items()))
+    for result in render_many(jobs):
+        if not result.ok:
+            print(f"[WARN] {result.job.output}: {result.error}")
+    print(f"PNG org chart generated: {OUTPUT_FILE}.png (+{len(jobs) - 1} drill-down charts)")
+else:
+    # -------------------------------------------
+    # WIDE TEAMS: STACK LEAF REPORTS INTO COLUMNS
+    # -------------------------------------------
+    manager_to_reports = {}
+    for uid, row in id_to_row.items():
+        manager_id = row["Reports To"]
+        if not is_null(manager_id) and str(manager_id) in id_to_label:
+            manager_to_reports.setdefault(str(manager_id), []).append(uid)
+
+    stacks = leaf_stacks(manager_to_reports, FANOUT_LIMIT) if COMPACT_FANOUT else []
+    in_stack = stacked_uids(stacks)
+
+    # -------------------------------------------
+    # REPORTING LINES TO DRAW
+    # -------------------------------------------
+    tails, heads = [], []
+    for _, row in df.iterrows():
+        uid = row["Unique Identifier"]
+        manager_id = row["Reports To"]
+
+        if is_null(manager_id):
+            continue
+
+        manager_id = str(manager_id)
+
+        if manager_id in id_to_label and uid in id_to_label and uid not in in_stack:
+            tails.append(manager_id)
+            heads.append(uid)
+
+    for manager_id, stack_id, _ in stacks:
+        tails.append(manager_id)
+        heads.append(stack_id)
+
+    # Small charts keep ortho routing; big ones get cheaper settings
+    n_boxes = len(id_to_label) - len(in_stack) + len(stacks)
+    profile = choose_profile(n_boxes, max_fanout(tails)) if ADAPTIVE_TUNING else None
+    if profile and profile.order_children:
+        tails, heads = order_edges(tails, heads)
+
+    # -------------------------------------------
+    # GRAPHVIZ (PNG, compact spacing)
+    # -------------------------------------------
+    dot = Digraph(comment="Org Chart (All Staff)", format="png")
+
+    graph_attr = dict(
+        rankdir=RANKDIR,
+        splines="ortho",
+        fontsize="10",
+        labelloc="t",
+        label="Org Chart",
+        pad="0.1",
+        margin="0.05",
+        nodesep="0.25",   # tighter horizontally
+        ranksep="0.4",    # tighter vertically
+        ratio="compress",
+    )
+    dot.graph_attr.update(profile.apply(graph_attr) if profile else graph_attr)
+
+    dot.node_attr.update(
+        shape="box",
+        style="rounded,filled",
+        fillcolor="#f9f9f9",
+        color="#555555",
+        fontname="Helvetica",
+        fontsize="9",
+        margin="0.12,0.06",
+    )
 
-    manager_id = str(manager_id)
+    dot.edge_attr.update(
+        color="#888888",
+        arrowsize="0.7",
+    )
 
-    if manager_id in id_to_label and uid in id_to_label:
+    # -------------------------------------------
+    # NODES (EVERYONE)
+    # -------------------------------------------
+    for uid, label in id_to_label.items():
+        if uid in in_stack:
+            continue  # drawn inside its manager's stacked column
+        if uid in roots:
+            dot.node(uid, label=label, fillcolor="#e3f2fd",
+                     style="rounded,filled,bold", penwidth="1.3", **id_to_size.get(uid, {}))
+        else:
+            dot.node(uid, label=label, **id_to_size.get(uid, {}))
+
+    for manager_id, stack_id, uids in stacks:
+        dot.node(stack_id, label=stack_label(uids, id_to_label, fontsize=9),
+                 shape="plain", style="")
+
+    # -------------------------------------------
+    # EDGES (TRUE REPORTING LINES)
+    # -------------------------------------------
+    for manager_id, uid in zip(tails, heads):
         dot.edge(manager_id, uid)
 
-# -------------------------------------------
-# RENDER
-# -------------------------------------------
-output_path = dot.render(filename=OUTPUT_FILE, cleanup=True)
-print(f"PNG org chart generated: {output_path}")
+    # -------------------------------------------
+    # RENDER
+    # -------------------------------------------
+    # Bounded `dot` run with a timeout; falls back from ortho routing if it stalls
+    if profile:
+        print(f"[INFO] {n_boxes} boxes, widest team {max_fanout(tails)}: {profile.name} profile")
+        result = render_one(RenderJob(dot.source, f"{OUTPUT_FILE}.png"), fallbacks=profile.fallbacks)
+    else:
+        result = render_one(RenderJob(dot.source, f"{OUTPUT_FILE}.png"))
+    print(f"PNG org chart generated: {result.job.output}")